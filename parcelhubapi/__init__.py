@@ -1,17 +1,36 @@
 """parcelhubapi - Parcelhub API integration."""
 
-from .models import ShipmentRequest
-from .request import (
-    CreateShipmentRequest,
-    GetDraftShipmentsRequest,
-    GetShipmentsRequest,
-)
-from .session import ParcelhubAPISession
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "ParcelhubAPISession": ".session",
+    "ParcelhubAPISessionPool": ".pool",
+    "GetDraftShipmentsRequest": ".request",
+    "GetShipmentsRequest": ".request",
+    "CreateShipmentRequest": ".request",
+    "ShipmentRequest": ".models",
+}
 
 __all__ = [
     "ParcelhubAPISession",
+    "ParcelhubAPISessionPool",
     "GetDraftShipmentsRequest",
     "GetShipmentsRequest",
     "CreateShipmentRequest",
     "ShipmentRequest",
 ]
+
+
+def __getattr__(name):
+    """Import public attributes from their modules when first accessed."""
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,788 @@
+"""Asyncio session and requests for the parcelhubapi package."""
+
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import ssl
+import zlib
+from urllib.parse import urlencode, urlsplit
+
+from . import batch, exceptions
+from .batch import ShipmentResult
+from .request import (
+    CreateDraftShipmentRequest,
+    CreateShipmentRequest,
+    GetDraftShipmentsRequest,
+    GetShipmentsRequest,
+    GetTokenRequest,
+    RefreshTokenRequest,
+)
+from .session import BaseParcelhubAPISession
+from .transport import InMemoryTransport, TransportResponse
+
+
+class AsyncTransport:
+    """Base class for asyncio HTTP transports."""
+
+    PREWARM_TIMEOUT = (5, 5)
+
+    async def request(
+        self, method, url, headers=None, params=None, data=None, timeout=None
+    ):
+        """
+        Send an HTTP request and return the response.
+
+        timeout is a (connect, read) tuple of seconds, or None to wait forever.
+        The returned object must provide status_code, text, headers and
+        raise_for_status().
+        """
+        raise NotImplementedError
+
+    async def prewarm(self, url):
+        """
+        Open a pooled connection to url so later requests can reuse it.
+
+        The request is limited by PREWARM_TIMEOUT.
+        """
+        await self.request("HEAD", url, timeout=self.PREWARM_TIMEOUT)
+
+    async def close(self):
+        """Release any resources held by the transport."""
+        pass
+
+
+class AsyncioTransport(AsyncTransport):
+    """
+    HTTP/1.1 transport using asyncio streams with pooled keep-alive connections.
+
+    At most pool_maxsize requests are in flight to each host at a time. Idle
+    connections are kept open and reused by later requests to the same host. If
+    a reused connection turns out to have been closed by the server, the request
+    is sent again on a new connection only if its method is in
+    IDEMPOTENT_METHODS, as the server may already have processed it. Failures
+    to open a connection are raised as parcelhubapi.exceptions.ConnectError.
+    """
+
+    POOL_MAXSIZE = 10
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def __init__(self, pool_maxsize=None, ssl_context=None):
+        """
+        Create an asyncio transport.
+
+        Kwargs:
+            pool_maxsize (int): The maximum number of connections to open to each
+                host.
+            ssl_context (ssl.SSLContext): The SSL context used for HTTPS
+                connections. Defaults to ssl.create_default_context().
+        """
+        self.pool_maxsize = pool_maxsize or self.POOL_MAXSIZE
+        self.ssl_context = ssl_context
+        self._idle_connections = {}
+        self._semaphores = {}
+
+    async def request(
+        self, method, url, headers=None, params=None, data=None, timeout=None
+    ):
+        """Send an HTTP request and return a TransportResponse."""
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or "/"
+        query = "&".join(filter(None, (parts.query, urlencode(params or {}))))
+        if query:
+            target = f"{target}?{query}"
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        request_bytes = self._request_bytes(
+            method, target, parts.netloc, headers or {}, data or b""
+        )
+        semaphore = self._semaphores.setdefault(
+            key, asyncio.Semaphore(self.pool_maxsize)
+        )
+        connect_timeout, read_timeout = timeout or (None, None)
+        async with semaphore:
+            while True:
+                try:
+                    connection, reused = await asyncio.wait_for(
+                        self._get_connection(key, secure), connect_timeout
+                    )
+                except OSError as e:
+                    raise exceptions.ConnectError(str(e) or type(e).__name__) from e
+                reader, writer = connection
+                try:
+                    writer.write(request_bytes)
+                    await writer.drain()
+                    status_code, response_headers, content, keep_alive = (
+                        await asyncio.wait_for(
+                            self._read_response(reader, method), read_timeout
+                        )
+                    )
+                except BaseException as e:
+                    writer.close()
+                    if (
+                        reused
+                        and method in self.IDEMPOTENT_METHODS
+                        and isinstance(
+                            e, (ConnectionError, asyncio.IncompleteReadError)
+                        )
+                    ):
+                        # The server closed an idle keep-alive connection.
+                        continue
+                    raise
+                break
+        if keep_alive:
+            self._idle_connections.setdefault(key, []).append(connection)
+        else:
+            writer.close()
+        return TransportResponse(
+            status_code=status_code, content=content, headers=response_headers, url=url
+        )
+
+    async def close(self):
+        """Close all idle connections."""
+        idle_connections, self._idle_connections = self._idle_connections, {}
+        for connections in idle_connections.values():
+            for _, writer in connections:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except (ConnectionError, ssl.SSLError):
+                    pass
+
+    async def _get_connection(self, key, secure):
+        idle = self._idle_connections.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return (reader, writer), True
+            writer.close()
+        scheme, host, port = key
+        ssl_context = None
+        if secure:
+            ssl_context = self.ssl_context or ssl.create_default_context()
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        return (reader, writer), False
+
+    @staticmethod
+    def _request_bytes(method, target, host, headers, data):
+        request_headers = {"Host": host, "Connection": "keep-alive"}
+        request_headers.update(headers)
+        if data or method in ("POST", "PUT"):
+            request_headers["Content-Length"] = str(len(data))
+        lines = [f"{method} {target} HTTP/1.1"]
+        lines.extend(f"{name}: {value}" for name, value in request_headers.items())
+        head = "\r\n".join(lines) + "\r\n\r\n"
+        return head.encode("latin-1") + data
+
+    async def _read_response(self, reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server.")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        status_code = int(status)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+        lower_headers = {name.lower(): value for name, value in headers.items()}
+        keep_alive = (
+            version == "HTTP/1.1"
+            and lower_headers.get("connection", "").lower() != "close"
+        )
+        if method == "HEAD" or status_code in (204, 304) or status_code < 200:
+            content = b""
+        elif "chunked" in lower_headers.get("transfer-encoding", "").lower():
+            content = await self._read_chunked(reader)
+        elif "content-length" in lower_headers:
+            content = await reader.readexactly(int(lower_headers["content-length"]))
+        else:
+            content = await reader.read()
+            keep_alive = False
+        encoding = lower_headers.get("content-encoding", "").lower()
+        if encoding == "gzip":
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            content = zlib.decompress(content)
+        return status_code, headers, content, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";")[0].strip(), 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+class AsyncInMemoryTransport(AsyncTransport, InMemoryTransport):
+    """Asyncio transport returning canned responses without touching the network."""
+
+    async def request(
+        self, method, url, headers=None, params=None, data=None, timeout=None
+    ):
+        """Record the request and return the matching canned response."""
+        return InMemoryTransport.request(
+            self,
+            method,
+            url,
+            headers=headers,
+            params=params,
+            data=data,
+            timeout=timeout,
+        )
+
+
+class AsyncParcelhubAPISession(BaseParcelhubAPISession):
+    """
+    Asyncio session manager for parcelhubapi.
+
+    Use with async with, and send requests with the Async request classes in
+    parcelhubapi.aio.
+
+    parcelhubapi.concurrency.AdaptiveConcurrencyLimiter blocks the calling
+    thread, so it cannot be used with an asyncio session. Use pool_maxsize or
+    a scheduler to limit the number of requests in flight instead.
+    """
+
+    def __init__(
+        self,
+        username=None,
+        password=None,
+        account_id=None,
+        transport=None,
+        token_cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        circuit_breakers=None,
+        hedging_policy=None,
+        single_flight=None,
+        response_cache=None,
+        scheduler=None,
+        pool_maxsize=None,
+        concurrency_limiter=None,
+    ):
+        """
+        Create an asyncio Parcelhub API session.
+
+        Kwargs:
+            username (str): The Parcelhub username.
+            password (str): The Parcelhub password.
+            account_id (str): The Parcelhub account ID.
+            transport (AsyncTransport): The transport used to send requests.
+                Defaults to an AsyncioTransport created with pool_maxsize.
+            token_cache (parcelhubapi.token_cache.FileTokenCache): If set, access
+                tokens are shared through this cache instead of logging in for every
+                session.
+            retry_policy (parcelhubapi.retry.RetryPolicy): The retry policy used
+                by requests that are safe to retry. Defaults to each request
+                class's RETRY_POLICY.
+            rate_limiter (parcelhubapi.ratelimit.RateLimiter): If set, requests
+                wait until the rate limiter allows them to be sent.
+            circuit_breakers (parcelhubapi.circuitbreaker.CircuitBreakers): If
+                set, requests to an endpoint fail immediately while its circuit
+                breaker is open.
+            hedging_policy (parcelhubapi.hedging.HedgingPolicy): If set, slow
+                requests for shipment lists are hedged with a second request.
+            single_flight (parcelhubapi.singleflight.SingleFlight): If set,
+                identical concurrent requests for shipment lists share one request.
+            response_cache (parcelhubapi.cache.BaseResponseCache): If set,
+                shipment lists are cached and reused until they expire or a
+                shipment is created.
+            scheduler (parcelhubapi.scheduler.RequestScheduler): If set,
+                requests wait for their turn by priority and account before they
+                are sent.
+            pool_maxsize (int): The maximum number of connections to open to each
+                host.
+            concurrency_limiter: Not supported. Raises TypeError if set.
+        """
+        if concurrency_limiter is not None:
+            raise TypeError(
+                "AsyncParcelhubAPISession does not support concurrency_limiter."
+            )
+        if transport is None:
+            transport = AsyncioTransport(pool_maxsize=pool_maxsize)
+        super().__init__(
+            username=username,
+            password=password,
+            account_id=account_id,
+            transport=transport,
+            token_cache=token_cache,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            circuit_breakers=circuit_breakers,
+            hedging_policy=hedging_policy,
+            single_flight=single_flight,
+            response_cache=response_cache,
+            scheduler=scheduler,
+        )
+        self._async_token_lock = asyncio.Lock()
+
+    def __enter__(self):
+        raise TypeError("Use async with for AsyncParcelhubAPISession.")
+
+    async def __aenter__(self):
+        self.load_credentials()
+        await self.authorise_session()
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        await self.close()
+
+    async def close(self):
+        """Close the session's transport."""
+        await self.transport.close()
+
+    async def authorise_session(self, deadline=None):
+        """Request access token and refresh token."""
+        async with self._async_token_lock:
+            self.token = await self.request_token(
+                AsyncGetTokenRequest, deadline=deadline
+            )
+
+    async def renew_session(self, stale_token=None, deadline=None):
+        """
+        Renew the access token.
+
+        The refresh token is used if one is available. If it is missing or rejected
+        the session logs in with its credentials instead. Only one renewal runs at
+        a time and a token that has already been replaced is not renewed again.
+        """
+        async with self._async_token_lock:
+            if stale_token is not None and self.token is not stale_token:
+                return
+            await self._renew_session(deadline=deadline)
+
+    async def ensure_token(self, deadline=None):
+        """
+        Return a valid access token, renewing it if it is about to expire.
+
+        Tasks arriving while another task renews the token wait for, and share,
+        its result.
+        """
+        token = self.token
+        if token is None or not token.is_valid(self.TOKEN_EXPIRY_MARGIN):
+            async with self._async_token_lock:
+                token = self.token
+                if token is None or not token.is_valid(self.TOKEN_EXPIRY_MARGIN):
+                    await self._renew_session(deadline=deadline)
+                    token = self.token
+        return token
+
+    async def _renew_session(self, deadline=None):
+        stale_token = self.token
+        if stale_token is not None and stale_token.refresh_token is not None:
+            try:
+                self.token = await self.request_token(
+                    AsyncRefreshTokenRequest, stale_token=stale_token, deadline=deadline
+                )
+                return
+            except exceptions.ResponseStatusError:
+                pass
+        self.token = await self.request_token(AsyncGetTokenRequest, deadline=deadline)
+
+    async def request_token(self, request_class, stale_token=None, deadline=None):
+        """
+        Return a new parcelhubapi.models.AccessToken.
+
+        If the session has a token cache, a valid token other than stale_token is
+        taken from the cache if one exists. Otherwise a token is requested with
+        request_class while holding the cache lock and is stored in the cache.
+        Cache file access and the lock run in a thread so the event loop is not
+        blocked.
+        """
+        if self.token_cache is None:
+            return await request_class(self).call(deadline=deadline)
+        token = await asyncio.to_thread(self.get_cached_token, stale_token=stale_token)
+        if token is None:
+            async with _AsyncLock(self.token_cache.lock()) as lock:
+                token = await lock.run(self.get_cached_token, stale_token=stale_token)
+                if token is None:
+                    token = await request_class(self).call(deadline=deadline)
+                    await lock.run(
+                        self.token_cache.set, self.username, self.account_id, token
+                    )
+        return token
+
+    async def create_shipments(
+        self,
+        shipment_requests,
+        max_concurrency=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments concurrently over the session's pooled connections.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects.
+
+        Kwargs:
+            max_concurrency (int): The number of requests in flight at once.
+                Defaults to parcelhubapi.batch.DEFAULT_MAX_WORKERS.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink, from a thread, as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        Returns a parcelhubapi.batch.ShipmentResult for each shipment, in the order
+        given, holding either the CreateShipmentResponse or the exception raised.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or batch.DEFAULT_MAX_WORKERS)
+        create = functools.partial(
+            self._create_shipment_result,
+            semaphore,
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+        try:
+            return list(
+                await asyncio.gather(
+                    *(
+                        create(index, shipment_request)
+                        for index, shipment_request in enumerate(shipment_requests)
+                    )
+                )
+            )
+        finally:
+            if sink is not None:
+                await asyncio.to_thread(batch.flush_sink, sink)
+
+    async def stream_shipments(
+        self,
+        shipment_requests,
+        max_concurrency=None,
+        window=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments from an iterable without holding the whole batch in memory.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects, typically from a generator.
+
+        Kwargs:
+            max_concurrency (int): The number of requests in flight at once.
+                Defaults to parcelhubapi.batch.DEFAULT_MAX_WORKERS.
+            window (int): The maximum number of shipments held at once. Defaults
+                to twice max_concurrency.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink, from a thread, as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        An asynchronous generator yielding a parcelhubapi.batch.ShipmentResult for
+        each shipment as it completes. See parcelhubapi.batch.stream_shipments.
+        """
+        max_concurrency = max_concurrency or batch.DEFAULT_MAX_WORKERS
+        window = window or max_concurrency * 2
+        shipment_requests = iter(shipment_requests)
+        create = functools.partial(
+            self._create_shipment_result,
+            asyncio.Semaphore(max_concurrency),
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+        pending = set()
+        index = 0
+        try:
+            while True:
+                for shipment_request in itertools.islice(
+                    shipment_requests, window - len(pending)
+                ):
+                    pending.add(asyncio.ensure_future(create(index, shipment_request)))
+                    index += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if sink is not None:
+                await asyncio.to_thread(batch.flush_sink, sink)
+
+    async def _create_shipment_result(
+        self, semaphore, index, shipment_request, draft=False, sink=None, priority=None
+    ):
+        request_class = (
+            AsyncCreateDraftShipmentRequest if draft else AsyncCreateShipmentRequest
+        )
+        async with semaphore:
+            try:
+                response = await request_class(self).call(
+                    shipment_request=shipment_request, priority=priority
+                )
+            except Exception as e:
+                result = ShipmentResult(index, shipment_request, error=e)
+            else:
+                result = ShipmentResult(index, shipment_request, response=response)
+        if sink is not None:
+            await asyncio.to_thread(batch.write_result, sink, result)
+        return result
+
+
+class _AsyncLock:
+    """
+    Hold a thread-bound lock from a dedicated thread.
+
+    The lock is acquired, used and released by the same thread, so blocking
+    lock and file operations do not stall the event loop.
+    """
+
+    def __init__(self, lock):
+        self.lock = lock
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def __aenter__(self):
+        acquired = self._executor.submit(self.lock.acquire)
+        try:
+            await asyncio.wrap_future(acquired)
+        except BaseException:
+            # The lock may still be acquired after the wait was cancelled.
+            self._executor.submit(self._release_if_acquired, acquired)
+            self._executor.shutdown(wait=False)
+            raise
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        try:
+            await self.run(self.lock.release)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def run(self, function, *args, **kwargs):
+        """Call function in the thread holding the lock and return its result."""
+        return await asyncio.wrap_future(
+            self._executor.submit(function, *args, **kwargs)
+        )
+
+    def _release_if_acquired(self, acquired):
+        if not acquired.cancelled() and acquired.exception() is None:
+            self.lock.release()
+
+
+class AsyncRequestMixin:
+    """Mixin making a request class send its request with an asyncio session."""
+
+    async def call(self, *args, deadline=None, **kwargs):
+        """
+        Make an API request.
+
+        The request body is built once and reused by every attempt. Transient
+        failures are retried according to the request's retry policy. If COALESCE
+        is set and the session has a single flight group, concurrent identical
+        calls share one request and its parsed result. If CACHEABLE is set and the
+        session has a response cache, a cached result is returned if there is
+        one, and a result is not cached if the cache was invalidated while it was
+        fetched. The cached results of the request classes in INVALIDATES are
+        removed after the request succeeds. The cache is used from a thread, as
+        SQLite and file caches block.
+
+        Kwargs:
+            deadline (parcelhubapi.deadline.Deadline): A time budget limiting the
+                request, its retries and any token renewal it needs.
+            priority (int): The scheduling priority of the request. Defaults to
+                PRIORITY.
+        """
+        cache = self.response_cache()
+        if cache is None:
+            value = await self._call_shared(*args, deadline=deadline, **kwargs)
+        else:
+            key = self.cache_key(*args, **kwargs)
+            version, value = await asyncio.to_thread(
+                lambda: (cache.version(key), cache.get(key))
+            )
+            if value is not None:
+                return value
+            value = await self._call_shared(*args, deadline=deadline, **kwargs)
+            await asyncio.to_thread(cache.set_if_current, key, value, version)
+        if self.INVALIDATES and self.session.response_cache is not None:
+            await asyncio.to_thread(self.invalidate_stale_responses)
+        return value
+
+    async def _call_shared(self, *args, deadline=None, **kwargs):
+        single_flight = self.single_flight()
+        if single_flight is None:
+            return await self._call(*args, deadline=deadline, **kwargs)
+        return await single_flight.do_async(
+            self.coalescing_key(*args, **kwargs),
+            lambda: self._call(*args, deadline=deadline, **kwargs),
+            deadline=deadline,
+        )
+
+    async def _call(self, *args, deadline=None, **kwargs):
+        url = self.url(*args, **kwargs)
+        params = self.params(*args, **kwargs)
+        data = self.data(*args, **kwargs)
+        retry_policy = self.retry_policy(*args, **kwargs)
+        attempt = 1
+        while True:
+            try:
+                response = await self.send_authorised(
+                    url, params, data, *args, deadline=deadline, **kwargs
+                )
+            except Exception as e:
+                delay = retry_policy.retry_delay(attempt, error=e, deadline=deadline)
+                if delay is None:
+                    raise
+            else:
+                delay = retry_policy.retry_delay(
+                    attempt, response=response, deadline=deadline
+                )
+                if delay is None:
+                    break
+            await asyncio.sleep(delay)
+            attempt += 1
+        self.check_response(response)
+        return self.parse_response(response, *args, **kwargs)
+
+    async def send_authorised(self, url, params, data, *args, deadline=None, **kwargs):
+        """
+        Send the request with a valid access token and return the response.
+
+        The session's access token is renewed if it is about to expire. If the
+        request is rejected as unauthorised the token is renewed and the request
+        is sent once more.
+        """
+        token = None
+        if self.REQUIRES_AUTH:
+            token = await self.session.ensure_token(deadline=deadline)
+        response = await self.send(
+            url, params, data, *args, deadline=deadline, **kwargs
+        )
+        if self.REQUIRES_AUTH and response.status_code == 401:
+            await self.session.renew_session(stale_token=token, deadline=deadline)
+            response = await self.send(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        return response
+
+    async def send(self, url, params, data, *args, deadline=None, **kwargs):
+        """
+        Send the request using the session's transport and return the response.
+
+        If the session has circuit breakers, the request is rejected while the
+        endpoint's breaker is open and its outcome is recorded by the breaker. If
+        the session has a rate limiter, wait until it allows a request to the
+        endpoint. The rate limiter is called in a thread, as file backed
+        buckets block. If the request is HEDGEABLE and the session has a hedging
+        policy, a slow request is raced against a second, identical request. If
+        the session has a scheduler, wait for the request's turn by priority and
+        account.
+        """
+        breaker = self.circuit_breaker()
+        if breaker is None:
+            return await self._send_hedged(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        breaker.before_call()
+        try:
+            response = await self._send_hedged(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        except Exception as e:
+            breaker.record(error=e)
+            raise
+        except BaseException:
+            breaker.cancel()
+            raise
+        breaker.record(response=response)
+        return response
+
+    async def _send_hedged(self, url, params, data, *args, deadline=None, **kwargs):
+        hedging_policy = self.hedging_policy()
+        if hedging_policy is None:
+            return await self._send_scheduled(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        return await hedging_policy.call_async(
+            lambda: self._send_scheduled(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        )
+
+    async def _send_scheduled(self, url, params, data, *args, deadline=None, **kwargs):
+        scheduler = self.session.scheduler
+        priority = self.priority(*args, **kwargs)
+        if scheduler is None or priority is None:
+            return await self._send_limited(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        await scheduler.acquire_async(
+            priority=priority, account_id=self.session.account_id, deadline=deadline
+        )
+        try:
+            return await self._send_limited(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        finally:
+            scheduler.release()
+
+    async def _send_limited(self, url, params, data, *args, deadline=None, **kwargs):
+        rate_limiter = self.session.rate_limiter
+        if rate_limiter is not None:
+            max_wait = None if deadline is None else deadline.remaining()
+            delay = await asyncio.to_thread(
+                rate_limiter.reserve, self.URL, max_wait=max_wait
+            )
+            if delay is None:
+                raise exceptions.DeadlineExceededError()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return await self.session.transport.request(
+            url=url,
+            method=self.METHOD,
+            headers=self.headers(*args, **kwargs),
+            params=params,
+            data=data,
+            timeout=self.timeout(deadline),
+        )
+
+
+class AsyncGetTokenRequest(AsyncRequestMixin, GetTokenRequest):
+    """Asyncio request for getting a refresh token and access token."""
+
+
+class AsyncRefreshTokenRequest(AsyncRequestMixin, RefreshTokenRequest):
+    """Asyncio request for renewing an access token using a refresh token."""
+
+
+class AsyncGetShipmentsRequest(AsyncRequestMixin, GetShipmentsRequest):
+    """Asyncio request for retrieving active shipments."""
+
+
+class AsyncGetDraftShipmentsRequest(AsyncRequestMixin, GetDraftShipmentsRequest):
+    """Asyncio request for retrieving draft shipments."""
+
+
+class AsyncCreateShipmentRequest(AsyncRequestMixin, CreateShipmentRequest):
+    """Asyncio request for creating shipments."""
+
+
+class AsyncCreateDraftShipmentRequest(AsyncRequestMixin, CreateDraftShipmentRequest):
+    """Asyncio request for creating draft shipments."""
@@ -0,0 +1,265 @@
+"""Bulk shipment creation for the parcelhubapi package."""
+
+import concurrent.futures
+import functools
+import itertools
+
+from .request import CreateDraftShipmentRequest, CreateShipmentRequest
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class ShipmentResult:
+    """The outcome of creating one shipment in a batch."""
+
+    def __init__(self, index, shipment_request, response=None, error=None):
+        """
+        Create a shipment result.
+
+        Args:
+            index (int): The position of the shipment in the batch.
+            shipment_request (parcelhubapi.models.ShipmentRequest): The shipment.
+
+        Kwargs:
+            response (parcelhubapi.models.CreateShipmentResponse): The response if
+                the shipment was created.
+            error (Exception): The exception raised if the shipment was not
+                created.
+        """
+        self.index = index
+        self.shipment_request = shipment_request
+        self.response = response
+        self.error = error
+        self.sink_error = None
+        self.persist_error = None
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.error else f"{self.response!r}"
+        return f"ShipmentResult({self.index}, {outcome})"
+
+    @property
+    def ok(self):
+        """Return True if the shipment was created."""
+        return self.error is None
+
+
+def create_shipment(
+    session,
+    shipment_request,
+    draft=False,
+    deadline=None,
+    shipment_xml=None,
+    priority=None,
+):
+    """
+    Create a shipment and return a parcelhubapi.models.CreateShipmentResponse.
+
+    Args:
+        session (parcelhubapi.session.ParcelhubAPISession): The session used to
+            send the request.
+        shipment_request (parcelhubapi.models.ShipmentRequest): The shipment.
+
+    Kwargs:
+        draft (bool): If True, create a draft shipment.
+        deadline (parcelhubapi.deadline.Deadline): A time budget for the request.
+        shipment_xml (bytes): The shipment serialised in advance by
+            serialise_shipment.
+        priority (int): The scheduling priority of the request. Defaults to the
+            request class's PRIORITY.
+    """
+    request_class = shipment_request_class(draft)
+    kwargs = {"shipment_request": shipment_request, "deadline": deadline}
+    if shipment_xml is not None:
+        kwargs["shipment_xml"] = shipment_xml
+    if priority is not None:
+        kwargs["priority"] = priority
+    return request_class(session).call(**kwargs)
+
+
+def serialise_shipment(session, shipment_request, draft=False):
+    """Return the request body used to create a shipment."""
+    request_class = shipment_request_class(draft)
+    return request_class(session).data(shipment_request=shipment_request)
+
+
+def shipment_request_class(draft=False):
+    """Return the request class used to create shipments or draft shipments."""
+    return CreateDraftShipmentRequest if draft else CreateShipmentRequest
+
+
+def create_shipment_result(
+    get_session, index, shipment_request, draft=False, sink=None, priority=None
+):
+    """
+    Create a shipment and return a ShipmentResult.
+
+    Exceptions raised while creating the shipment are stored in the result
+    instead of being raised. If sink is set, the result is written to it with
+    write_result.
+    """
+    try:
+        response = create_shipment(
+            get_session(shipment_request),
+            shipment_request,
+            draft=draft,
+            priority=priority,
+        )
+    except Exception as e:
+        result = ShipmentResult(index, shipment_request, error=e)
+    else:
+        result = ShipmentResult(index, shipment_request, response=response)
+    if sink is not None:
+        write_result(sink, result)
+    return result
+
+
+def write_result(sink, result):
+    """
+    Write a ShipmentResult to a sink without raising.
+
+    A failing sink must not lose the result or stop the batch, so an exception
+    raised by the sink is stored in the result's sink_error.
+    """
+    try:
+        sink.write(result)
+    except Exception as e:
+        result.sink_error = e
+
+
+def flush_sink(sink):
+    """
+    Flush a sink without raising.
+
+    An exception raised by the sink is stored in its last_error. Rows that could
+    not be written are kept by the sink for the next flush.
+    """
+    try:
+        sink.flush()
+    except Exception as e:
+        sink.last_error = e
+
+
+def create_shipments(
+    shipment_requests,
+    get_session,
+    max_workers=None,
+    draft=False,
+    sink=None,
+    priority=None,
+):
+    """
+    Create shipments concurrently and return a ShipmentResult for each.
+
+    Results are returned in the order of shipment_requests. A shipment that fails
+    does not stop the others being created.
+
+    Args:
+        shipment_requests (iterable): parcelhubapi.models.ShipmentRequest objects.
+        get_session (callable): Returns the session used to create a shipment
+            when called with its ShipmentRequest.
+
+    Kwargs:
+        max_workers (int): The number of threads sending requests. Defaults to
+            DEFAULT_MAX_WORKERS. Connections beyond the transport's pool size
+            are not kept alive, so this should not exceed it.
+        draft (bool): If True, create draft shipments.
+        sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+            written to the sink as it completes and the sink is flushed at the
+            end. Sink errors are stored rather than raised, see write_result
+            and flush_sink.
+        priority (int): The scheduling priority of the requests. Defaults to
+            the request class's PRIORITY.
+    """
+    shipment_requests = list(shipment_requests)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or DEFAULT_MAX_WORKERS,
+            thread_name_prefix="parcelhubapi-batch",
+        ) as executor:
+            create = functools.partial(
+                create_shipment_result,
+                get_session,
+                draft=draft,
+                sink=sink,
+                priority=priority,
+            )
+            return list(
+                executor.map(create, range(len(shipment_requests)), shipment_requests)
+            )
+    finally:
+        if sink is not None:
+            flush_sink(sink)
+
+
+def stream_shipments(
+    shipment_requests,
+    get_session,
+    max_workers=None,
+    window=None,
+    draft=False,
+    sink=None,
+    priority=None,
+):
+    """
+    Create shipments concurrently, yielding a ShipmentResult as each completes.
+
+    shipment_requests is consumed lazily and at most window shipments are held
+    in flight or waiting to be yielded at once, so memory use does not grow with
+    the size of the batch. The next shipment is taken from shipment_requests
+    only when a result has been yielded, so a slow consumer also slows the
+    producer. Results are yielded in the order they complete; use
+    ShipmentResult.index to find a result's position in the batch.
+
+    Args:
+        shipment_requests (iterable): parcelhubapi.models.ShipmentRequest objects,
+            typically from a generator.
+        get_session (callable): Returns the session used to create a shipment
+            when called with its ShipmentRequest.
+
+    Kwargs:
+        max_workers (int): The number of threads sending requests. Defaults to
+            DEFAULT_MAX_WORKERS.
+        window (int): The maximum number of shipments held at once. Defaults to
+            twice max_workers.
+        draft (bool): If True, create draft shipments.
+        sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+            written to the sink as it completes and the sink is flushed at the
+            end. Sink errors are stored rather than raised, see write_result
+            and flush_sink.
+        priority (int): The scheduling priority of the requests. Defaults to
+            the request class's PRIORITY.
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    window = window or max_workers * 2
+    shipment_requests = iter(shipment_requests)
+    create = functools.partial(
+        create_shipment_result,
+        get_session,
+        draft=draft,
+        sink=sink,
+        priority=priority,
+    )
+    pending = set()
+    index = 0
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="parcelhubapi-stream"
+    ) as executor:
+        try:
+            while True:
+                for shipment_request in itertools.islice(
+                    shipment_requests, window - len(pending)
+                ):
+                    pending.add(executor.submit(create, index, shipment_request))
+                    index += 1
+                if not pending:
+                    return
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if sink is not None:
+                flush_sink(sink)
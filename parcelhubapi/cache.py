@@ -0,0 +1,286 @@
+"""Response caches for the parcelhubapi package."""
+
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .locks import FileLock, read_json, write_json
+
+
+class BaseResponseCache:
+    """
+    Base class for response caches.
+
+    Entries expire ttl seconds after they are stored. When more than max_entries
+    are stored the least recently used entries are evicted. Values must be
+    serialisable as JSON for caches shared between processes.
+
+    invalidate() counts the invalidations of each key in the current process.
+    A caller fetching a value records version() before it starts and stores
+    the value with set_if_current(), so a value fetched before an invalidation
+    is not stored after it.
+    """
+
+    def __init__(self, ttl=60, max_entries=128):
+        """
+        Create a response cache.
+
+        Kwargs:
+            ttl (float): The number of seconds an entry is kept.
+            max_entries (int): The maximum number of entries to keep.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions = collections.Counter()
+        self._version_lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.time()
+
+    def get(self, key):
+        """Return the value stored for key, or None if it is missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store value for key."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the entry for key if there is one."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every entry."""
+        raise NotImplementedError
+
+    def version(self, key):
+        """Return the number of times key has been invalidated by this process."""
+        with self._version_lock:
+            return self._versions[key]
+
+    def invalidate(self, key):
+        """Remove the entry for key and stop values fetched before now being stored."""
+        with self._version_lock:
+            self._versions[key] += 1
+            self.delete(key)
+
+    def set_if_current(self, key, value, version):
+        """
+        Store value for key unless key has been invalidated since version.
+
+        Returns True if the value was stored.
+        """
+        with self._version_lock:
+            if self._versions[key] != version:
+                return False
+            self.set(key, value)
+            return True
+
+
+class MemoryCache(BaseResponseCache):
+    """Response cache held in memory and shared by the threads of one process."""
+
+    def __init__(self, ttl=60, max_entries=128):
+        """
+        Create a memory cache.
+
+        Kwargs:
+            ttl (float): The number of seconds an entry is kept.
+            max_entries (int): The maximum number of entries to keep.
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value stored for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store value for key."""
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove the entry for key if there is one."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(BaseResponseCache):
+    """Response cache stored in a local SQLite database."""
+
+    def __init__(self, path, ttl=60, max_entries=128):
+        """
+        Create an SQLite cache.
+
+        Args:
+            path (str, pathlib.Path): The path of the database file.
+
+        Kwargs:
+            ttl (float): The number of seconds an entry is kept.
+            max_entries (int): The maximum number of entries to keep.
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, used_at REAL)"
+            )
+
+    def get(self, key):
+        """Return the value stored for key, or None if it is missing or expired."""
+        now = self.clock()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE responses SET used_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store value for key."""
+        now = self.clock()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now),
+            )
+            connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM responses WHERE key NOT IN ("
+                "SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key):
+        """Remove the entry for key if there is one."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        """Remove every entry."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+class FileCache(BaseResponseCache):
+    """
+    Response cache stored as files in a directory shared between processes.
+
+    Each entry is a JSON file written atomically, so entries can be read without
+    locking. The directory's lock is held while evicting entries.
+    """
+
+    def __init__(self, directory, ttl=60, max_entries=128):
+        """
+        Create a file cache.
+
+        Args:
+            directory (str, pathlib.Path): The directory holding the cache files.
+
+        Kwargs:
+            ttl (float): The number of seconds an entry is kept.
+            max_entries (int): The maximum number of entries to keep.
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.directory = Path(directory)
+        self.file_lock = FileLock(self.directory / ".lock")
+
+    def get(self, key):
+        """Return the value stored for key, or None if it is missing or expired."""
+        path = self._path(key)
+        entry = read_json(path)
+        if entry is None or entry["key"] != key:
+            return None
+        if entry["expires_at"] <= self.clock():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return entry["value"]
+
+    def set(self, key, value):
+        """Store value for key."""
+        entry = {"key": key, "value": value, "expires_at": self.clock() + self.ttl}
+        write_json(self._path(key), entry)
+        self._evict()
+
+    def delete(self, key):
+        """Remove the entry for key if there is one."""
+        self._unlink(self._path(key))
+
+    def clear(self):
+        """Remove every entry."""
+        with self.file_lock:
+            for path in self._entry_paths():
+                self._unlink(path)
+
+    def _path(self, key):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def _entry_paths(self):
+        return list(self.directory.glob("*.json"))
+
+    def _evict(self):
+        with self.file_lock:
+            entries = []
+            for path in self._entry_paths():
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    pass
+            entries.sort(reverse=True)
+            for _, path in entries[self.max_entries :]:
+                self._unlink(path)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
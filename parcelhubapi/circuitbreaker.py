@@ -0,0 +1,206 @@
+"""Circuit breakers for the parcelhubapi package."""
+
+import collections
+import threading
+import time
+
+from . import exceptions
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single endpoint.
+
+    The breaker starts closed and records whether each call failed. A call fails if
+    the transport raised a connection error or timeout, or if the response status
+    is in FAILURE_STATUSES. When at least failure_rate of the last window calls
+    have failed the breaker opens and calls are rejected immediately with
+    parcelhubapi.exceptions.CircuitOpenError.
+
+    After reset_timeout seconds the breaker is half open and lets probe_calls calls
+    through. If they all succeed the breaker closes, if any fails it opens again.
+    A probe that ends without an outcome, for example because it was cancelled,
+    must be given back with cancel(). If a probe is still unfinished reset_timeout
+    seconds after the breaker half opened it opens again, so a lost probe cannot
+    hold the breaker half open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        endpoint="",
+        failure_rate=0.5,
+        minimum_calls=10,
+        window=20,
+        reset_timeout=30,
+        probe_calls=3,
+    ):
+        """
+        Create a circuit breaker.
+
+        Kwargs:
+            endpoint (str): The endpoint the breaker protects.
+            failure_rate (float): The proportion of failed calls, between 0 and 1,
+                at which the breaker opens.
+            minimum_calls (int): The number of calls that must be recorded before
+                the breaker can open.
+            window (int): The number of recent calls used to find the failure rate.
+            reset_timeout (float): The number of seconds the breaker stays open
+                before letting probe calls through.
+            probe_calls (int): The number of successful probe calls needed to close
+                the breaker.
+        """
+        self.endpoint = endpoint
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.probe_calls = probe_calls
+        self.outcomes = collections.deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._half_opened_at = None
+        self._half_opened_at = None
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    @property
+    def state(self):
+        """Return the breaker's state."""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def before_call(self):
+        """
+        Check that a call may be made.
+
+        Raises parcelhubapi.exceptions.CircuitOpenError if the breaker is open, or
+        if it is half open and all the probe calls have been made.
+        """
+        with self._lock:
+            self._update_state()
+            if self._state == self.CLOSED:
+                return
+            if (
+                self._state == self.HALF_OPEN
+                and self._probes_started < self.probe_calls
+            ):
+                self._probes_started += 1
+                return
+            if self._state == self.HALF_OPEN:
+                changes_at = self._half_opened_at + self.reset_timeout
+            else:
+                changes_at = self._opened_at + self.reset_timeout
+            retry_after = max(0.0, changes_at - self.clock())
+            raise exceptions.CircuitOpenError(self.endpoint, retry_after)
+
+    def record(self, response=None, error=None):
+        """
+        Record the outcome of a call allowed by before_call().
+
+        Kwargs:
+            response: The response to the call, if one was received.
+            error (Exception): The exception raised by the call, if any.
+        """
+        failed = self.is_failure(response=response, error=error)
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._probes_succeeded += 1
+                    if self._probes_succeeded >= self.probe_calls:
+                        self._close()
+            elif self._state == self.CLOSED:
+                self.outcomes.append(failed)
+                if self._should_open():
+                    self._open()
+
+    def cancel(self):
+        """Give back a call allowed by before_call() that ended without an outcome."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes_started > 0:
+                self._probes_started -= 1
+
+    def is_failure(self, response=None, error=None):
+        """Return True if a call's outcome shows the endpoint is unhealthy."""
+        if error is not None:
+            if isinstance(error, exceptions.DeadlineExceededError):
+                return False
+            return isinstance(error, OSError)
+        return response.status_code in self.FAILURE_STATUSES
+
+    def _should_open(self):
+        if len(self.outcomes) < self.minimum_calls:
+            return False
+        return sum(self.outcomes) / len(self.outcomes) >= self.failure_rate
+
+    def _update_state(self):
+        if self._state == self.HALF_OPEN:
+            waiting = self._probes_started > self._probes_succeeded
+            if waiting and self.clock() - self._half_opened_at >= self.reset_timeout:
+                self._open()
+            return
+        if self._state != self.OPEN:
+            return
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_opened_at = self.clock()
+            self._probes_started = 0
+            self._probes_succeeded = 0
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._half_opened_at = None
+        self.outcomes.clear()
+
+
+class CircuitBreakers:
+    """
+    A circuit breaker for each endpoint used by a session.
+
+    Breakers are created when an endpoint is first called, using the keyword
+    arguments given to CircuitBreakers.
+    """
+
+    breaker_class = CircuitBreaker
+
+    def __init__(self, **kwargs):
+        """
+        Create a set of circuit breakers.
+
+        Kwargs:
+            Keyword arguments for parcelhubapi.circuitbreaker.CircuitBreaker.
+        """
+        self.kwargs = kwargs
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        """Return the circuit breaker for endpoint."""
+        with self._lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = self.breaker_class(
+                    endpoint=endpoint, **self.kwargs
+                )
+            return self.breakers[endpoint]
+
+    def copy(self):
+        """Return a new CircuitBreakers with the same settings and no state."""
+        return type(self)(**self.kwargs)
@@ -0,0 +1,208 @@
+"""Adaptive concurrency control for the parcelhubapi package."""
+
+import collections
+import threading
+import time
+
+from . import exceptions
+
+
+class ConcurrencyDecision:
+    """A change to the limit made by an AdaptiveConcurrencyLimiter."""
+
+    INCREASE = "increase"
+    DECREASE = "decrease"
+
+    def __init__(self, action, limit, previous_limit, reason, latency, timestamp):
+        """
+        Create a concurrency decision.
+
+        Args:
+            action (str): ConcurrencyDecision.INCREASE or ConcurrencyDecision.DECREASE.
+            limit (int): The concurrency limit after the decision.
+            previous_limit (int): The concurrency limit before the decision.
+            reason (str): Why the limit was changed.
+            latency (float): The latency of the request that caused the decision.
+            timestamp (float): The time of the decision as a Unix timestamp.
+        """
+        self.action = action
+        self.limit = limit
+        self.previous_limit = previous_limit
+        self.reason = reason
+        self.latency = latency
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return (
+            f"ConcurrencyDecision({self.action!r}, {self.previous_limit} -> "
+            f"{self.limit}, {self.reason!r})"
+        )
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit the number of requests in flight using AIMD.
+
+    Additive increase, multiplicative decrease: each healthy response raises the
+    limit by increase / limit, so the limit grows by about increase for every
+    limit's worth of requests. The limit is only raised while at least half of it
+    is in use. A response that signals overload cuts the limit by decrease_factor.
+    Overload is a connection error, a response with a status in OVERLOAD_STATUSES,
+    or a latency above latency_threshold or above latency_tolerance times the
+    lowest recent latency. Other errors, including a spent deadline, neither
+    raise nor cut the limit and their latency is not recorded.
+
+    Only one decrease is made for requests that were in flight together, so a burst
+    of failures caused by the same overload does not collapse the limit.
+    """
+
+    OVERLOAD_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=64,
+        increase=1,
+        decrease_factor=0.5,
+        latency_threshold=None,
+        latency_tolerance=2.0,
+        latency_window=100,
+        history=100,
+    ):
+        """
+        Create an adaptive concurrency limiter.
+
+        Kwargs:
+            initial_limit (int): The number of requests allowed in flight at first.
+            min_limit (int): The lowest the limit can be cut to.
+            max_limit (int): The highest the limit can be raised to.
+            increase (float): How much the limit grows for each limit's worth of
+                healthy responses.
+            decrease_factor (float): The factor the limit is multiplied by on
+                overload.
+            latency_threshold (float): If set, a response slower than this many
+                seconds is treated as overload.
+            latency_tolerance (float): A response slower than this multiple of the
+                lowest recent latency is treated as overload. None disables the
+                check.
+            latency_window (int): The number of recent latencies used to find the
+                lowest recent latency.
+            history (int): The number of decisions to keep in decisions.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.latency_tolerance = latency_tolerance
+        self.latencies = collections.deque(maxlen=latency_window)
+        self.decisions = collections.deque(maxlen=history)
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    @property
+    def limit(self):
+        """Return the number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """Return the number of requests currently in flight."""
+        return self._in_flight
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def acquire(self, deadline=None):
+        """
+        Block until a request can be sent and return a token for release().
+
+        Raises parcelhubapi.exceptions.DeadlineExceededError if no request can be
+        sent before deadline.
+        """
+        with self._condition:
+            while self._in_flight >= self.limit:
+                timeout = None if deadline is None else deadline.remaining()
+                if timeout is not None and timeout <= 0:
+                    raise exceptions.DeadlineExceededError()
+                self._condition.wait(timeout)
+            self._in_flight += 1
+            return (self._generation, self.clock())
+
+    def release(self, token, response=None, error=None):
+        """
+        Record the outcome of a request started with acquire() and adjust the limit.
+
+        Args:
+            token: The value returned by acquire().
+
+        Kwargs:
+            response: The response to the request, if one was received.
+            error (Exception): The exception raised by the request, if any.
+        """
+        generation, started = token
+        latency = self.clock() - started
+        with self._condition:
+            self._in_flight -= 1
+            reason = self.overload_reason(latency, response=response, error=error)
+            if reason is None:
+                if response is not None:
+                    self.latencies.append(latency)
+                    self._increase(latency)
+            elif generation == self._generation:
+                self._decrease(reason, latency)
+            self._condition.notify_all()
+
+    def overload_reason(self, latency, response=None, error=None):
+        """
+        Return why a request's outcome signals overload, or None if it does not.
+
+        A parcelhubapi.exceptions.DeadlineExceededError is the caller's budget
+        running out rather than a sign of overload.
+        """
+        if error is not None:
+            if isinstance(error, exceptions.DeadlineExceededError):
+                return None
+            if isinstance(error, OSError):
+                return f"{type(error).__name__}"
+            return None
+        if response is not None and response.status_code in self.OVERLOAD_STATUSES:
+            return f"status {response.status_code}"
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            return f"latency {latency:.3f}s above threshold"
+        if self.latency_tolerance is not None and self.latencies:
+            baseline = min(self.latencies)
+            if latency > baseline * self.latency_tolerance:
+                return f"latency {latency:.3f}s above baseline {baseline:.3f}s"
+        return None
+
+    def _increase(self, latency):
+        if self._limit >= self.max_limit or self._in_flight + 1 < self._limit / 2:
+            return
+        previous = self.limit
+        self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+        if self.limit != previous:
+            self._record(ConcurrencyDecision.INCREASE, previous, "healthy", latency)
+
+    def _decrease(self, reason, latency):
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self._generation += 1
+        self._record(ConcurrencyDecision.DECREASE, previous, reason, latency)
+
+    def _record(self, action, previous_limit, reason, latency):
+        self.decisions.append(
+            ConcurrencyDecision(
+                action=action,
+                limit=self.limit,
+                previous_limit=previous_limit,
+                reason=reason,
+                latency=latency,
+                timestamp=time.time(),
+            )
+        )
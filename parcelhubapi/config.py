@@ -0,0 +1,65 @@
+"""Configuration file handling for the parcelhubapi package."""
+
+import os
+import threading
+from pathlib import Path
+
+_lock = threading.Lock()
+_config_paths = {}
+_configs = {}
+
+
+def find_config_file(filename, start=None):
+    """
+    Return the path to the nearest file called filename, or None.
+
+    Scan from start, defaulting to the current working directory, towards the
+    filesystem root. A file that is found is remembered for the rest of the
+    process, so later calls from the same directory check only that it still
+    exists.
+    """
+    start = Path.cwd() if start is None else Path(start)
+    key = (start, filename)
+    with _lock:
+        path = _config_paths.get(key)
+    if path is not None and path.exists():
+        return path
+    path = start
+    while path.parent != path:
+        config_file = path / filename
+        if config_file.exists():
+            with _lock:
+                _config_paths[key] = config_file
+            return config_file
+        path = path.parent
+    return None
+
+
+def read_config(path):
+    """
+    Return the parsed contents of the TOML file at path.
+
+    The contents are cached for the rest of the process and the file is parsed
+    again only if its modification time or size changes.
+    """
+    import tomllib
+
+    path = Path(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _configs.get(path)
+    if cached is not None and cached[0] == version:
+        return dict(cached[1])
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    with _lock:
+        _configs[path] = (version, config)
+    return dict(config)
+
+
+def clear_cache():
+    """Forget every remembered config file path and parsed config."""
+    with _lock:
+        _config_paths.clear()
+        _configs.clear()
@@ -0,0 +1,51 @@
+"""Deadline budgets for the parcelhubapi package."""
+
+import time
+
+from . import exceptions
+
+
+class Deadline:
+    """
+    A time budget shared by a series of requests.
+
+    Pass the same Deadline to every call in a batch with the deadline keyword
+    argument. Request timeouts, including those of token renewals, are shortened
+    to fit the remaining budget and calls fail with
+    parcelhubapi.exceptions.DeadlineExceededError once it is spent.
+    """
+
+    def __init__(self, seconds):
+        """
+        Create a deadline.
+
+        Args:
+            seconds (float): The number of seconds from now until the deadline.
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        """Return the number of seconds until the deadline, or 0 if it has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """Return True if the deadline has passed."""
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raise parcelhubapi.exceptions.DeadlineExceededError if expired."""
+        if self.expired():
+            raise exceptions.DeadlineExceededError()
+
+    def timeout(self, timeout):
+        """
+        Return a (connect, read) timeout limited to the remaining budget.
+
+        Args:
+            timeout (tuple): The (connect, read) timeout in seconds of the request.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise exceptions.DeadlineExceededError()
+        connect, read = timeout
+        return (min(connect, remaining), min(read, remaining))
@@ -23,3 +23,52 @@ class ResponseStatusError(ValueError):
     def __init__(self, response, *args, **kwargs):
         """Exception raised when a response has an error status."""
         super().__init__(f"Error response ({response.status_code}): {response.text!r}.")
+
+
+class UnknownAccountError(KeyError):
+    """Exception raised when requesting a session for an unregistered account."""
+
+    def __init__(self, account_id, *args, **kwargs):
+        """Exception raised when requesting a session for an unregistered account."""
+        super().__init__(f"No session registered for account {account_id!r}.")
+
+
+class ConnectError(ConnectionError):
+    """Exception raised when a connection could not be opened to send a request."""
+
+    def __init__(self, message, *args, **kwargs):
+        """Exception raised when a connection could not be opened to send a request."""
+        super().__init__(f"Could not connect: {message}")
+
+
+class DeadlineExceededError(TimeoutError):
+    """Exception raised when a request's deadline budget has been spent."""
+
+    def __init__(self, *args, **kwargs):
+        """Exception raised when a request's deadline budget has been spent."""
+        super().__init__("The request deadline has been exceeded.")
+
+
+class CircuitOpenError(Exception):
+    """Exception raised when a request is rejected by an open circuit breaker."""
+
+    def __init__(self, endpoint, retry_after, *args, **kwargs):
+        """Exception raised when a request is rejected by an open circuit breaker."""
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit open for {endpoint!r}, retry in {retry_after:.1f} seconds."
+        )
+
+
+class WorkerError(Exception):
+    """Exception standing in for an error raised in a worker process."""
+
+    def __init__(self, error_type, message, *args, **kwargs):
+        """Exception standing in for an error raised in a worker process."""
+        self.error_type = error_type
+        self.message = message
+        super().__init__(f"{error_type}: {message}")
+
+    def __reduce__(self):
+        return (type(self), (self.error_type, self.message))
@@ -0,0 +1,227 @@
+"""Hedged requests for the parcelhubapi package."""
+
+import asyncio
+import collections
+import concurrent.futures
+import math
+import threading
+import time
+
+
+class HedgingPolicy:
+    """
+    Send a second, identical request when the first is slower than usual.
+
+    The hedge is sent if the first attempt has not finished after the given
+    percentile of recent latencies, measured from when it started sending. The
+    first successful response is used and the other attempt is cancelled. An
+    exception or a response with a status of 500 or above only wins if both
+    attempts fail. Threads cannot be interrupted, so a losing synchronous
+    attempt runs to completion in the background and its response is discarded;
+    asyncio attempts are cancelled.
+
+    The latencies of successful responses are recorded whether or not they won,
+    and a cancelled asyncio attempt records the time it had already taken, so
+    that hedging does not bias the percentile towards fast responses.
+
+    Counts of requests, hedges sent and hedges that won are kept so the
+    percentile can be tuned against the extra load.
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        initial_delay=1.0,
+        min_delay=0.01,
+        min_samples=20,
+        window=200,
+        max_workers=16,
+    ):
+        """
+        Create a hedging policy.
+
+        Kwargs:
+            percentile (float): The latency percentile after which a hedge is sent.
+            initial_delay (float): The number of seconds to wait before hedging
+                until min_samples latencies have been recorded.
+            min_delay (float): The shortest time in seconds to wait before hedging.
+            min_samples (int): The number of latencies needed to use the percentile.
+            window (int): The number of recent latencies used for the percentile.
+            max_workers (int): The maximum number of threads used to send
+                synchronous requests.
+        """
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def delay(self):
+        """Return the number of seconds to wait before sending a hedge."""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.initial_delay
+            latencies = sorted(self.latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return max(self.min_delay, latencies[max(0, index)])
+
+    def stats(self):
+        """Return a dict of hedging counters."""
+        with self._lock:
+            requests, hedges, hedge_wins = self.requests, self.hedges, self.hedge_wins
+        return {
+            "requests": requests,
+            "hedges": hedges,
+            "hedge_wins": hedge_wins,
+            "hedge_rate": hedges / requests if requests else 0.0,
+        }
+
+    def call(self, send):
+        """
+        Call send, hedging it with a second call if it is slow.
+
+        Args:
+            send (callable): A function that sends the request and returns the
+                response.
+
+        Returns the first response received, or raises the exception of the last
+        attempt to fail.
+        """
+        executor = self._get_executor()
+        delay = self.delay()
+        self._count_request()
+        started = threading.Event()
+        primary = executor.submit(self._timed, send, started)
+        # Time spent queued for a worker thread does not count towards the delay.
+        started.wait()
+        done, _ = concurrent.futures.wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        self._count_hedge()
+        hedge = executor.submit(self._timed, send)
+        pending = {primary, hedge}
+        while True:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            winner = self._winner(done, pending)
+            if winner is not None:
+                for future in pending:
+                    future.cancel()
+                if winner is hedge:
+                    self._count_hedge_win()
+                return winner.result()
+
+    async def call_async(self, send):
+        """
+        Await send(), hedging it with a second call if it is slow.
+
+        Args:
+            send (callable): A coroutine function that sends the request and
+                returns the response.
+
+        Returns the first response received, or raises the exception of the last
+        attempt to fail.
+        """
+        delay = self.delay()
+        self._count_request()
+        primary = asyncio.ensure_future(self._timed_async(send))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            self._count_hedge()
+            hedge = asyncio.ensure_future(self._timed_async(send))
+            pending.add(hedge)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = self._winner(done, pending)
+                if winner is not None:
+                    if winner is hedge:
+                        self._count_hedge_win()
+                    return winner.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        """Shut down the threads used to send synchronous requests."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="parcelhubapi-hedge",
+                )
+            return self._executor
+
+    @classmethod
+    def _winner(cls, done, pending):
+        for future in done:
+            if future.exception() is None and cls.is_success(future.result()):
+                return future
+        if not pending:
+            return next(iter(done))
+        return None
+
+    @staticmethod
+    def is_success(response):
+        """Return True if a response can win a hedged request."""
+        status_code = getattr(response, "status_code", None)
+        return status_code is None or status_code < 500
+
+    def _timed(self, send, started=None):
+        if started is not None:
+            started.set()
+        start = self.clock()
+        response = send()
+        if self.is_success(response):
+            self._record(self.clock() - start)
+        return response
+
+    async def _timed_async(self, send):
+        start = self.clock()
+        try:
+            response = await send()
+        except asyncio.CancelledError:
+            # The attempt would have taken at least this long.
+            self._record(self.clock() - start)
+            raise
+        if self.is_success(response):
+            self._record(self.clock() - start)
+        return response
+
+    def _record(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _count_hedge(self):
+        with self._lock:
+            self.hedges += 1
+
+    def _count_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
@@ -0,0 +1,107 @@
+"""Inter-process locks and shared files for the parcelhubapi package."""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive lock shared between processes using a lock file.
+
+    The lock is re-entrant within a thread, so nested acquisitions do not deadlock.
+    """
+
+    def __init__(self, path):
+        """
+        Create a file lock.
+
+        Args:
+            path (str, pathlib.Path): The path of the lock file. Parent directories
+                are created if they do not exist.
+        """
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.release()
+
+    def acquire(self):
+        """Block until the lock is held."""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                self._lock_file(self._fd)
+            except Exception:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        """Release the lock."""
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _lock_file(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:  # pragma: no cover
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _unlock_file(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:  # pragma: no cover
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def read_json(path, default=None):
+    """Return the JSON data in the file at path, or default if it cannot be read."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    """
+    Atomically replace the file at path with data encoded as JSON.
+
+    Readers see either the old or the new contents, never a partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
@@ -1,5 +1,7 @@
 """Models for the parcelhubapi package."""
 
+import time
+
 from lxml import etree
 
 
@@ -13,6 +15,58 @@ class CreateShipmentResponse:
         self.parcelhub_tracking_number = parcelhub_tracking_number
 
 
+class AccessToken:
+    """Model for Parcelhub access tokens."""
+
+    def __init__(self, access_token, refresh_token, expires_at):
+        """
+        Information about an access token.
+
+        Args:
+            access_token (str): The access token.
+            refresh_token (str): The refresh token.
+            expires_at (float): The time at which the token expires as a Unix
+                timestamp.
+        """
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_expires_in(cls, access_token, refresh_token, expires_in):
+        """Return an AccessToken expiring expires_in seconds from now."""
+        return cls(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            expires_at=time.time() + float(expires_in),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return an AccessToken from a dict created by AccessToken.to_dict."""
+        return cls(
+            access_token=data["access_token"],
+            refresh_token=data["refresh_token"],
+            expires_at=data["expires_at"],
+        )
+
+    def to_dict(self):
+        """Return the token as a dict."""
+        return {
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expires_at": self.expires_at,
+        }
+
+    def expires_in(self):
+        """Return the number of seconds until the token expires."""
+        return self.expires_at - time.time()
+
+    def is_valid(self, margin=0):
+        """Return True if the token will not expire within margin seconds."""
+        return self.expires_in() > margin
+
+
 class BaseXMLModel:
     """Base class for creating XML objects."""
 
@@ -78,6 +132,17 @@ class ShipmentRequest:
         self.packages = []
         self.customs_declaration = None
 
+    def __getstate__(self):
+        """
+        Return the state to pickle.
+
+        The session cannot be pickled and is left out, so a ShipmentRequest sent
+        to another process must be given a session there.
+        """
+        state = self.__dict__.copy()
+        state["session"] = None
+        return state
+
     def as_xml(self):
         """Return the request data as xml.etree.Element."""
         root = etree.Element("Shipment", nsmap=self.session.NSMAP)
@@ -0,0 +1,273 @@
+"""Staged shipment creation pipeline for the parcelhubapi package."""
+
+import queue
+import threading
+import time
+
+from . import batch
+from .batch import ShipmentResult
+
+_STOP = object()
+
+
+class StageStats:
+    """Throughput and queue depth statistics for a pipeline stage."""
+
+    def __init__(self, name, workers):
+        """
+        Create stage statistics.
+
+        Args:
+            name (str): The name of the stage.
+            workers (int): The number of threads running the stage.
+        """
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._queue_depth_total = 0
+        self._queue_depth_samples = 0
+        self._lock = threading.Lock()
+
+    def record_queue_depth(self, depth):
+        """Record the number of items waiting for the stage."""
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._queue_depth_total += depth
+            self._queue_depth_samples += 1
+
+    def record_item(self, seconds, failed=False):
+        """Record an item processed by the stage in seconds."""
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+            if failed:
+                self.failed += 1
+
+    @property
+    def mean_queue_depth(self):
+        """Return the mean number of items waiting for the stage."""
+        if not self._queue_depth_samples:
+            return 0.0
+        return self._queue_depth_total / self._queue_depth_samples
+
+    def report(self, elapsed):
+        """Return a dict of the stage's statistics over elapsed seconds."""
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throughput": self.processed / elapsed if elapsed else 0.0,
+            "utilisation": (
+                self.busy_seconds / (elapsed * self.workers) if elapsed else 0.0
+            ),
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": self.mean_queue_depth,
+        }
+
+
+class _Job:
+    def __init__(self, index, item):
+        self.index = index
+        self.item = item
+        self.shipment_xml = None
+        self.result = ShipmentResult(index, None)
+
+
+class ShipmentPipeline:
+    """
+    Create shipments in stages connected by bounded queues.
+
+    Each item passes through four stages, each run by its own threads:
+
+        build: build(item) returns a ShipmentRequest. Defaults to using the item.
+        serialise: the shipment is serialised to XML.
+        submit: the shipment is created with the Parcelhub API.
+        persist: persist(result) stores the ShipmentResult, if persist is set, and
+            the result is written to sink, if sink is set.
+
+    Serialising the next shipments overlaps with requests waiting on the network.
+    A failure in one stage is stored in the item's result and the remaining stages
+    apart from persist are skipped. A failure in persist is stored in the result's
+    persist_error, as the shipment may already have been created. Bounded queues
+    stop a fast stage running far ahead of a slow one.
+    """
+
+    STAGES = ("build", "serialise", "submit", "persist")
+
+    def __init__(
+        self,
+        get_session,
+        build=None,
+        persist=None,
+        build_workers=1,
+        serialise_workers=2,
+        submit_workers=8,
+        persist_workers=1,
+        queue_size=100,
+        draft=False,
+        sink=None,
+    ):
+        """
+        Create a shipment pipeline.
+
+        Args:
+            get_session (callable): Returns the session used for a shipment when
+                called with its ShipmentRequest.
+
+        Kwargs:
+            build (callable): Returns a parcelhubapi.models.ShipmentRequest for
+                an item. Defaults to treating items as ShipmentRequests.
+            persist (callable): Called with each parcelhubapi.batch.ShipmentResult.
+            build_workers (int): The number of threads building shipments.
+            serialise_workers (int): The number of threads serialising shipments.
+            submit_workers (int): The number of threads sending requests.
+            persist_workers (int): The number of threads persisting results.
+            queue_size (int): The maximum number of items waiting for each stage.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink by the persist stage and the sink is flushed
+                at the end of the run.
+        """
+        self.get_session = get_session
+        self.build = build
+        self.persist = persist
+        self.workers = {
+            "build": build_workers,
+            "serialise": serialise_workers,
+            "submit": submit_workers,
+            "persist": persist_workers,
+        }
+        self.queue_size = queue_size
+        self.draft = draft
+        self.sink = sink
+        self.stats = {}
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """
+        Pass items through the pipeline and return a ShipmentResult for each.
+
+        Results are returned in the order of items.
+        """
+        self.stats = {
+            name: StageStats(name, self.workers[name]) for name in self.STAGES
+        }
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.STAGES]
+        results = []
+        results_lock = threading.Lock()
+
+        def collect(job):
+            with results_lock:
+                results.append(job.result)
+
+        outputs = queues[1:] + [None]
+        threads = []
+        started = time.monotonic()
+        for name, input_queue, output_queue in zip(
+            self.STAGES, queues, outputs, strict=True
+        ):
+            threads.extend(self._start_stage(name, input_queue, output_queue, collect))
+        try:
+            for index, item in enumerate(items):
+                self._put(queues[0], self.stats["build"], _Job(index, item))
+        finally:
+            for _ in range(self.workers["build"]):
+                queues[0].put(_STOP)
+            for thread in threads:
+                thread.join()
+        if self.sink is not None:
+            batch.flush_sink(self.sink)
+        self.elapsed = time.monotonic() - started
+        return sorted(results, key=lambda result: result.index)
+
+    def report(self):
+        """Return a list of dicts of statistics for each stage of the last run."""
+        return [self.stats[name].report(self.elapsed) for name in self.stats]
+
+    def run_build(self, job):
+        """Build the job's ShipmentRequest."""
+        item = job.item
+        job.result.shipment_request = item if self.build is None else self.build(item)
+
+    def run_serialise(self, job):
+        """Serialise the job's shipment."""
+        shipment_request = job.result.shipment_request
+        job.shipment_xml = batch.serialise_shipment(
+            self.get_session(shipment_request), shipment_request, draft=self.draft
+        )
+
+    def run_submit(self, job):
+        """Create the job's shipment."""
+        shipment_request = job.result.shipment_request
+        job.result.response = batch.create_shipment(
+            self.get_session(shipment_request),
+            shipment_request,
+            draft=self.draft,
+            shipment_xml=job.shipment_xml,
+        )
+
+    def run_persist(self, job):
+        """Store the job's result."""
+        try:
+            if self.persist is not None:
+                self.persist(job.result)
+        finally:
+            if self.sink is not None:
+                batch.write_result(self.sink, job.result)
+
+    def _start_stage(self, name, input_queue, output_queue, collect):
+        remaining = [self.workers[name]]
+        lock = threading.Lock()
+        next_name = None
+        if output_queue is not None:
+            next_name = self.STAGES[self.STAGES.index(name) + 1]
+
+        def worker():
+            function = getattr(self, f"run_{name}")
+            stats = self.stats[name]
+            while True:
+                job = input_queue.get()
+                if job is _STOP:
+                    break
+                if job.result.error is None or name == "persist":
+                    started = time.monotonic()
+                    try:
+                        function(job)
+                    except Exception as e:
+                        if name == "persist":
+                            job.result.persist_error = e
+                        elif job.result.error is None:
+                            job.result.error = e
+                        failed = True
+                    else:
+                        failed = False
+                    stats.record_item(time.monotonic() - started, failed=failed)
+                if output_queue is None:
+                    collect(job)
+                else:
+                    self._put(output_queue, self.stats[next_name], job)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and output_queue is not None:
+                for _ in range(self.workers[next_name]):
+                    output_queue.put(_STOP)
+
+        threads = [
+            threading.Thread(
+                target=worker, name=f"parcelhubapi-{name}-{i}", daemon=True
+            )
+            for i in range(self.workers[name])
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _put(stage_queue, stats, job):
+        stats.record_queue_depth(stage_queue.qsize())
+        stage_queue.put(job)
@@ -0,0 +1,258 @@
+"""Multi-account session pool for the parcelhubapi package."""
+
+import threading
+
+from . import batch, exceptions
+from .models import ShipmentRequest
+from .request import (
+    CreateDraftShipmentRequest,
+    CreateShipmentRequest,
+    GetDraftShipmentsRequest,
+    GetShipmentsRequest,
+)
+from .session import ParcelhubAPISession
+from .transport import RequestsTransport
+
+
+class ParcelhubAPISessionPool:
+    """
+    Sessions for several Parcelhub accounts sharing one connection pool.
+
+    Each account has its own ParcelhubAPISession and access token, but every
+    session sends requests through the pool's transport.
+    """
+
+    session_class = ParcelhubAPISession
+
+    def __init__(
+        self,
+        transport=None,
+        token_cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging_policy=None,
+        single_flight=None,
+        response_cache=None,
+        scheduler=None,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_block=False,
+    ):
+        """
+        Create a session pool.
+
+        Kwargs:
+            transport (parcelhubapi.transport.BaseTransport): The transport shared by
+                every session. Defaults to a parcelhubapi.transport.RequestsTransport
+                created with pool_connections, pool_maxsize and pool_block.
+            token_cache (parcelhubapi.token_cache.FileTokenCache): A token cache
+                shared by every session.
+            retry_policy (parcelhubapi.retry.RetryPolicy): The retry policy used
+                by every session for requests that are safe to retry. Defaults
+                to each request class's RETRY_POLICY.
+            rate_limiter (parcelhubapi.ratelimit.RateLimiter): A rate limiter
+                shared by every session.
+            concurrency_limiter
+                (parcelhubapi.concurrency.AdaptiveConcurrencyLimiter): A
+                concurrency limiter for shipment creation shared by every session.
+            circuit_breakers (parcelhubapi.circuitbreaker.CircuitBreakers): Circuit
+                breaker settings. Each session gets its own copy, so an incident
+                affecting one account does not reject requests for the others.
+            hedging_policy (parcelhubapi.hedging.HedgingPolicy): A hedging policy
+                shared by every session. Slow requests for shipment lists are
+                hedged with a second request.
+            single_flight (parcelhubapi.singleflight.SingleFlight): A single
+                flight group shared by every session. Identical concurrent requests
+                for shipment lists share one request.
+            response_cache (parcelhubapi.cache.BaseResponseCache): A response
+                cache shared by every session.
+            scheduler (parcelhubapi.scheduler.RequestScheduler): A scheduler
+                shared by every session, so the concurrency budget is divided
+                fairly between accounts.
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of keep-alive connections to hold
+                open to each host.
+            pool_block (bool): If True, block when every connection to a host is in
+                use instead of opening an extra, unpooled connection.
+        """
+        if transport is None:
+            transport = RequestsTransport(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+        self.transport = transport
+        self.token_cache = token_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breakers = circuit_breakers
+        self.hedging_policy = hedging_policy
+        self.single_flight = single_flight
+        self.response_cache = response_cache
+        self.scheduler = scheduler
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def add_account(self, username, password, account_id):
+        """
+        Register a Parcelhub account and return its session.
+
+        The session authenticates when it sends its first request.
+        """
+        circuit_breakers = None
+        if self.circuit_breakers is not None:
+            circuit_breakers = self.circuit_breakers.copy()
+        session = self.session_class(
+            username=username,
+            password=password,
+            account_id=account_id,
+            transport=self.transport,
+            token_cache=self.token_cache,
+            retry_policy=self.retry_policy,
+            rate_limiter=self.rate_limiter,
+            concurrency_limiter=self.concurrency_limiter,
+            circuit_breakers=circuit_breakers,
+            hedging_policy=self.hedging_policy,
+            single_flight=self.single_flight,
+            response_cache=self.response_cache,
+            scheduler=self.scheduler,
+        )
+        if not session.credentials_are_set():
+            raise exceptions.LoginCredentialsNotSetError()
+        with self._lock:
+            self.sessions[account_id] = session
+        return session
+
+    def get_session(self, account_id):
+        """Return the session for account_id."""
+        try:
+            return self.sessions[account_id]
+        except KeyError:
+            raise exceptions.UnknownAccountError(account_id) from None
+
+    def session_for(self, shipment_request):
+        """Return the pooled session for the account of a ShipmentRequest."""
+        return self.get_session(shipment_request.session.account_id)
+
+    def shipment_request(self, account_id, reference, description, currency):
+        """Return a parcelhubapi.models.ShipmentRequest for account_id."""
+        return ShipmentRequest(
+            session=self.get_session(account_id),
+            reference=reference,
+            description=description,
+            currency=currency,
+        )
+
+    def create_shipment(self, shipment_request, draft=False):
+        """
+        Create a shipment using the session for the shipment's account.
+
+        Args:
+            shipment_request (parcelhubapi.models.ShipmentRequest): The shipment.
+
+        Kwargs:
+            draft (bool): If True, create a draft shipment.
+
+        Returns: parcelhubapi.models.CreateShipmentResponse.
+        """
+        request_class = CreateDraftShipmentRequest if draft else CreateShipmentRequest
+        request = request_class(self.session_for(shipment_request))
+        return request.call(shipment_request=shipment_request)
+
+    def create_shipments(
+        self,
+        shipment_requests,
+        max_workers=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments for any pooled accounts concurrently.
+
+        Each shipment is created with the session for its account.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects.
+
+        Kwargs:
+            max_workers (int): The number of threads sending requests.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        Returns a parcelhubapi.batch.ShipmentResult for each shipment, in the order
+        given, holding either the CreateShipmentResponse or the exception raised.
+        """
+        return batch.create_shipments(
+            shipment_requests,
+            get_session=self.session_for,
+            max_workers=max_workers,
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+
+    def stream_shipments(
+        self,
+        shipment_requests,
+        max_workers=None,
+        window=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments for any pooled accounts from an iterable.
+
+        Each shipment is created with the session for its account and no more
+        than window shipments are held in memory at once.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects, typically from a generator.
+
+        Kwargs:
+            max_workers (int): The number of threads sending requests.
+            window (int): The maximum number of shipments held at once.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        Yields a parcelhubapi.batch.ShipmentResult for each shipment as it
+        completes. See parcelhubapi.batch.stream_shipments.
+        """
+        return batch.stream_shipments(
+            shipment_requests,
+            get_session=self.session_for,
+            max_workers=max_workers,
+            window=window,
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+
+    def get_shipments(self, account_id, draft=False):
+        """Return the shipments for account_id."""
+        request_class = GetDraftShipmentsRequest if draft else GetShipmentsRequest
+        return request_class(self.get_session(account_id)).call()
+
+    def close(self):
+        """Close the shared transport and stop the hedging policy's threads."""
+        if self.hedging_policy is not None:
+            self.hedging_policy.close()
+        self.transport.close()
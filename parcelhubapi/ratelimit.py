@@ -0,0 +1,169 @@
+"""Client side rate limiting for the parcelhubapi package."""
+
+import threading
+import time
+from pathlib import Path
+
+from . import exceptions
+from .locks import FileLock, read_json, write_json
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are added at rate per second up to capacity. Each request reserves a
+    token and waits until the reservation is due, so callers sharing a bucket are
+    spaced out instead of failing.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Create a token bucket.
+
+        Args:
+            rate (float): The number of requests allowed per second.
+
+        Kwargs:
+            capacity (float): The maximum number of requests allowed in a burst.
+                Defaults to rate, or 1 if rate is less than 1.
+        """
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = self.clock()
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def reserve(self, tokens=1, max_wait=None):
+        """
+        Reserve tokens and return the number of seconds to wait before using them.
+
+        If the wait would be longer than max_wait no tokens are reserved and None is
+        returned.
+        """
+        with self._lock:
+            state = {"tokens": self._tokens, "updated": self._updated}
+            delay = self._reserve(state, tokens, max_wait)
+            self._tokens, self._updated = state["tokens"], state["updated"]
+        return delay
+
+    def acquire(self, tokens=1, deadline=None):
+        """
+        Block until tokens are available.
+
+        Raises parcelhubapi.exceptions.DeadlineExceededError, without reserving
+        any tokens, if the wait would pass deadline.
+        """
+        max_wait = None if deadline is None else deadline.remaining()
+        delay = self.reserve(tokens, max_wait=max_wait)
+        if delay is None:
+            raise exceptions.DeadlineExceededError()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _reserve(self, state, tokens, max_wait):
+        now = self.clock()
+        elapsed = max(0.0, now - state["updated"])
+        available = min(self.capacity, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+        state["tokens"] = available
+        delay = max(0.0, (tokens - available) / self.rate)
+        if max_wait is not None and delay > max_wait:
+            return None
+        state["tokens"] = available - tokens
+        return delay
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state is shared between processes through a locked file.
+
+    Every process using a bucket with the same path draws from the same tokens,
+    so together they stay within the limit.
+    """
+
+    def __init__(self, path, rate, capacity=None):
+        """
+        Create a file token bucket.
+
+        Args:
+            path (str, pathlib.Path): The path of the file holding the bucket state.
+            rate (float): The number of requests allowed per second.
+
+        Kwargs:
+            capacity (float): The maximum number of requests allowed in a burst.
+                Defaults to rate, or 1 if rate is less than 1.
+        """
+        super().__init__(rate=rate, capacity=capacity)
+        self.path = Path(path)
+        self.file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds, comparable between processes."""
+        return time.time()
+
+    def reserve(self, tokens=1, max_wait=None):
+        """
+        Reserve tokens and return the number of seconds to wait before using them.
+
+        If the wait would be longer than max_wait no tokens are reserved and None is
+        returned.
+        """
+        with self._lock, self.file_lock:
+            state = self._read()
+            delay = self._reserve(state, tokens, max_wait)
+            self._write(state)
+        return delay
+
+    def _read(self):
+        state = read_json(self.path)
+        if state is None:
+            state = {"tokens": self.capacity, "updated": self.clock()}
+        return state
+
+    def _write(self, state):
+        write_json(self.path, state)
+
+
+class RateLimiter:
+    """
+    Rate limiter with a token bucket for each Parcelhub endpoint.
+
+    Buckets are keyed by request URL, e.g. "1.0/TokenV2", "1.0/Shipment" and
+    "1.0/DraftShipment". Requests to endpoints without a bucket use the default
+    bucket, or are not limited if there is none.
+    """
+
+    def __init__(self, buckets=None, default=None):
+        """
+        Create a rate limiter.
+
+        Kwargs:
+            buckets (dict): TokenBucket objects keyed by endpoint URL.
+            default (TokenBucket): The bucket used for other endpoints.
+        """
+        self.buckets = buckets or {}
+        self.default = default
+
+    def bucket(self, endpoint):
+        """Return the bucket limiting endpoint, or None."""
+        return self.buckets.get(endpoint, self.default)
+
+    def reserve(self, endpoint, max_wait=None):
+        """Reserve a request to endpoint and return the seconds to wait, or None."""
+        bucket = self.bucket(endpoint)
+        if bucket is None:
+            return 0.0
+        return bucket.reserve(max_wait=max_wait)
+
+    def acquire(self, endpoint, deadline=None):
+        """Block until a request to endpoint is allowed."""
+        bucket = self.bucket(endpoint)
+        if bucket is not None:
+            bucket.acquire(deadline=deadline)
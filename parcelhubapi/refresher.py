@@ -0,0 +1,142 @@
+"""Background refreshing of shipment listings for the parcelhubapi package."""
+
+import threading
+import time
+
+from .request import GetDraftShipmentsRequest, GetShipmentsRequest
+
+
+class Snapshot:
+    """The parsed result of a listing request and the time it was fetched."""
+
+    def __init__(self, value, refreshed_at):
+        """
+        Create a snapshot.
+
+        Args:
+            value: The parsed result of the request.
+            refreshed_at (float): The time the result was fetched as a Unix
+                timestamp.
+        """
+        self.value = value
+        self.refreshed_at = refreshed_at
+
+    def age(self):
+        """Return the number of seconds since the snapshot was fetched."""
+        return time.time() - self.refreshed_at
+
+
+class ListingRefresher:
+    """
+    Keep snapshots of shipment listings refreshed in a background thread.
+
+    Reads return the last successfully fetched snapshot without waiting for the
+    network. The listings are fetched again every interval seconds; if a refresh
+    fails the previous snapshot is kept and the exception is stored in
+    last_error.
+    """
+
+    REQUEST_CLASSES = (GetShipmentsRequest, GetDraftShipmentsRequest)
+
+    def __init__(self, session, interval=30, request_classes=None):
+        """
+        Create a listing refresher.
+
+        Args:
+            session (parcelhubapi.ParcelhubAPISession): The session used to fetch
+                the listings.
+
+        Kwargs:
+            interval (float): The number of seconds between refreshes.
+            request_classes (tuple): The listing request classes to refresh.
+                Defaults to ListingRefresher.REQUEST_CLASSES.
+        """
+        self.session = session
+        self.interval = interval
+        self.request_classes = request_classes or self.REQUEST_CLASSES
+        self.snapshots = {}
+        self.last_error = None
+        self._refreshed = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.stop()
+
+    @property
+    def shipments(self):
+        """Return the latest list of shipments, or None if it has not been fetched."""
+        return self.get(GetShipmentsRequest)
+
+    @property
+    def draft_shipments(self):
+        """Return the latest list of draft shipments, or None."""
+        return self.get(GetDraftShipmentsRequest)
+
+    def get(self, request_class):
+        """Return the latest parsed result of request_class, or None."""
+        snapshot = self.snapshots.get(request_class)
+        return None if snapshot is None else snapshot.value
+
+    def start(self):
+        """
+        Start refreshing the listings in a background thread.
+
+        Raises RuntimeError if stop() timed out and the previous thread has not
+        exited yet.
+        """
+        if self._thread is not None:
+            if not self._stopped.is_set():
+                return
+            if self._thread.is_alive():
+                raise RuntimeError("The previous refresh thread is still running.")
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="parcelhubapi-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread and wait for it to finish.
+
+        Returns False if timeout expired before the thread exited.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    def wait(self, timeout=None):
+        """
+        Block until every listing has a snapshot.
+
+        Returns True if the snapshots are available, False if timeout expired.
+        """
+        return self._refreshed.wait(timeout)
+
+    def refresh(self):
+        """Fetch every listing now and replace its snapshot."""
+        for request_class in self.request_classes:
+            request = request_class(self.session)
+            try:
+                request.invalidate_cache()
+                value = request.call()
+            except Exception as e:
+                self.last_error = e
+                continue
+            self.snapshots[request_class] = Snapshot(value, time.time())
+        if len(self.snapshots) == len(self.request_classes):
+            self._refreshed.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.interval)
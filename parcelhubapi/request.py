@@ -1,10 +1,13 @@
 """Parcelhub API requests."""
 
-import requests
+import json
+import time
+
 from lxml import etree
 
 from . import exceptions
-from .models import CreateShipmentResponse
+from .models import AccessToken, CreateShipmentResponse
+from .retry import NO_RETRY, NOT_SENT_RETRY, RetryPolicy
 
 
 class BaseParcelhubApiRequest:
@@ -17,6 +20,30 @@ class BaseParcelhubApiRequest:
 
     METHOD = GET
 
+    URGENT = 0
+    NORMAL = 1
+    BULK = 2
+
+    PRIORITY = NORMAL
+
+    REQUIRES_AUTH = True
+
+    TIMEOUT = (5, 30)
+
+    RETRY_POLICY = RetryPolicy()
+
+    UNSAFE_RETRY_POLICY = NO_RETRY
+
+    CONCURRENCY_LIMITED = False
+
+    HEDGEABLE = False
+
+    COALESCE = False
+
+    CACHEABLE = False
+
+    INVALIDATES = ()
+
     def __init__(self, session):
         """Set request session."""
         self.session = session
@@ -46,18 +73,263 @@ class BaseParcelhubApiRequest:
         """Parse the request response."""
         return response.text
 
-    def call(self, *args, **kwargs):
-        """Make an API request."""
-        response = requests.request(
-            url=self.url(*args, **kwargs),
-            method=self.METHOD,
-            headers=self.headers(*args, **kwargs),
-            params=self.params(*args, **kwargs),
-            data=self.data(*args, **kwargs),
+    def timeout(self, deadline=None):
+        """Return the request's (connect, read) timeout in seconds."""
+        if deadline is None:
+            return self.TIMEOUT
+        return deadline.timeout(self.TIMEOUT)
+
+    def is_retry_safe(self, *args, **kwargs):
+        """Return True if sending the request more than once is safe."""
+        return self.METHOD == self.GET
+
+    def retry_policy(self, *args, **kwargs):
+        """
+        Return the parcelhubapi.retry.RetryPolicy for the request.
+
+        The session's retry policy is used if it has one, otherwise the request's
+        RETRY_POLICY. Requests that are not safe to retry use
+        UNSAFE_RETRY_POLICY, which by default sends them only once.
+        """
+        if not self.is_retry_safe(*args, **kwargs):
+            return self.UNSAFE_RETRY_POLICY
+        return self.session.retry_policy or self.RETRY_POLICY
+
+    def coalescing_key(self, *args, **kwargs):
+        """Return a key identifying identical requests for the same account."""
+        params = self.params(*args, **kwargs) or {}
+        return (
+            self.METHOD,
+            self.url(*args, **kwargs),
+            self.session.account_id,
+            tuple(sorted(params.items())),
         )
+
+    def single_flight(self):
+        """Return the session's single flight group if COALESCE is set, or None."""
+        if not self.COALESCE:
+            return None
+        return self.session.single_flight
+
+    def response_cache(self):
+        """Return the session's response cache if CACHEABLE is set, or None."""
+        if not self.CACHEABLE:
+            return None
+        return self.session.response_cache
+
+    def cache_key(self, *args, **kwargs):
+        """Return the key under which the request's result is cached."""
+        return json.dumps(self.coalescing_key(*args, **kwargs))
+
+    def invalidate_cache(self, *args, **kwargs):
+        """Remove the request's cached result from the session's response cache."""
+        if self.session.response_cache is not None:
+            self.session.response_cache.invalidate(self.cache_key(*args, **kwargs))
+
+    def invalidate_stale_responses(self):
+        """Remove cached results made stale by the request from the response cache."""
+        for request_class in self.INVALIDATES:
+            request_class(self.session).invalidate_cache()
+
+    def call(self, *args, deadline=None, **kwargs):
+        """
+        Make an API request.
+
+        The request body is built once and reused by every attempt. Transient
+        failures are retried according to the request's retry policy. If COALESCE
+        is set and the session has a single flight group, concurrent identical
+        calls share one request and its parsed result. If CACHEABLE is set and the
+        session has a response cache, a cached result is returned if there is
+        one, and a result is not cached if the cache was invalidated while it was
+        fetched. The cached results of the request classes in INVALIDATES are
+        removed after the request succeeds.
+
+        Kwargs:
+            deadline (parcelhubapi.deadline.Deadline): A time budget limiting the
+                request, its retries and any token renewal it needs.
+            priority (int): The scheduling priority of the request. Defaults to
+                PRIORITY.
+        """
+        cache = self.response_cache()
+        if cache is None:
+            value = self._call_shared(*args, deadline=deadline, **kwargs)
+        else:
+            key = self.cache_key(*args, **kwargs)
+            version = cache.version(key)
+            value = cache.get(key)
+            if value is not None:
+                return value
+            value = self._call_shared(*args, deadline=deadline, **kwargs)
+            cache.set_if_current(key, value, version)
+        self.invalidate_stale_responses()
+        return value
+
+    def _call_shared(self, *args, deadline=None, **kwargs):
+        single_flight = self.single_flight()
+        if single_flight is None:
+            return self._call(*args, deadline=deadline, **kwargs)
+        return single_flight.do(
+            self.coalescing_key(*args, **kwargs),
+            lambda: self._call(*args, deadline=deadline, **kwargs),
+            deadline=deadline,
+        )
+
+    def _call(self, *args, deadline=None, **kwargs):
+        url = self.url(*args, **kwargs)
+        params = self.params(*args, **kwargs)
+        data = self.data(*args, **kwargs)
+        retry_policy = self.retry_policy(*args, **kwargs)
+        attempt = 1
+        while True:
+            try:
+                response = self.send_authorised(
+                    url, params, data, *args, deadline=deadline, **kwargs
+                )
+            except Exception as e:
+                delay = retry_policy.retry_delay(attempt, error=e, deadline=deadline)
+                if delay is None:
+                    raise
+            else:
+                delay = retry_policy.retry_delay(
+                    attempt, response=response, deadline=deadline
+                )
+                if delay is None:
+                    break
+            time.sleep(delay)
+            attempt += 1
         self.check_response(response)
         return self.parse_response(response, *args, **kwargs)
 
+    def send_authorised(self, url, params, data, *args, deadline=None, **kwargs):
+        """
+        Send the request with a valid access token and return the response.
+
+        The session's access token is renewed if it is about to expire. If the
+        request is rejected as unauthorised the token is renewed and the request
+        is sent once more.
+        """
+        token = None
+        if self.REQUIRES_AUTH:
+            token = self.session.ensure_token(deadline=deadline)
+        response = self.send(url, params, data, *args, deadline=deadline, **kwargs)
+        if self.REQUIRES_AUTH and response.status_code == 401:
+            self.session.renew_session(stale_token=token, deadline=deadline)
+            response = self.send(url, params, data, *args, deadline=deadline, **kwargs)
+        return response
+
+    def send(self, url, params, data, *args, deadline=None, **kwargs):
+        """
+        Send the request using the session's transport and return the response.
+
+        If the session has circuit breakers, the request is rejected while the
+        endpoint's breaker is open and its outcome is recorded by the breaker. If
+        the session has a rate limiter, wait until it allows a request to the
+        endpoint. If the request is HEDGEABLE and the session has a hedging
+        policy, a slow request is raced against a second, identical request. If
+        the session has a scheduler, wait for the request's turn by priority and
+        account. If the request is CONCURRENCY_LIMITED and the session has a
+        concurrency limiter, wait for a free slot and report the outcome to it.
+        """
+        breaker = self.circuit_breaker()
+        if breaker is None:
+            return self._send_hedged(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        breaker.before_call()
+        try:
+            response = self._send_hedged(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        except Exception as e:
+            breaker.record(error=e)
+            raise
+        except BaseException:
+            breaker.cancel()
+            raise
+        breaker.record(response=response)
+        return response
+
+    def circuit_breaker(self):
+        """Return the session's circuit breaker for the endpoint, or None."""
+        if self.session.circuit_breakers is None:
+            return None
+        return self.session.circuit_breakers.breaker(self.URL)
+
+    def hedging_policy(self):
+        """Return the session's hedging policy if the request is HEDGEABLE, or None."""
+        if not self.HEDGEABLE:
+            return None
+        return self.session.hedging_policy
+
+    def priority(self, *args, **kwargs):
+        """
+        Return the request's scheduling priority, or None if it is not scheduled.
+
+        Lower priorities are sent first by the session's scheduler. A priority
+        keyword argument passed to call() overrides PRIORITY for scheduled
+        requests.
+        """
+        priority = kwargs.get("priority")
+        if priority is None or self.PRIORITY is None:
+            return self.PRIORITY
+        return priority
+
+    def _send_hedged(self, url, params, data, *args, deadline=None, **kwargs):
+        hedging_policy = self.hedging_policy()
+        if hedging_policy is None:
+            return self._send_scheduled(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        return hedging_policy.call(
+            lambda: self._send_scheduled(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        )
+
+    def _send_scheduled(self, url, params, data, *args, deadline=None, **kwargs):
+        scheduler = self.session.scheduler
+        priority = self.priority(*args, **kwargs)
+        if scheduler is None or priority is None:
+            return self._send_limited(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        scheduler.acquire(
+            priority=priority, account_id=self.session.account_id, deadline=deadline
+        )
+        try:
+            return self._send_limited(
+                url, params, data, *args, deadline=deadline, **kwargs
+            )
+        finally:
+            scheduler.release()
+
+    def _send_limited(self, url, params, data, *args, deadline=None, **kwargs):
+        if self.session.rate_limiter is not None:
+            self.session.rate_limiter.acquire(self.URL, deadline=deadline)
+        limiter = None
+        if self.CONCURRENCY_LIMITED:
+            limiter = self.session.concurrency_limiter
+        if limiter is None:
+            return self._send(url, params, data, *args, deadline=deadline, **kwargs)
+        slot = limiter.acquire(deadline=deadline)
+        try:
+            response = self._send(url, params, data, *args, deadline=deadline, **kwargs)
+        except Exception as e:
+            limiter.release(slot, error=e)
+            raise
+        limiter.release(slot, response=response)
+        return response
+
+    def _send(self, url, params, data, *args, deadline=None, **kwargs):
+        return self.session.transport.request(
+            url=url,
+            method=self.METHOD,
+            headers=self.headers(*args, **kwargs),
+            params=params,
+            data=data,
+            timeout=self.timeout(deadline),
+        )
+
     def check_response(self, response):
         """Check the response status code."""
         try:
@@ -71,6 +343,9 @@ class GetTokenRequest(BaseParcelhubApiRequest):
 
     URL = "1.0/TokenV2"
     METHOD = BaseParcelhubApiRequest.POST
+    PRIORITY = None
+    REQUIRES_AUTH = False
+    TIMEOUT = (5, 15)
 
     GRANT_TYPE = "grant_type"
     USERNAME = "username"
@@ -91,6 +366,10 @@ class GetTokenRequest(BaseParcelhubApiRequest):
             "Accept": "*/*",
         }
 
+    def is_retry_safe(self, *args, **kwargs):
+        """Return True, as requesting a token has no side effects."""
+        return True
+
     def data(self, *args, **kwargs):
         """Return the request body."""
         root = etree.Element("RequestToken", nsmap=self.NSMAP)
@@ -100,11 +379,33 @@ class GetTokenRequest(BaseParcelhubApiRequest):
         return etree.tostring(root, encoding="utf-8", xml_declaration=True)
 
     def parse_response(self, response, *args, **kwargs):
-        """Return access token and refresh token."""
-        root = etree.XML(response.text[38:])
-        refresh_token = root.find("refreshToken").text
-        access_token = root.find("access_token").text
-        return access_token, refresh_token
+        """Return a parcelhubapi.models.AccessToken."""
+        try:
+            root = etree.XML(response.text[38:])
+            refresh_token = root.find("refreshToken").text
+            access_token = root.find("access_token").text
+            expires_in = root.find("expiresIn").text
+        except Exception as e:
+            raise exceptions.ResponseParsingError(response.text) from e
+        return AccessToken.from_expires_in(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            expires_in=expires_in,
+        )
+
+
+class RefreshTokenRequest(GetTokenRequest):
+    """Request for renewing an access token using a refresh token."""
+
+    REFRESH_TOKEN = "refreshToken"
+    REFRESH_GRANT = "refresh_token"
+
+    def data(self, *args, **kwargs):
+        """Return the request body."""
+        root = etree.Element("RequestToken", nsmap=self.NSMAP)
+        etree.SubElement(root, self.GRANT_TYPE).text = self.REFRESH_GRANT
+        etree.SubElement(root, self.REFRESH_TOKEN).text = self.session.refresh_token
+        return etree.tostring(root, encoding="utf-8", xml_declaration=True)
 
 
 class GetShipmentsRequest(BaseParcelhubApiRequest):
@@ -112,6 +413,10 @@ class GetShipmentsRequest(BaseParcelhubApiRequest):
 
     URL = "1.0/Shipment"
     METHOD = BaseParcelhubApiRequest.GET
+    PRIORITY = BaseParcelhubApiRequest.BULK
+    HEDGEABLE = True
+    COALESCE = True
+    CACHEABLE = True
 
     def params(self, *args, **kwargs):
         """Return request parameters."""
@@ -129,6 +434,11 @@ class CreateShipmentRequest(BaseParcelhubApiRequest):
 
     URL = "1.0/Shipment"
     METHOD = BaseParcelhubApiRequest.POST
+    TIMEOUT = (5, 60)
+    PRIORITY = BaseParcelhubApiRequest.URGENT
+    CONCURRENCY_LIMITED = True
+    INVALIDATES = (GetShipmentsRequest, GetDraftShipmentsRequest)
+    UNSAFE_RETRY_POLICY = NOT_SENT_RETRY
 
     def params(self, *args, **kwargs):
         """Return request parameters."""
@@ -139,7 +449,14 @@ class CreateShipmentRequest(BaseParcelhubApiRequest):
         }
 
     def data(self, *args, **kwargs):
-        """Return the request body."""
+        """
+        Return the request body.
+
+        A body serialised in advance can be passed as shipment_xml.
+        """
+        shipment_xml = kwargs.get("shipment_xml")
+        if shipment_xml is not None:
+            return shipment_xml
         shipment_request = kwargs["shipment_request"]
         return etree.tostring(
             shipment_request.as_xml(),
@@ -173,3 +490,4 @@ class CreateDraftShipmentRequest(CreateShipmentRequest):
     """Request for creating draft shipments."""
 
     URL = "1.0/DraftShipment"
+    PRIORITY = BaseParcelhubApiRequest.BULK
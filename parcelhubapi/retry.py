@@ -0,0 +1,150 @@
+"""Retry policies for the parcelhubapi package."""
+
+import random
+import time
+
+from . import exceptions
+
+
+class RetryPolicy:
+    """
+    Policy for retrying requests after transient failures.
+
+    Requests are retried after responses with a status in retry_statuses and after
+    connection errors, waiting an exponentially increasing, jittered delay between
+    attempts. A Retry-After header on the response is used as the delay instead.
+    If require_retry_after is set, responses are only retried if they have a
+    Retry-After header.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_factor=0.5,
+        max_backoff=30,
+        jitter=True,
+        retry_statuses=None,
+        retry_exceptions=(OSError,),
+        respect_retry_after=True,
+        require_retry_after=False,
+    ):
+        """
+        Create a retry policy.
+
+        Kwargs:
+            max_attempts (int): The maximum number of times to send a request,
+                including the first attempt.
+            backoff_factor (float): The delay in seconds before the first retry.
+                The delay doubles for each subsequent retry.
+            max_backoff (float): The maximum delay in seconds between attempts.
+            jitter (bool): If True, wait a random time between zero and the
+                backoff delay so that clients retrying together spread out.
+            retry_statuses (tuple): Response status codes to retry. Defaults to
+                RetryPolicy.RETRY_STATUSES.
+            retry_exceptions (tuple): Exceptions raised by the transport to retry.
+            respect_retry_after (bool): If True, wait for the time given in a
+                response's Retry-After header.
+            require_retry_after (bool): If True, only retry responses with a
+                Retry-After header.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        if retry_statuses is None:
+            retry_statuses = self.RETRY_STATUSES
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.respect_retry_after = respect_retry_after
+        self.require_retry_after = require_retry_after
+
+    def is_retryable(self, response=None, error=None):
+        """Return True if a response or exception is a transient failure."""
+        if error is not None:
+            if isinstance(error, exceptions.DeadlineExceededError):
+                return False
+            return isinstance(error, self.retry_exceptions)
+        if response.status_code not in self.retry_statuses:
+            return False
+        if self.require_retry_after:
+            return self.parse_retry_after(response) is not None
+        return True
+
+    def backoff(self, attempt, response=None):
+        """Return the number of seconds to wait after a failed attempt."""
+        if self.respect_retry_after and response is not None:
+            retry_after = self.parse_retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def retry_delay(self, attempt, response=None, error=None, deadline=None):
+        """
+        Return the number of seconds to wait before retrying, or None.
+
+        None is returned if the failure is not transient, if attempt was the last
+        allowed attempt, or if waiting would pass the deadline.
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 1.
+
+        Kwargs:
+            response: The response to the failed attempt.
+            error (Exception): The exception raised by the failed attempt.
+            deadline (parcelhubapi.deadline.Deadline): The request's deadline.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not self.is_retryable(response=response, error=error):
+            return None
+        delay = self.backoff(attempt, response=response)
+        if deadline is not None and delay >= deadline.remaining():
+            return None
+        return delay
+
+    @staticmethod
+    def parse_retry_after(response):
+        """
+        Return the delay requested by a Retry-After header in seconds, or None.
+
+        Transports other than RequestsTransport keep the server's header names as
+        sent, so the header is matched regardless of case.
+        """
+        value = None
+        for name, header_value in response.headers.items():
+            if name.lower() == "retry-after":
+                value = header_value
+                break
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        from email.utils import parsedate_to_datetime
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+NOT_SENT_RETRY = RetryPolicy(
+    retry_statuses=(429, 503),
+    retry_exceptions=(exceptions.ConnectError,),
+    require_retry_after=True,
+)
+"""
+Retry policy for requests that are not safe to send twice.
+
+Only failures showing the request was not processed are retried: connections
+that could not be opened, and 429 or 503 responses with a Retry-After header.
+"""
@@ -0,0 +1,223 @@
+"""Priority and fair share scheduling of requests for the parcelhubapi package."""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from . import exceptions
+
+
+class QueueWait:
+    """The time a request spent queued in a RequestScheduler."""
+
+    def __init__(self, priority, account_id, seconds):
+        """
+        Create a queue wait record.
+
+        Args:
+            priority (int): The priority of the request.
+            account_id (str): The account the request was sent for.
+            seconds (float): The number of seconds the request waited.
+        """
+        self.priority = priority
+        self.account_id = account_id
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"QueueWait({self.priority!r}, {self.account_id!r}, {self.seconds:.3f})"
+
+
+class _Waiter:
+    def __init__(self, priority, account_id, start, finish, enqueued_at):
+        self.priority = priority
+        self.account_id = account_id
+        self.start = start
+        self.finish = finish
+        self.enqueued_at = enqueued_at
+        self.granted = False
+        self.cancelled = False
+        self.notify = None
+
+
+class RequestScheduler:
+    """
+    Share a fixed budget of concurrent requests by priority and account.
+
+    Requests are sent immediately while fewer than max_concurrency are in flight.
+    Otherwise they queue until a request finishes. Queued requests with a lower
+    priority number are always started first. Requests of the same priority are
+    shared between accounts by weighted fair queueing, so an account with a
+    deep backlog cannot starve the others: each account is served in proportion
+    to its weight, however many requests it has queued.
+
+    The time each request spent queued is kept in waits.
+    """
+
+    def __init__(self, max_concurrency=8, weights=None, default_weight=1, history=1000):
+        """
+        Create a request scheduler.
+
+        Kwargs:
+            max_concurrency (int): The number of requests allowed in flight.
+            weights (dict): The share of the budget given to each account ID,
+                relative to the others.
+            default_weight (float): The weight of accounts not in weights.
+            history (int): The number of queue waits to keep in waits.
+        """
+        self.max_concurrency = max_concurrency
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.waits = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._virtual_times = {}
+        self._finish_times = {}
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._queued = 0
+
+    @property
+    def in_flight(self):
+        """Return the number of requests currently in flight."""
+        return self._in_flight
+
+    @property
+    def queued(self):
+        """Return the number of requests waiting to be sent."""
+        return self._queued
+
+    @staticmethod
+    def clock():
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def set_weight(self, account_id, weight):
+        """Set the share of the budget given to account_id."""
+        with self._lock:
+            self.weights[account_id] = weight
+
+    def acquire(self, priority=0, account_id=None, deadline=None):
+        """
+        Block until the request may be sent.
+
+        Every call must be followed by a call to release() once the request
+        finishes. Raises parcelhubapi.exceptions.DeadlineExceededError if the
+        request cannot be sent before deadline.
+
+        Kwargs:
+            priority (int): The priority of the request. Lower numbers are sent
+                first.
+            account_id (str): The account the request is sent for.
+            deadline (parcelhubapi.deadline.Deadline): A time budget for waiting.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(priority, account_id, event.set)
+        if waiter is None:
+            return
+        timeout = None if deadline is None else deadline.remaining()
+        if not event.wait(timeout) and not self._cancel(waiter):
+            raise exceptions.DeadlineExceededError()
+
+    async def acquire_async(self, priority=0, account_id=None, deadline=None):
+        """Wait without blocking the event loop until the request may be sent."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(_set_result, future)
+
+        waiter = self._enqueue(priority, account_id, notify)
+        if waiter is None:
+            return
+        timeout = None if deadline is None else deadline.remaining()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if not self._cancel(waiter):
+                raise exceptions.DeadlineExceededError() from None
+        except asyncio.CancelledError:
+            if self._cancel(waiter):
+                self.release()
+            raise
+
+    def release(self):
+        """Record that a request started by acquire() has finished."""
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def stats(self):
+        """Return a dict of queue wait statistics for each priority."""
+        with self._lock:
+            waits = list(self.waits)
+        by_priority = collections.defaultdict(list)
+        for wait in waits:
+            by_priority[wait.priority].append(wait.seconds)
+        return {
+            priority: {
+                "requests": len(seconds),
+                "mean_wait": sum(seconds) / len(seconds),
+                "max_wait": max(seconds),
+            }
+            for priority, seconds in sorted(by_priority.items())
+        }
+
+    def _weight(self, account_id):
+        return self.weights.get(account_id, self.default_weight)
+
+    def _enqueue(self, priority, account_id, notify):
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._queued:
+                self._in_flight += 1
+                self.waits.append(QueueWait(priority, account_id, 0.0))
+                return None
+            virtual_time = self._virtual_times.get(priority, 0.0)
+            key = (priority, account_id)
+            start = max(virtual_time, self._finish_times.get(key, 0.0))
+            finish = start + 1 / self._weight(account_id)
+            self._finish_times[key] = finish
+            waiter = _Waiter(priority, account_id, start, finish, self.clock())
+            waiter.notify = notify
+            heapq.heappush(
+                self._queues.setdefault(priority, []),
+                (finish, next(self._sequence), waiter),
+            )
+            self._queued += 1
+            return waiter
+
+    def _cancel(self, waiter):
+        """Withdraw a queued request and return True if it was already granted."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._queued -= 1
+            return False
+
+    def _dispatch(self):
+        while self._in_flight < self.max_concurrency and self._queued:
+            priority = min(p for p, queue in self._queues.items() if queue)
+            queue = self._queues[priority]
+            _, _, waiter = heapq.heappop(queue)
+            if waiter.cancelled:
+                continue
+            self._virtual_times[priority] = waiter.start
+            self._queued -= 1
+            self._in_flight += 1
+            waiter.granted = True
+            self.waits.append(
+                QueueWait(
+                    waiter.priority,
+                    waiter.account_id,
+                    self.clock() - waiter.enqueued_at,
+                )
+            )
+            waiter.notify()
+
+
+def _set_result(future):
+    if not future.done():
+        future.set_result(None)
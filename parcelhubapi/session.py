@@ -1,15 +1,23 @@
 """Exceptions for the parcelhupapi package."""
 
-from pathlib import Path
+import os
+import threading
+import time
 
-import toml
+from . import batch, exceptions
+from .config import find_config_file, read_config
+from .request import GetTokenRequest, RefreshTokenRequest
+from .transport import RequestsTransport
 
-from . import exceptions
-from .request import GetTokenRequest
 
+class BaseParcelhubAPISession:
+    """
+    Base class for Parcelhub API sessions.
 
-class ParcelhubAPISession:
-    """Session manager for parcelhubapi."""
+    Holds the credentials, configuration and session hooks shared by
+    ParcelhubAPISession and parcelhubapi.aio.AsyncParcelhubAPISession. Subclasses
+    implement entering the session, authentication and token renewal.
+    """
 
     LIVE_DOMAIN = "https://api.parcelhub.net"
     TEST_DOMAIN = "https://api.test.parcelhub.net"
@@ -24,32 +32,87 @@ class ParcelhubAPISession:
 
     CONFIG_FILENAME = ".parcelhubapi.toml"
 
+    USERNAME_ENVIRONMENT_VARIABLE = "PARCELHUBAPI_USERNAME"
+    PASSWORD_ENVIRONMENT_VARIABLE = "PARCELHUBAPI_PASSWORD"
+    ACCOUNT_ID_ENVIRONMENT_VARIABLE = "PARCELHUBAPI_ACCOUNT_ID"
+
+    TOKEN_EXPIRY_MARGIN = 60
+
     username = None
     password = None
     account_id = None
 
-    access_token = None
-    refresh_token = None
-
-    def __enter__(self):
-        if not self.credentials_are_set():
-            self.load_from_config_file()
-            if not self.credentials_are_set():
-                raise exceptions.LoginCredentialsNotSetError()
-        try:
-            self.authorise_session()
-        except Exception:
-            raise
-        return self
+    token = None
 
-    def __exit__(self, *args, **kwargs):
-        pass
+    def __init__(
+        self,
+        username=None,
+        password=None,
+        account_id=None,
+        transport=None,
+        token_cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        circuit_breakers=None,
+        hedging_policy=None,
+        single_flight=None,
+        response_cache=None,
+        scheduler=None,
+    ):
+        """
+        Create a Parcelhub API session.
 
-    def __init__(self, username=None, password=None, account_id=None):
-        """Create a Parcelhub API session."""
+        Kwargs:
+            username (str): The Parcelhub username.
+            password (str): The Parcelhub password.
+            account_id (str): The Parcelhub account ID.
+            transport: The transport used to send requests.
+            token_cache (parcelhubapi.token_cache.FileTokenCache): If set, access
+                tokens are shared through this cache instead of logging in for every
+                session.
+            retry_policy (parcelhubapi.retry.RetryPolicy): The retry policy used
+                by requests that are safe to retry. Defaults to each request
+                class's RETRY_POLICY.
+            rate_limiter (parcelhubapi.ratelimit.RateLimiter): If set, requests
+                wait until the rate limiter allows them to be sent.
+            circuit_breakers (parcelhubapi.circuitbreaker.CircuitBreakers): If
+                set, requests to an endpoint fail immediately while its circuit
+                breaker is open.
+            hedging_policy (parcelhubapi.hedging.HedgingPolicy): If set, slow
+                requests for shipment lists are hedged with a second request.
+            single_flight (parcelhubapi.singleflight.SingleFlight): If set,
+                identical concurrent requests for shipment lists share one request.
+            response_cache (parcelhubapi.cache.BaseResponseCache): If set,
+                shipment lists are cached and reused until they expire or a
+                shipment is created.
+            scheduler (parcelhubapi.scheduler.RequestScheduler): If set,
+                requests wait for their turn by priority and account before they
+                are sent.
+        """
         self.username = username
         self.password = password
         self.account_id = account_id
+        self.transport = transport
+        self.token_cache = token_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.circuit_breakers = circuit_breakers
+        self.hedging_policy = hedging_policy
+        self.single_flight = single_flight
+        self.response_cache = response_cache
+        self.scheduler = scheduler
+
+    @property
+    def access_token(self):
+        """Return the current access token or None."""
+        token = self.token
+        return None if token is None else token.access_token
+
+    @property
+    def refresh_token(self):
+        """Return the current refresh token or None."""
+        token = self.token
+        return None if token is None else token.refresh_token
 
     def credentials_are_set(self):
         """Return True if all auth credentials are set, otherwise False."""
@@ -58,35 +121,391 @@ class ParcelhubAPISession:
         else:
             return True
 
+    def load_credentials(self):
+        """
+        Load unset login credentials.
+
+        Credentials are taken from environment variables, or from the config file
+        if the environment does not set all of them. Raises
+        parcelhubapi.exceptions.LoginCredentialsNotSetError if any are still not
+        set.
+        """
+        if self.credentials_are_set():
+            return
+        if not self.load_from_environment():
+            self.load_from_config_file()
+        if not self.credentials_are_set():
+            raise exceptions.LoginCredentialsNotSetError()
+
+    def load_from_environment(self):
+        """
+        Set unset login credentials from environment variables.
+
+        Returns True if all login credentials are set afterwards.
+        """
+        if self.username is None:
+            self.username = os.environ.get(self.USERNAME_ENVIRONMENT_VARIABLE)
+        if self.password is None:
+            self.password = os.environ.get(self.PASSWORD_ENVIRONMENT_VARIABLE)
+        if self.account_id is None:
+            self.account_id = os.environ.get(self.ACCOUNT_ID_ENVIRONMENT_VARIABLE)
+        return self.credentials_are_set()
+
     def find_config_filepath(self):
         """
         Return the path to a shopify config file or None.
 
         Recursivly scan backwards from the current working directory and return the
         path to a file matching self.CONFIG_FILENAME if one exists, otherwise returns
-        None.
+        None. The path found is cached for the rest of the process.
         """
         if self.CONFIG_FILENAME is None:
             return None
-        path = Path.cwd()
-        while path.parent != path:
-            config_file = path / self.CONFIG_FILENAME
-            if config_file.exists():
-                return config_file
-            path = path.parent
-        return None
+        return find_config_file(self.CONFIG_FILENAME)
 
     def load_from_config_file(self, config_file_path=None):
-        """Set login credentials as specified in a toml file located at config_file_path."""
+        """
+        Set login credentials as specified in a toml file located at config_file_path.
+
+        If config_file_path is not passed and no config file is found, no
+        credentials are set. The parsed file is cached and read again only when it
+        is modified.
+        """
         if config_file_path is None:
             config_file_path = self.find_config_filepath()
-        with open(config_file_path) as f:
-            config = toml.load(f)
+            if config_file_path is None:
+                return
+        config = read_config(config_file_path)
         self.username = config.get("USERNAME")
         self.password = config.get("PASSWORD")
         self.account_id = config.get("ACCOUNT_ID")
 
-    def authorise_session(self):
+    def get_cached_token(self, stale_token=None):
+        """Return a valid token, other than stale_token, from the cache or None."""
+        token = self.token_cache.get(self.username, self.account_id)
+        if token is None or not token.is_valid(self.TOKEN_EXPIRY_MARGIN):
+            return None
+        if stale_token is not None and token.access_token == stale_token.access_token:
+            return None
+        return token
+
+
+class ParcelhubAPISession(BaseParcelhubAPISession):
+    """Session manager for parcelhubapi."""
+
+    PREWARM_WAIT_TIMEOUT = 30
+
+    prewarm_duration = None
+    prewarm_wait = None
+
+    def __enter__(self):
+        self.load_credentials()
+        if self.prewarm:
+            self.start_prewarm()
+            return self
+        try:
+            self.authorise_session()
+        except Exception:
+            raise
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __init__(
+        self,
+        username=None,
+        password=None,
+        account_id=None,
+        transport=None,
+        token_cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging_policy=None,
+        single_flight=None,
+        response_cache=None,
+        scheduler=None,
+        prewarm=False,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_block=False,
+    ):
+        """
+        Create a Parcelhub API session.
+
+        Kwargs:
+            username (str): The Parcelhub username.
+            password (str): The Parcelhub password.
+            account_id (str): The Parcelhub account ID.
+            transport (parcelhubapi.transport.BaseTransport): The transport used to
+                send requests. Defaults to a parcelhubapi.transport.RequestsTransport
+                created with pool_connections, pool_maxsize and pool_block.
+            token_cache (parcelhubapi.token_cache.FileTokenCache): If set, access
+                tokens are shared through this cache instead of logging in for every
+                session.
+            retry_policy (parcelhubapi.retry.RetryPolicy): The retry policy used
+                by requests that are safe to retry. Defaults to each request
+                class's RETRY_POLICY.
+            rate_limiter (parcelhubapi.ratelimit.RateLimiter): If set, requests
+                wait until the rate limiter allows them to be sent.
+            concurrency_limiter
+                (parcelhubapi.concurrency.AdaptiveConcurrencyLimiter): If set,
+                shipment creation requests wait for a slot from the limiter, which
+                adapts the number in flight to the API's latency and errors.
+            circuit_breakers (parcelhubapi.circuitbreaker.CircuitBreakers): If
+                set, requests to an endpoint fail immediately while its circuit
+                breaker is open.
+            hedging_policy (parcelhubapi.hedging.HedgingPolicy): If set, slow
+                requests for shipment lists are hedged with a second request.
+            single_flight (parcelhubapi.singleflight.SingleFlight): If set,
+                identical concurrent requests for shipment lists share one request.
+            response_cache (parcelhubapi.cache.BaseResponseCache): If set,
+                shipment lists are cached and reused until they expire or a
+                shipment is created.
+            scheduler (parcelhubapi.scheduler.RequestScheduler): If set,
+                requests wait for their turn by priority and account before they
+                are sent.
+            prewarm (bool): If True, entering the session returns immediately and
+                authentication and connection setup run in a background thread.
+                The first request waits for them to finish if necessary.
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of keep-alive connections to hold
+                open to each host.
+            pool_block (bool): If True, block when every connection to a host is in
+                use instead of opening an extra, unpooled connection.
+        """
+        if transport is None:
+            transport = RequestsTransport(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+        super().__init__(
+            username=username,
+            password=password,
+            account_id=account_id,
+            transport=transport,
+            token_cache=token_cache,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            circuit_breakers=circuit_breakers,
+            hedging_policy=hedging_policy,
+            single_flight=single_flight,
+            response_cache=response_cache,
+            scheduler=scheduler,
+        )
+        self.concurrency_limiter = concurrency_limiter
+        self.prewarm = prewarm
+        self._token_lock = threading.RLock()
+        self._prewarm_thread = None
+        self._prewarm_token_ready = threading.Event()
+
+    @property
+    def cold_start_saved(self):
+        """
+        Return the seconds of start up time saved by pre-warming the session.
+
+        Returns None until a request has waited for pre-warming to finish.
+        """
+        if self.prewarm_duration is None or self.prewarm_wait is None:
+            return None
+        return max(0.0, self.prewarm_duration - self.prewarm_wait)
+
+    def start_prewarm(self):
+        """Authenticate and open a connection in a background thread."""
+        self._prewarm_token_ready = threading.Event()
+        self._prewarm_thread = threading.Thread(target=self._prewarm, daemon=True)
+        self._prewarm_thread.start()
+
+    def wait_for_prewarm(self, timeout=None):
+        """
+        Wait for background pre-warming to finish, if it is running.
+
+        Kwargs:
+            timeout (float): The maximum number of seconds to wait. Defaults to
+                PREWARM_WAIT_TIMEOUT.
+        """
+        thread = self._prewarm_thread
+        if thread is None:
+            return
+        thread.join(self.PREWARM_WAIT_TIMEOUT if timeout is None else timeout)
+        if not thread.is_alive() and self._prewarm_thread is thread:
+            self._prewarm_thread = None
+
+    def wait_for_prewarm_token(self):
+        """
+        Wait for background pre-warming to finish authenticating, if it is running.
+
+        Waits at most PREWARM_WAIT_TIMEOUT seconds. The connection opened by
+        pre-warming is not waited for.
+        """
+        thread = self._prewarm_thread
+        if thread is None or thread is threading.current_thread():
+            return
+        started = time.perf_counter()
+        self._prewarm_token_ready.wait(self.PREWARM_WAIT_TIMEOUT)
+        if self.prewarm_wait is None:
+            self.prewarm_wait = time.perf_counter() - started
+
+    def _prewarm(self):
+        started = time.perf_counter()
+        try:
+            try:
+                self.ensure_token()
+            finally:
+                self._prewarm_token_ready.set()
+            self.transport.prewarm(self.DOMAIN)
+        except Exception:
+            # Errors are raised again when the first request authenticates.
+            pass
+        finally:
+            self.prewarm_duration = time.perf_counter() - started
+
+    def close(self):
+        """Close the session's transport and stop its hedging threads."""
+        self.wait_for_prewarm()
+        if self.hedging_policy is not None:
+            self.hedging_policy.close()
+        self.transport.close()
+
+    def create_shipments(
+        self,
+        shipment_requests,
+        max_workers=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments concurrently over the session's pooled connections.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects.
+
+        Kwargs:
+            max_workers (int): The number of threads sending requests.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        Returns a parcelhubapi.batch.ShipmentResult for each shipment, in the order
+        given, holding either the CreateShipmentResponse or the exception raised.
+        """
+        return batch.create_shipments(
+            shipment_requests,
+            get_session=lambda shipment_request: self,
+            max_workers=max_workers,
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+
+    def stream_shipments(
+        self,
+        shipment_requests,
+        max_workers=None,
+        window=None,
+        draft=False,
+        sink=None,
+        priority=None,
+    ):
+        """
+        Create shipments from an iterable without holding the whole batch in memory.
+
+        Args:
+            shipment_requests (iterable): parcelhubapi.models.ShipmentRequest
+                objects, typically from a generator.
+
+        Kwargs:
+            max_workers (int): The number of threads sending requests.
+            window (int): The maximum number of shipments held at once.
+            draft (bool): If True, create draft shipments.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, each result is
+                written to the sink as it completes.
+            priority (int): The scheduling priority of the requests. Defaults to
+                the request class's PRIORITY.
+
+        Yields a parcelhubapi.batch.ShipmentResult for each shipment as it
+        completes. See parcelhubapi.batch.stream_shipments.
+        """
+        return batch.stream_shipments(
+            shipment_requests,
+            get_session=lambda shipment_request: self,
+            max_workers=max_workers,
+            window=window,
+            draft=draft,
+            sink=sink,
+            priority=priority,
+        )
+
+    def authorise_session(self, deadline=None):
         """Request access token and refresh token."""
-        request = GetTokenRequest(self)
-        self.access_token, self.refresh_token = request.call()
+        with self._token_lock:
+            self.token = self.request_token(GetTokenRequest, deadline=deadline)
+
+    def renew_session(self, stale_token=None, deadline=None):
+        """
+        Renew the access token.
+
+        The refresh token is used if one is available. If it is missing or rejected
+        the session logs in with its credentials instead.
+
+        Only one thread renews the token at a time. If stale_token is passed and
+        the session's token has already been replaced while waiting, the token is
+        not renewed again.
+        """
+        with self._token_lock:
+            if stale_token is not None and self.token is not stale_token:
+                return
+            stale_token = self.token
+            if stale_token is None or stale_token.refresh_token is None:
+                self.authorise_session(deadline=deadline)
+                return
+            try:
+                self.token = self.request_token(
+                    RefreshTokenRequest, stale_token=stale_token, deadline=deadline
+                )
+            except exceptions.ResponseStatusError:
+                self.authorise_session(deadline=deadline)
+
+    def ensure_token(self, deadline=None):
+        """
+        Return a valid parcelhubapi.models.AccessToken.
+
+        The token is renewed if it is missing or about to expire. Threads arriving
+        while another thread renews the token wait for, and share, its result.
+        Any renewal request is limited by deadline, if one is passed.
+        """
+        self.wait_for_prewarm_token()
+        token = self.token
+        if token is None or not token.is_valid(self.TOKEN_EXPIRY_MARGIN):
+            with self._token_lock:
+                token = self.token
+                if token is None or not token.is_valid(self.TOKEN_EXPIRY_MARGIN):
+                    self.renew_session(stale_token=token, deadline=deadline)
+                    token = self.token
+        return token
+
+    def request_token(self, request_class, stale_token=None, deadline=None):
+        """
+        Return a new parcelhubapi.models.AccessToken.
+
+        If the session has a token cache, a valid token other than stale_token is
+        taken from the cache if one exists. Otherwise a token is requested with
+        request_class while holding the cache lock and is stored in the cache.
+        """
+        if self.token_cache is None:
+            return request_class(self).call(deadline=deadline)
+        token = self.get_cached_token(stale_token=stale_token)
+        if token is None:
+            with self.token_cache.lock():
+                token = self.get_cached_token(stale_token=stale_token)
+                if token is None:
+                    token = request_class(self).call(deadline=deadline)
+                    self.token_cache.set(self.username, self.account_id, token)
+        return token
@@ -0,0 +1,191 @@
+"""Process sharded bulk shipment creation for the parcelhubapi package."""
+
+import concurrent.futures
+import functools
+import multiprocessing.util
+import pickle
+import tempfile
+from pathlib import Path
+
+from . import batch, exceptions
+from .session import ParcelhubAPISession
+from .token_cache import FileTokenCache
+
+_worker_sessions = {}
+
+
+class ShardedBatchRunner:
+    """
+    Create shipments in worker processes so building and parsing XML use every core.
+
+    Shipments are split into chunks which are sent to a pool of worker processes.
+    Each worker creates one pooled session per account and sends the shipments in
+    a chunk from several threads. Every account is authorised once, before the
+    workers start, and the token is shared with the workers through a
+    parcelhubapi.token_cache.FileTokenCache so that they renew it together.
+
+    Sessions cannot be sent to other processes, so workers use plain
+    ParcelhubAPISession objects with the account's credentials and domain. Rate
+    limiters and other session hooks are not carried over.
+    """
+
+    def __init__(
+        self,
+        processes=None,
+        threads_per_process=4,
+        chunk_size=50,
+        token_cache_path=None,
+        transport_factory=None,
+        draft=False,
+        mp_context=None,
+        sink=None,
+    ):
+        """
+        Create a sharded batch runner.
+
+        Kwargs:
+            processes (int): The number of worker processes. Defaults to the
+                number of CPUs.
+            threads_per_process (int): The number of threads sending requests in
+                each worker.
+            chunk_size (int): The number of shipments sent to a worker at a time.
+            token_cache_path (str, pathlib.Path): The token cache file shared
+                with the workers. Defaults to a temporary file for each run.
+            transport_factory (callable): Called in each worker to create the
+                transport for its sessions. Must be picklable. Defaults to
+                parcelhubapi.transport.RequestsTransport.
+            draft (bool): If True, create draft shipments.
+            mp_context: The multiprocessing context used to start the workers.
+            sink (parcelhubapi.sinks.BaseResultSink): If set, results are
+                written to the sink as each chunk completes and the sink is
+                flushed at the end of the run. Sink errors are stored in each
+                result's sink_error and the sink's last_error.
+        """
+        self.processes = processes
+        self.threads_per_process = threads_per_process
+        self.chunk_size = chunk_size
+        self.token_cache_path = token_cache_path
+        self.transport_factory = transport_factory
+        self.draft = draft
+        self.mp_context = mp_context
+        self.sink = sink
+
+    def run(self, shipment_requests):
+        """
+        Create shipments and return a ShipmentResult for each.
+
+        Each shipment is created for the account of its ShipmentRequest's session.
+        Results are returned in the order of shipment_requests and hold the
+        original ShipmentRequest objects. Exceptions that cannot be sent between
+        processes are replaced with parcelhubapi.exceptions.WorkerError.
+        """
+        shipment_requests = list(shipment_requests)
+        if not shipment_requests:
+            return []
+        if self.token_cache_path is None:
+            with tempfile.TemporaryDirectory() as directory:
+                token_cache_path = Path(directory) / "tokens.json"
+                return self._run(shipment_requests, token_cache_path)
+        return self._run(shipment_requests, self.token_cache_path)
+
+    def _run(self, shipment_requests, token_cache_path):
+        token_cache = FileTokenCache(token_cache_path)
+        accounts = {}
+        for shipment_request in shipment_requests:
+            session = shipment_request.session
+            if session.account_id not in accounts:
+                token = session.ensure_token()
+                token_cache.set(session.username, session.account_id, token)
+                accounts[session.account_id] = {
+                    "username": session.username,
+                    "password": session.password,
+                    "account_id": session.account_id,
+                    "domain": session.DOMAIN,
+                    "token": token,
+                }
+        jobs = [
+            (index, shipment_request.session.account_id, shipment_request)
+            for index, shipment_request in enumerate(shipment_requests)
+        ]
+        chunks = [
+            jobs[i : i + self.chunk_size] for i in range(0, len(jobs), self.chunk_size)
+        ]
+        results = [None] * len(jobs)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(
+                list(accounts.values()),
+                token_cache_path,
+                self.transport_factory,
+            ),
+        ) as executor:
+            create_chunk = functools.partial(
+                _create_chunk, draft=self.draft, max_workers=self.threads_per_process
+            )
+            for chunk_results in executor.map(create_chunk, chunks):
+                for result in chunk_results:
+                    result.shipment_request = shipment_requests[result.index]
+                    results[result.index] = result
+                    if self.sink is not None:
+                        batch.write_result(self.sink, result)
+        if self.sink is not None:
+            batch.flush_sink(self.sink)
+        return results
+
+
+def _init_worker(accounts, token_cache_path, transport_factory):
+    token_cache = FileTokenCache(token_cache_path)
+    transport = None if transport_factory is None else transport_factory()
+    _close_worker_sessions()
+    multiprocessing.util.Finalize(None, _close_worker_sessions, exitpriority=10)
+    for account in accounts:
+        session = ParcelhubAPISession(
+            username=account["username"],
+            password=account["password"],
+            account_id=account["account_id"],
+            transport=transport,
+            token_cache=token_cache,
+        )
+        session.DOMAIN = account["domain"]
+        session.token = account["token"]
+        _worker_sessions[account["account_id"]] = session
+
+
+def _close_worker_sessions():
+    sessions = list(_worker_sessions.values())
+    _worker_sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def _create_chunk(jobs, draft=False, max_workers=None):
+    for _, account_id, shipment_request in jobs:
+        shipment_request.session = _worker_sessions[account_id]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                lambda job: batch.create_shipment_result(
+                    _get_worker_session, job[0], job[2], draft=draft
+                ),
+                jobs,
+            )
+        )
+    for result in results:
+        result.shipment_request = None
+        if result.error is not None:
+            result.error = _picklable_error(result.error)
+    return results
+
+
+def _get_worker_session(shipment_request):
+    return shipment_request.session
+
+
+def _picklable_error(error):
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return exceptions.WorkerError(type(error).__name__, str(error))
+    return error
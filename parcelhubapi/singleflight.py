@@ -0,0 +1,103 @@
+"""Coalescing of identical concurrent requests for the parcelhubapi package."""
+
+import asyncio
+import threading
+
+from . import exceptions
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one execution of a function between concurrent callers with the same key.
+
+    The first caller for a key runs the function. Callers arriving while it runs
+    wait for it to finish and receive the same result or exception. Results are
+    not kept once every caller has been answered.
+    """
+
+    def __init__(self):
+        """Create a single flight group."""
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, deadline=None):
+        """
+        Return the result of function(), sharing it with concurrent calls for key.
+
+        Args:
+            key: A hashable value identifying the call.
+            function (callable): The function to run.
+
+        Kwargs:
+            deadline (parcelhubapi.deadline.Deadline): If set, a caller waiting for
+                another caller's result raises
+                parcelhubapi.exceptions.DeadlineExceededError when it expires.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+        if leader:
+            try:
+                call.result = function()
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+        timeout = None if deadline is None else deadline.remaining()
+        if not call.done.wait(timeout):
+            raise exceptions.DeadlineExceededError()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key, function, deadline=None):
+        """
+        Return the result of await function(), sharing it with concurrent calls.
+
+        Args:
+            key: A hashable value identifying the call.
+            function (callable): The coroutine function to run.
+
+        Kwargs:
+            deadline (parcelhubapi.deadline.Deadline): If set, a caller raises
+                parcelhubapi.exceptions.DeadlineExceededError when it expires.
+                The shared call continues for any other callers.
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(function())
+                task.add_done_callback(lambda _: self._forget_task(key, task))
+                self.calls += 1
+            else:
+                self.shared += 1
+        timeout = None if deadline is None else deadline.remaining()
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise exceptions.DeadlineExceededError() from None
+
+    def _forget_task(self, key, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
@@ -0,0 +1,257 @@
+"""Streaming result sinks for the parcelhubapi package."""
+
+import contextlib
+import csv
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class BaseResultSink:
+    """
+    Base class for sinks receiving shipment results as they complete.
+
+    Results passed to write() are reduced to a row of FIELDS and buffered. The
+    buffer is written out when it holds buffer_size rows, every flush_interval
+    seconds by a background thread, and when the sink is closed. Subclasses
+    implement write_rows(). If a flush started by write() or the background
+    thread fails its rows are kept for the next flush and the exception is
+    stored in last_error, so write() does not raise sink errors.
+    """
+
+    FIELDS = (
+        "index",
+        "reference",
+        "shipment_id",
+        "courier_tracking_number",
+        "parcelhub_tracking_number",
+        "error",
+    )
+
+    def __init__(self, buffer_size=100, flush_interval=1.0):
+        """
+        Create a result sink.
+
+        Kwargs:
+            buffer_size (int): The number of rows buffered before they are
+                written.
+            flush_interval (float): The number of seconds between background
+                flushes. None disables the background thread.
+        """
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.last_error = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    @staticmethod
+    def row(result):
+        """Return a dict of FIELDS for a parcelhubapi.batch.ShipmentResult."""
+        shipment_request = result.shipment_request
+        response = result.response
+        error = result.error
+        return {
+            "index": result.index,
+            "reference": getattr(shipment_request, "reference", None),
+            "shipment_id": getattr(response, "shipment_id", None),
+            "courier_tracking_number": getattr(
+                response, "courier_tracking_number", None
+            ),
+            "parcelhub_tracking_number": getattr(
+                response, "parcelhub_tracking_number", None
+            ),
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+        }
+
+    def write(self, result):
+        """Buffer a parcelhubapi.batch.ShipmentResult to be written."""
+        row = self.row(result)
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.buffer_size
+            start = self._thread is None and self.flush_interval is not None
+            if start:
+                self._thread = threading.Thread(
+                    target=self._run, name="parcelhubapi-sink", daemon=True
+                )
+        if start:
+            self._thread.start()
+        if full:
+            self._flush_quietly()
+
+    def flush(self):
+        """Write every buffered row."""
+        with self._write_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                self.write_rows(rows)
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = rows
+                raise
+
+    def close(self):
+        """Stop the background thread and write every buffered row."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def write_rows(self, rows):
+        """Write a list of row dicts."""
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.last_error = e
+
+
+class JSONLSink(BaseResultSink):
+    """Sink appending each result to a file as a line of JSON."""
+
+    def __init__(self, path, buffer_size=100, flush_interval=1.0):
+        """
+        Create a JSON lines sink.
+
+        Args:
+            path (str, pathlib.Path): The path of the file to append to.
+
+        Kwargs:
+            buffer_size (int): The number of rows buffered before they are
+                written.
+            flush_interval (float): The number of seconds between background
+                flushes.
+        """
+        super().__init__(buffer_size=buffer_size, flush_interval=flush_interval)
+        self.path = Path(path)
+
+    def write_rows(self, rows):
+        """Append rows to the file."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+
+class CSVSink(BaseResultSink):
+    """Sink appending each result to a CSV file with a header row."""
+
+    def __init__(self, path, buffer_size=100, flush_interval=1.0):
+        """
+        Create a CSV sink.
+
+        Args:
+            path (str, pathlib.Path): The path of the file to append to. The
+                header is written if the file is new or empty.
+
+        Kwargs:
+            buffer_size (int): The number of rows buffered before they are
+                written.
+            flush_interval (float): The number of seconds between background
+                flushes.
+        """
+        super().__init__(buffer_size=buffer_size, flush_interval=flush_interval)
+        self.path = Path(path)
+
+    def write_rows(self, rows):
+        """Append rows to the file."""
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+
+
+class SQLiteSink(BaseResultSink):
+    """Sink inserting each result into a table of an SQLite database."""
+
+    def __init__(
+        self, path, table="shipment_results", buffer_size=100, flush_interval=1.0
+    ):
+        """
+        Create an SQLite sink.
+
+        Args:
+            path (str, pathlib.Path): The path of the database file.
+
+        Kwargs:
+            table (str): The name of the table, which is created if it does not
+                exist.
+            buffer_size (int): The number of rows buffered before they are
+                written.
+            flush_interval (float): The number of seconds between background
+                flushes.
+        """
+        super().__init__(buffer_size=buffer_size, flush_interval=flush_interval)
+        self.path = Path(path)
+        self.table = table
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        columns = ", ".join(_quote(field) for field in self.FIELDS)
+        with self._connect() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({columns})"
+            )
+
+    def write_rows(self, rows):
+        """Insert rows into the table."""
+        placeholders = ", ".join(f":{field}" for field in self.FIELDS)
+        with self._connect() as connection:
+            connection.executemany(
+                f"INSERT INTO {_quote(self.table)} VALUES ({placeholders})", rows
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+class CallbackSink(BaseResultSink):
+    """Sink passing each batch of buffered rows to a callback."""
+
+    def __init__(self, callback, buffer_size=100, flush_interval=1.0):
+        """
+        Create a callback sink.
+
+        Args:
+            callback (callable): Called with a list of row dicts each time the
+                buffer is flushed, for example to insert them into a database.
+
+        Kwargs:
+            buffer_size (int): The number of rows buffered before they are
+                written.
+            flush_interval (float): The number of seconds between background
+                flushes.
+        """
+        super().__init__(buffer_size=buffer_size, flush_interval=flush_interval)
+        self.callback = callback
+
+    def write_rows(self, rows):
+        """Pass rows to the callback."""
+        self.callback(rows)
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
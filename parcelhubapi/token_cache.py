@@ -0,0 +1,66 @@
+"""Persistent access token caches for the parcelhubapi package."""
+
+from pathlib import Path
+
+from .locks import FileLock, read_json, write_json
+from .models import AccessToken
+
+
+class FileTokenCache:
+    """
+    Access token cache stored in a JSON file shared between processes.
+
+    Tokens are keyed by username and account ID. Writes are atomic, so the cache
+    can be read without holding the lock. FileTokenCache.lock() is held by a
+    session while it logs in so that concurrent processes wait for and reuse
+    the new token instead of each requesting one.
+    """
+
+    DEFAULT_PATH = Path.home() / ".parcelhubapi_tokens.json"
+
+    def __init__(self, path=None):
+        """
+        Create a file token cache.
+
+        Kwargs:
+            path (str, pathlib.Path): The path of the cache file. Defaults to
+                FileTokenCache.DEFAULT_PATH.
+        """
+        self.path = Path(path or self.DEFAULT_PATH)
+        self.file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    @staticmethod
+    def key(username, account_id):
+        """Return the cache key for a set of credentials."""
+        return f"{username}:{account_id}"
+
+    def lock(self):
+        """Return a context manager holding the cache's inter-process lock."""
+        return self.file_lock
+
+    def get(self, username, account_id):
+        """Return the cached parcelhubapi.models.AccessToken or None."""
+        data = self._read().get(self.key(username, account_id))
+        if data is None:
+            return None
+        return AccessToken.from_dict(data)
+
+    def set(self, username, account_id, token):
+        """Store a parcelhubapi.models.AccessToken in the cache."""
+        with self.lock():
+            data = self._read()
+            data[self.key(username, account_id)] = token.to_dict()
+            self._write(data)
+
+    def delete(self, username, account_id):
+        """Remove a token from the cache if it is present."""
+        with self.lock():
+            data = self._read()
+            if data.pop(self.key(username, account_id), None) is not None:
+                self._write(data)
+
+    def _read(self):
+        return read_json(self.path, default={})
+
+    def _write(self, data):
+        write_json(self.path, data)
@@ -0,0 +1,242 @@
+"""HTTP transports for the parcelhubapi package."""
+
+from urllib.parse import urlencode
+
+from . import exceptions
+
+
+class TransportResponse:
+    """Response returned by transports that do not use requests."""
+
+    def __init__(self, status_code, content=b"", headers=None, url=None):
+        """
+        Create a transport response.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+
+        Kwargs:
+            content (bytes): The response body.
+            headers (dict): The response headers.
+            url (str): The URL that was requested.
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def text(self):
+        """Return the response body as a string."""
+        return self.content.decode("utf-8")
+
+    def raise_for_status(self):
+        """Raise parcelhubapi.exceptions.ResponseStatusError for error responses."""
+        if self.status_code >= 400:
+            raise exceptions.ResponseStatusError(self)
+
+
+class BaseTransport:
+    """Base class for HTTP transports."""
+
+    PREWARM_TIMEOUT = (5, 5)
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        """
+        Send an HTTP request and return the response.
+
+        timeout is a (connect, read) tuple of seconds, or None to wait forever.
+        The returned object must provide status_code, text, headers and
+        raise_for_status().
+        """
+        raise NotImplementedError
+
+    def prewarm(self, url):
+        """
+        Open a pooled connection to url so later requests can reuse it.
+
+        The request is limited by PREWARM_TIMEOUT.
+        """
+        self.request("HEAD", url, timeout=self.PREWARM_TIMEOUT)
+
+    def close(self):
+        """Release any resources held by the transport."""
+        pass
+
+
+class RequestsTransport(BaseTransport):
+    """
+    Transport using a requests.Session with pooled keep-alive connections.
+
+    Failures to open a connection are raised as
+    parcelhubapi.exceptions.ConnectError, as the request was not sent.
+    """
+
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=False):
+        """
+        Create a requests transport.
+
+        Kwargs:
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of keep-alive connections to hold
+                open to each host.
+            pool_block (bool): If True, block when every connection to a host is in
+                use instead of opening an extra, unpooled connection.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.exceptions import NewConnectionError
+
+        self._requests = requests
+        self._new_connection_error = NewConnectionError
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or self.POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or self.POOL_MAXSIZE,
+            pool_block=pool_block,
+        )
+        self.http_session.mount("https://", adapter)
+        self.http_session.mount("http://", adapter)
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        """Send an HTTP request and return a requests.Response."""
+        try:
+            return self.http_session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                data=data,
+                timeout=timeout,
+            )
+        except self._requests.exceptions.ConnectTimeout as e:
+            raise exceptions.ConnectError(str(e)) from e
+        except self._requests.exceptions.ConnectionError as e:
+            reason = getattr(e.args[0] if e.args else None, "reason", None)
+            if isinstance(reason, self._new_connection_error):
+                raise exceptions.ConnectError(str(e)) from e
+            raise
+
+    def close(self):
+        """Close all pooled connections."""
+        self.http_session.close()
+
+
+class Urllib3Transport(BaseTransport):
+    """
+    Transport using a urllib3.PoolManager directly.
+
+    urllib3 errors are raised as the built in TimeoutError and ConnectionError so
+    that they can be retried in the same way as errors from other transports.
+    Failures to open a connection are raised as
+    parcelhubapi.exceptions.ConnectError, as the request was not sent.
+    """
+
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=False):
+        """
+        Create a urllib3 transport.
+
+        Kwargs:
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of keep-alive connections to hold
+                open to each host.
+            pool_block (bool): If True, block when every connection to a host is in
+                use instead of opening an extra, unpooled connection.
+        """
+        import urllib3
+
+        self.urllib3 = urllib3
+        self.pool_manager = urllib3.PoolManager(
+            num_pools=pool_connections or self.POOL_CONNECTIONS,
+            maxsize=pool_maxsize or self.POOL_MAXSIZE,
+            block=pool_block,
+        )
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        """Send an HTTP request and return a TransportResponse."""
+        urllib3 = self.urllib3
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        if timeout is not None:
+            timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        try:
+            response = self.pool_manager.request(
+                method,
+                url,
+                headers=headers,
+                body=data,
+                decode_content=True,
+                timeout=timeout,
+                retries=False,
+            )
+        except urllib3.exceptions.ConnectTimeoutError as e:
+            raise exceptions.ConnectError(str(e)) from e
+        except urllib3.exceptions.TimeoutError as e:
+            raise TimeoutError(str(e)) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise ConnectionError(str(e)) from e
+        return TransportResponse(
+            status_code=response.status,
+            content=response.data,
+            headers=dict(response.headers),
+            url=url,
+        )
+
+    def close(self):
+        """Close all pooled connections."""
+        self.pool_manager.clear()
+
+
+class InMemoryTransport(BaseTransport):
+    """
+    Transport returning canned responses without touching the network.
+
+    Useful for measuring the overhead of building requests and parsing responses.
+    Every request sent is recorded in InMemoryTransport.requests.
+    """
+
+    def __init__(self, default_response=None):
+        """
+        Create an in-memory transport.
+
+        Kwargs:
+            default_response (TransportResponse): The response returned for requests
+                with no matching canned response. If None, unmatched requests return
+                a 404 response.
+        """
+        self.default_response = default_response
+        self.responses = {}
+        self.requests = []
+
+    def add_response(self, method, url, status_code=200, content=b"", headers=None):
+        """Return the given response to requests matching method and url."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.responses[(method, url)] = TransportResponse(
+            status_code=status_code, content=content, headers=headers, url=url
+        )
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        """Record the request and return the matching canned response."""
+        self.requests.append(
+            {
+                "method": method,
+                "url": url,
+                "headers": headers,
+                "params": params,
+                "data": data,
+                "timeout": timeout,
+            }
+        )
+        try:
+            return self.responses[(method, url)]
+        except KeyError:
+            if self.default_response is not None:
+                return self.default_response
+            return TransportResponse(status_code=404, url=url)
@@ -0,0 +1,863 @@
+import asyncio
+import gzip
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.aio import (
+    AsyncCreateDraftShipmentRequest,
+    AsyncCreateShipmentRequest,
+    AsyncGetDraftShipmentsRequest,
+    AsyncGetShipmentsRequest,
+    AsyncGetTokenRequest,
+    AsyncInMemoryTransport,
+    AsyncioTransport,
+    AsyncParcelhubAPISession,
+    AsyncRefreshTokenRequest,
+)
+from parcelhubapi.cache import MemoryCache
+from parcelhubapi.circuitbreaker import CircuitBreakers
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.hedging import HedgingPolicy
+from parcelhubapi.models import AccessToken, CreateShipmentResponse
+from parcelhubapi.request import (
+    CreateDraftShipmentRequest,
+    CreateShipmentRequest,
+    GetDraftShipmentsRequest,
+    GetShipmentsRequest,
+    GetTokenRequest,
+    RefreshTokenRequest,
+)
+from parcelhubapi.retry import NO_RETRY
+from parcelhubapi.scheduler import RequestScheduler
+from parcelhubapi.singleflight import SingleFlight
+from parcelhubapi.token_cache import FileTokenCache
+from parcelhubapi.transport import TransportResponse
+
+
+def token_response_text(access_token):
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<TokenV2 xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        "<refreshToken>REFRESH_TOKEN</refreshToken>"
+        f"<access_token>{access_token}</access_token>"
+        "<expiresIn>14400</expiresIn>"
+        "</TokenV2>"
+    )
+
+
+@pytest.fixture
+def shipment_response_text():
+    path = Path(__file__).parent / "test_requests" / "shipment_response.xml"
+    with open(path) as f:
+        return f.read()
+
+
+class StubServer:
+    """Local HTTP/1.1 server returning canned responses."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        self.connections = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.domain = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *args):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ")
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, target, headers, body))
+                path = target.split("?")[0]
+                status, response_headers, content = self.routes[(method, path)]
+                writer.write(self.response(status, response_headers, content))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    @staticmethod
+    def response(status, headers, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        headers = dict(headers)
+        if headers.get("Transfer-Encoding") == "chunked":
+            middle = len(content) // 2
+            body = b"".join(
+                f"{len(part):x}\r\n".encode() + part + b"\r\n"
+                for part in (content[:middle], content[middle:])
+            )
+            body += b"0\r\n\r\n"
+        else:
+            headers["Content-Length"] = str(len(content))
+            body = content
+        head = f"HTTP/1.1 {status} OK\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        return head.encode() + b"\r\n" + body
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def routes(shipment_response_text):
+    return {
+        ("POST", "/1.0/TokenV2"): (200, {}, token_response_text("ACCESS_TOKEN")),
+        ("GET", "/1.0/Shipment"): (200, {}, "Shipments"),
+        ("GET", "/1.0/DraftShipment"): (
+            200,
+            {"Content-Encoding": "gzip"},
+            gzip.compress(b"Draft Shipments"),
+        ),
+        ("POST", "/1.0/Shipment"): (
+            200,
+            {"Transfer-Encoding": "chunked"},
+            shipment_response_text,
+        ),
+    }
+
+
+def make_session(domain, transport=None, token_cache=None):
+    session = AsyncParcelhubAPISession(
+        username="USERNAME",
+        password="PASSWORD",
+        account_id="ACCOUNT_ID",
+        transport=transport,
+        token_cache=token_cache,
+    )
+    session.DOMAIN = domain
+    return session
+
+
+@pytest.mark.parametrize(
+    "async_class,sync_class",
+    (
+        (AsyncGetTokenRequest, GetTokenRequest),
+        (AsyncRefreshTokenRequest, RefreshTokenRequest),
+        (AsyncGetShipmentsRequest, GetShipmentsRequest),
+        (AsyncGetDraftShipmentsRequest, GetDraftShipmentsRequest),
+        (AsyncCreateShipmentRequest, CreateShipmentRequest),
+        (AsyncCreateDraftShipmentRequest, CreateDraftShipmentRequest),
+    ),
+)
+def test_async_requests_share_sync_request_building(async_class, sync_class):
+    assert issubclass(async_class, sync_class)
+    assert async_class.URL == sync_class.URL
+    assert async_class.METHOD == sync_class.METHOD
+
+
+def test_session_requires_async_with():
+    with pytest.raises(TypeError):
+        with AsyncParcelhubAPISession():
+            pass
+
+
+def test_aenter_without_credentials(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def enter():
+        async with AsyncParcelhubAPISession(transport=AsyncInMemoryTransport()):
+            pass
+
+    with mock.patch.object(AsyncParcelhubAPISession, "find_config_filepath"):
+        with mock.patch.object(AsyncParcelhubAPISession, "load_from_config_file"):
+            with pytest.raises(exceptions.LoginCredentialsNotSetError):
+                run(enter())
+
+
+def test_aenter_with_credentials_from_environment(routes, monkeypatch):
+    monkeypatch.setenv("PARCELHUBAPI_USERNAME", "USERNAME")
+    monkeypatch.setenv("PARCELHUBAPI_PASSWORD", "PASSWORD")
+    monkeypatch.setenv("PARCELHUBAPI_ACCOUNT_ID", "ACCOUNT_ID")
+
+    async def enter():
+        async with StubServer(routes) as server:
+            session = AsyncParcelhubAPISession()
+            session.DOMAIN = server.domain
+            async with session:
+                return session
+
+    with mock.patch.object(
+        AsyncParcelhubAPISession, "load_from_config_file"
+    ) as mock_load_from_config_file:
+        session = run(enter())
+    assert session.username == "USERNAME"
+    assert session.account_id == "ACCOUNT_ID"
+    assert session.access_token == "ACCESS_TOKEN"
+    mock_load_from_config_file.assert_not_called()
+
+
+def test_requests_against_stub_server(routes):
+    async def main():
+        async with StubServer(routes) as server:
+            async with make_session(server.domain) as session:
+                shipments = await AsyncGetShipmentsRequest(session).call()
+                drafts = await AsyncGetDraftShipmentsRequest(session).call()
+            return server, session, shipments, drafts
+
+    server, session, shipments, drafts = run(main())
+    assert session.access_token == "ACCESS_TOKEN"
+    assert shipments == "Shipments"
+    assert drafts == "Draft Shipments"
+    assert server.connections == 1
+    method, target, headers, body = server.requests[1]
+    assert target == "/1.0/Shipment?AccountId=ACCOUNT_ID"
+    assert headers["authorization"] == "bearer ACCESS_TOKEN"
+
+
+def test_create_shipment_against_stub_server(routes):
+    shipment_request = mock.Mock()
+
+    async def main():
+        async with StubServer(routes) as server:
+            async with make_session(server.domain) as session:
+                with mock.patch("parcelhubapi.request.etree.tostring") as tostring:
+                    tostring.return_value = b"<Shipment/>"
+                    response = await AsyncCreateShipmentRequest(session).call(
+                        shipment_request=shipment_request
+                    )
+            return server, response
+
+    server, response = run(main())
+    assert isinstance(response, CreateShipmentResponse)
+    assert server.requests[-1][3] == b"<Shipment/>"
+
+
+def test_concurrent_requests_share_connection_pool(routes):
+    async def main():
+        async with StubServer(routes) as server:
+            session = make_session(server.domain, AsyncioTransport(pool_maxsize=3))
+            async with session:
+                results = await asyncio.gather(
+                    *[AsyncGetShipmentsRequest(session).call() for _ in range(20)]
+                )
+            return server, results
+
+    server, results = run(main())
+    assert results == ["Shipments"] * 20
+    assert server.connections <= 3
+    assert len(server.requests) == 21
+
+
+def test_reconnects_when_idle_connection_is_closed(routes):
+    routes[("GET", "/1.0/Shipment")] = (200, {"Connection": "close"}, "Shipments")
+
+    async def main():
+        async with StubServer(routes) as server:
+            async with make_session(server.domain) as session:
+                for _ in range(3):
+                    await AsyncGetShipmentsRequest(session).call()
+            return server
+
+    server = run(main())
+    assert server.connections == 3
+
+
+def test_concurrent_callers_share_one_login():
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "POST", "https://api.test.com/1.0/TokenV2", content=token_response_text("A")
+    )
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        return await asyncio.gather(
+            *[AsyncGetShipmentsRequest(session).call() for _ in range(10)]
+        )
+
+    assert run(main()) == ["S"] * 10
+    methods = [request["method"] for request in transport.requests]
+    assert methods.count("POST") == 1
+
+
+def test_concurrent_callers_share_one_slow_login():
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "POST", "https://api.test.com/1.0/TokenV2", content=token_response_text("A")
+    )
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    original_request = transport.request
+
+    async def request(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return await original_request(*args, **kwargs)
+
+    transport.request = request
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        return await asyncio.gather(
+            *[AsyncGetShipmentsRequest(session).call() for _ in range(10)]
+        )
+
+    assert run(main()) == ["S"] * 10
+    methods = [request["method"] for request in transport.requests]
+    assert methods.count("POST") == 1
+
+
+def test_unauthorised_request_is_renewed_and_replayed():
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "POST", "https://api.test.com/1.0/TokenV2", content=token_response_text("NEW")
+    )
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", status_code=401)
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.token = AccessToken("OLD", "REFRESH_TOKEN", time.time() + 3600)
+        original_request = transport.request
+
+        async def request(
+            method, url, headers=None, params=None, data=None, timeout=None
+        ):
+            if headers.get("Authorization") == "bearer NEW":
+                transport.add_response(
+                    "GET", "https://api.test.com/1.0/Shipment", content="S"
+                )
+            return await original_request(method, url, headers, params, data, timeout)
+
+        transport.request = request
+        return session, await AsyncGetShipmentsRequest(session).call()
+
+    session, value = run(main())
+    assert value == "S"
+    assert session.access_token == "NEW"
+
+
+def test_refresh_failure_falls_back_to_login():
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "POST",
+        "https://api.test.com/1.0/TokenV2",
+        content=token_response_text("LOGIN"),
+    )
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.token = AccessToken("OLD", "REFRESH_TOKEN", 0)
+        return await session.ensure_token()
+
+    with mock.patch.object(
+        AsyncRefreshTokenRequest,
+        "check_response",
+        side_effect=exceptions.ResponseStatusError(mock.Mock(status_code=400)),
+    ):
+        token = run(main())
+    assert token.access_token == "LOGIN"
+    grants = [b"refresh_token" in request["data"] for request in transport.requests]
+    assert grants == [True, False]
+
+
+def test_token_cache_is_used(tmp_path):
+    token_cache = FileTokenCache(tmp_path / "tokens.json")
+    cached = AccessToken("CACHED", "REFRESH_TOKEN", time.time() + 3600)
+    token_cache.set("USERNAME", "ACCOUNT_ID", cached)
+    transport = AsyncInMemoryTransport()
+
+    async def main():
+        session = make_session("https://api.test.com", transport, token_cache)
+        await session.authorise_session()
+        return session
+
+    session = run(main())
+    assert session.access_token == "CACHED"
+    assert transport.requests == []
+
+
+def test_read_timeout_against_stub_server(routes):
+    class SlowServer(StubServer):
+        async def handle(self, reader, writer):
+            await reader.readline()
+            await asyncio.sleep(1)
+            writer.close()
+
+    async def main():
+        async with SlowServer(routes) as server:
+            transport = AsyncioTransport()
+            await transport.request(
+                "GET", f"{server.domain}/1.0/Shipment", timeout=(1, 0.05)
+            )
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(main())
+
+
+def test_spent_deadline_fails_fast():
+    transport = AsyncInMemoryTransport()
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        await AsyncGetShipmentsRequest(session).call(deadline=Deadline(0))
+
+    with pytest.raises(exceptions.DeadlineExceededError):
+        run(main())
+    assert transport.requests == []
+
+
+def test_transient_errors_are_retried():
+    transport = AsyncInMemoryTransport()
+    responses = [
+        TransportResponse(503),
+        TransportResponse(200, b"S"),
+    ]
+
+    async def request(method, url, headers=None, params=None, data=None, timeout=None):
+        return responses.pop(0)
+
+    transport.request = request
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        return await AsyncGetShipmentsRequest(session).call()
+
+    with mock.patch("parcelhubapi.aio.asyncio.sleep") as mock_sleep:
+        assert run(main()) == "S"
+    mock_sleep.assert_called_once()
+
+
+def test_rate_limiter_delays_requests():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    rate_limiter = mock.Mock()
+    rate_limiter.reserve.return_value = 0.25
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.rate_limiter = rate_limiter
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        return await AsyncGetShipmentsRequest(session).call()
+
+    with mock.patch("parcelhubapi.aio.asyncio.sleep") as mock_sleep:
+        assert run(main()) == "S"
+    rate_limiter.reserve.assert_called_once_with("1.0/Shipment", max_wait=None)
+    mock_sleep.assert_called_once_with(0.25)
+
+
+def test_rate_limiter_runs_off_event_loop():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    threads = []
+
+    def reserve(endpoint, max_wait=None):
+        threads.append(threading.get_ident())
+        return 0
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.rate_limiter = mock.Mock(reserve=reserve)
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        return await AsyncGetShipmentsRequest(session).call()
+
+    assert run(main()) == "S"
+    assert len(threads) == 1
+    assert threads[0] != threading.get_ident()
+
+
+def test_scheduler_limits_concurrent_requests():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    request = transport.request
+    in_flight = []
+
+    async def slow_request(*args, **kwargs):
+        in_flight.append(scheduler.in_flight)
+        await asyncio.sleep(0.01)
+        return await request(*args, **kwargs)
+
+    transport.request = slow_request
+    scheduler = RequestScheduler(max_concurrency=2)
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.scheduler = scheduler
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        return await asyncio.gather(
+            *(AsyncGetShipmentsRequest(session).call() for _ in range(5))
+        )
+
+    assert run(main()) == ["S"] * 5
+    assert max(in_flight) == 2
+    assert scheduler.in_flight == 0
+    assert scheduler.stats()[GetShipmentsRequest.BULK]["requests"] == 5
+
+
+def test_open_circuit_breaker_rejects_requests():
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "GET", "https://api.test.com/1.0/Shipment", status_code=503, content=""
+    )
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.circuit_breakers = CircuitBreakers(
+            minimum_calls=1, window=1, probe_calls=1
+        )
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        session.retry_policy = NO_RETRY
+        request = AsyncGetShipmentsRequest(session)
+        with pytest.raises(exceptions.ResponseStatusError):
+            await request.call()
+        with pytest.raises(exceptions.CircuitOpenError):
+            await request.call()
+
+    run(main())
+    assert len(transport.requests) == 1
+
+
+def test_cancelled_probe_does_not_hold_circuit_breaker_open():
+    transport = AsyncInMemoryTransport()
+    url = "https://api.test.com/1.0/Shipment"
+    transport.add_response("GET", url, status_code=503, content="")
+    request = transport.request
+    hang = asyncio.Event()
+
+    async def hanging_request(*args, **kwargs):
+        await hang.wait()
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.circuit_breakers = CircuitBreakers(
+            minimum_calls=1, window=1, probe_calls=1, reset_timeout=0.05
+        )
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        session.retry_policy = NO_RETRY
+        with pytest.raises(exceptions.ResponseStatusError):
+            await AsyncGetShipmentsRequest(session).call()
+        await asyncio.sleep(0.06)
+        transport.request = hanging_request
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(AsyncGetShipmentsRequest(session).call(), 0.01)
+        transport.request = request
+        transport.add_response("GET", url, content="S")
+        return await AsyncGetShipmentsRequest(session).call()
+
+    assert run(main()) == "S"
+
+
+def test_slow_shipment_requests_are_hedged():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    request = transport.request
+    delays = iter([1, 0])
+
+    async def slow_request(*args, **kwargs):
+        await asyncio.sleep(next(delays))
+        return await request(*args, **kwargs)
+
+    transport.request = slow_request
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.hedging_policy = HedgingPolicy(initial_delay=0.05)
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        assert await AsyncGetShipmentsRequest(session).call() == "S"
+        return session.hedging_policy.stats()
+
+    stats = run(main())
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_identical_shipment_requests_are_coalesced():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.single_flight = SingleFlight()
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        return await asyncio.gather(
+            *(AsyncGetShipmentsRequest(session).call() for _ in range(3))
+        )
+
+    assert run(main()) == ["S", "S", "S"]
+    assert len(transport.requests) == 1
+
+
+def test_shipment_list_is_cached():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.response_cache = MemoryCache()
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        first = await AsyncGetShipmentsRequest(session).call()
+        second = await AsyncGetShipmentsRequest(session).call()
+        return first, second
+
+    assert run(main()) == ("S", "S")
+    assert len(transport.requests) == 1
+
+
+class ThreadRecordingCache(MemoryCache):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value):
+        self.threads.add(threading.get_ident())
+        super().set(key, value)
+
+    def delete(self, key):
+        self.threads.add(threading.get_ident())
+        super().delete(key)
+
+
+def test_response_cache_is_used_off_event_loop():
+    transport = AsyncInMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    cache = ThreadRecordingCache()
+
+    async def main():
+        session = make_session("https://api.test.com", transport)
+        session.response_cache = cache
+        session.token = AccessToken("A", "R", time.time() + 3600)
+        await AsyncGetShipmentsRequest(session).call()
+        with mock.patch.object(
+            AsyncCreateShipmentRequest, "_call_shared", return_value="CREATED"
+        ):
+            await AsyncCreateShipmentRequest(session).call(shipment_request=None)
+
+    run(main())
+    assert cache.threads
+    assert threading.get_ident() not in cache.threads
+
+
+class DroppingServer(StubServer):
+    """Stub server closing a kept-alive connection after reading its second request."""
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        handled = 0
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ")
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, target))
+                handled += 1
+                if handled == 2:
+                    break
+                status, response_headers, content = self.routes[(method, target)]
+                writer.write(self.response(status, response_headers, content))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+@pytest.mark.parametrize("method", ("GET", "POST"))
+def test_closed_connection_is_only_resent_for_idempotent_requests(routes, method):
+    routes[("POST", "/1.0/Shipment")] = (200, {}, "Created")
+
+    async def main():
+        async with DroppingServer(routes) as server:
+            transport = AsyncioTransport()
+            url = f"{server.domain}/1.0/Shipment"
+            await transport.request(method, url)
+            try:
+                return server, await transport.request(method, url)
+            except ConnectionError:
+                return server, None
+            finally:
+                await transport.close()
+
+    server, response = run(main())
+    if method == "GET":
+        assert response.status_code == 200
+        assert len(server.requests) == 3
+    else:
+        assert response is None
+        assert len(server.requests) == 2
+
+
+def test_connection_failure_raises_connect_error():
+    async def main():
+        server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        await AsyncioTransport().request("POST", f"http://127.0.0.1:{port}/")
+
+    with pytest.raises(exceptions.ConnectError):
+        run(main())
+
+
+def test_token_is_requested_while_holding_cache_lock(tmp_path):
+    token_cache = FileTokenCache(tmp_path / "tokens.json")
+    transport = AsyncInMemoryTransport()
+    transport.add_response(
+        "POST", "https://api.test.com/1.0/TokenV2", content=token_response_text("NEW")
+    )
+    request = transport.request
+    lock_depths = []
+
+    async def locked_request(*args, **kwargs):
+        lock_depths.append(token_cache.file_lock._depth)
+        return await request(*args, **kwargs)
+
+    transport.request = locked_request
+
+    async def main():
+        session = make_session("https://api.test.com", transport, token_cache)
+        await session.authorise_session()
+        return session
+
+    session = run(main())
+    assert session.access_token == "NEW"
+    assert lock_depths == [1]
+    assert token_cache.file_lock._depth == 0
+    assert token_cache.get("USERNAME", "ACCOUNT_ID").access_token == "NEW"
+
+
+def test_session_rejects_concurrency_limiter():
+    with pytest.raises(TypeError):
+        AsyncParcelhubAPISession(concurrency_limiter=mock.Mock())
+
+
+async def create_shipment(self, shipment_request, deadline=None, priority=None):
+    if shipment_request.reference == "REF-3":
+        raise ConnectionError("Failed")
+    await asyncio.sleep(0.001 * (int(shipment_request.reference[4:]) % 3))
+    return shipment_request.reference
+
+
+@pytest.fixture
+def mock_create_shipment():
+    with mock.patch.object(
+        AsyncCreateShipmentRequest, "call", autospec=True, side_effect=create_shipment
+    ) as m:
+        yield m
+
+
+@pytest.fixture
+def shipment_requests():
+    return [mock.Mock(reference=f"REF-{i}") for i in range(10)]
+
+
+def test_create_shipments(mock_create_shipment, shipment_requests):
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    sink = mock.Mock()
+    results = run(session.create_shipments(shipment_requests, sink=sink))
+    assert [result.index for result in results] == list(range(10))
+    assert results[0].response == "REF-0"
+    assert isinstance(results[3].error, ConnectionError)
+    assert sink.write.call_count == 10
+    sink.flush.assert_called_once_with()
+
+
+def test_create_shipments_writes_sink_off_event_loop(
+    mock_create_shipment, shipment_requests
+):
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    threads = set()
+    sink = mock.Mock()
+    sink.write.side_effect = lambda result: threads.add(threading.get_ident())
+    run(session.create_shipments(shipment_requests, sink=sink))
+    assert threads
+    assert threading.get_ident() not in threads
+
+
+def test_create_shipments_limits_concurrency(mock_create_shipment, shipment_requests):
+    in_flight = []
+    peak = []
+
+    async def call(self, shipment_request, deadline=None, priority=None):
+        in_flight.append(shipment_request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.001)
+        in_flight.remove(shipment_request)
+
+    mock_create_shipment.side_effect = call
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    run(session.create_shipments(shipment_requests, max_concurrency=2))
+    assert max(peak) == 2
+
+
+def test_create_draft_shipments(shipment_requests):
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    with mock.patch.object(
+        AsyncCreateDraftShipmentRequest, "call", autospec=True, return_value=None
+    ) as mock_call:
+        run(session.create_shipments(shipment_requests[:1], draft=True))
+    mock_call.assert_called_once()
+
+
+def test_stream_shipments(mock_create_shipment, shipment_requests):
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    sink = mock.Mock()
+
+    async def main():
+        return [
+            result
+            async for result in session.stream_shipments(
+                shipment_requests, max_concurrency=2, sink=sink
+            )
+        ]
+
+    results = run(main())
+    assert sorted(result.index for result in results) == list(range(10))
+    assert sink.write.call_count == 10
+    sink.flush.assert_called_once_with()
+
+
+def test_stream_shipments_holds_window(mock_create_shipment):
+    produced = []
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            yield mock.Mock(reference=f"REF-{i}")
+
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+
+    async def main():
+        results = session.stream_shipments(produce(), max_concurrency=2, window=3)
+        await results.__anext__()
+        await results.aclose()
+
+    run(main())
+    assert len(produced) == 3
+
+
+def test_create_shipments_passes_priority(mock_create_shipment, shipment_requests):
+    session = make_session("https://api.test.com", AsyncInMemoryTransport())
+    run(session.create_shipments(shipment_requests[:2], priority=2))
+    for call in mock_create_shipment.call_args_list:
+        assert call.kwargs["priority"] == 2
@@ -0,0 +1,299 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import batch
+from parcelhubapi.batch import ShipmentResult
+from parcelhubapi.models import CreateShipmentResponse
+from parcelhubapi.session import ParcelhubAPISession
+
+
+@pytest.fixture
+def session():
+    return ParcelhubAPISession(
+        username="USERNAME",
+        password="PASSWORD",
+        account_id="ACCOUNT_ID",
+        transport=mock.Mock(),
+    )
+
+
+@pytest.fixture
+def shipment_requests():
+    return [mock.Mock(reference=f"REF-{i}") for i in range(20)]
+
+
+def response_for(shipment_request):
+    return CreateShipmentResponse(
+        shipment_id=shipment_request.reference,
+        courier_tracking_number="COURIER",
+        parcelhub_tracking_number="PARCELHUB",
+    )
+
+
+@pytest.fixture
+def mock_create_shipment():
+    def create_shipment(
+        session, shipment_request, draft=False, deadline=None, priority=None
+    ):
+        time.sleep(0.001 * (hash(shipment_request.reference) % 5))
+        if shipment_request.reference == "REF-3":
+            raise ConnectionError("Failed")
+        return response_for(shipment_request)
+
+    with mock.patch(
+        "parcelhubapi.batch.create_shipment", side_effect=create_shipment
+    ) as m:
+        yield m
+
+
+def test_shipment_result_ok():
+    assert ShipmentResult(0, None, response="RESPONSE").ok is True
+    assert ShipmentResult(0, None, error=ValueError()).ok is False
+
+
+def test_shipment_result_repr():
+    assert repr(ShipmentResult(1, None, error=ValueError("x"))) == (
+        "ShipmentResult(1, error=ValueError('x'))"
+    )
+
+
+@pytest.mark.parametrize(
+    "draft,request_class",
+    ((False, "CreateShipmentRequest"), (True, "CreateDraftShipmentRequest")),
+)
+def test_create_shipment(session, draft, request_class):
+    shipment_request = mock.Mock()
+    with mock.patch(f"parcelhubapi.batch.{request_class}") as mock_request:
+        response = batch.create_shipment(session, shipment_request, draft=draft)
+    mock_request.assert_called_once_with(session)
+    mock_request.return_value.call.assert_called_once_with(
+        shipment_request=shipment_request, deadline=None
+    )
+    assert response == mock_request.return_value.call.return_value
+
+
+def test_create_shipments_returns_ordered_results(
+    session, shipment_requests, mock_create_shipment
+):
+    results = session.create_shipments(iter(shipment_requests), max_workers=4)
+    assert [result.index for result in results] == list(range(20))
+    assert [result.shipment_request for result in results] == shipment_requests
+    for result in results:
+        if result.shipment_request.reference == "REF-3":
+            assert isinstance(result.error, ConnectionError)
+            assert result.response is None
+        else:
+            assert result.ok
+            assert result.response.shipment_id == result.shipment_request.reference
+
+
+def test_create_shipments_passes_priority(
+    session, shipment_requests, mock_create_shipment
+):
+    session.create_shipments(shipment_requests, priority=2)
+    for call in mock_create_shipment.call_args_list:
+        assert call.kwargs["priority"] == 2
+
+
+def test_stream_shipments_passes_priority(
+    session, shipment_requests, mock_create_shipment
+):
+    list(session.stream_shipments(shipment_requests, priority=2))
+    for call in mock_create_shipment.call_args_list:
+        assert call.kwargs["priority"] == 2
+
+
+def test_create_shipment_passes_priority(session):
+    with mock.patch("parcelhubapi.batch.CreateShipmentRequest") as mock_request:
+        batch.create_shipment(session, "SHIPMENT", priority=2)
+    mock_request.return_value.call.assert_called_once_with(
+        shipment_request="SHIPMENT", deadline=None, priority=2
+    )
+
+
+def test_create_shipments_uses_session(
+    session, shipment_requests, mock_create_shipment
+):
+    session.create_shipments(shipment_requests, draft=True)
+    for call in mock_create_shipment.call_args_list:
+        assert call.args[0] is session
+        assert call.kwargs == {"draft": True, "priority": None}
+
+
+def test_create_shipments_runs_concurrently(session, shipment_requests):
+    barrier = threading.Barrier(4, timeout=1)
+
+    def create_shipment(
+        session, shipment_request, draft=False, deadline=None, priority=None
+    ):
+        barrier.wait()
+        return response_for(shipment_request)
+
+    with mock.patch("parcelhubapi.batch.create_shipment", side_effect=create_shipment):
+        results = session.create_shipments(shipment_requests[:8], max_workers=4)
+    assert all(result.ok for result in results)
+
+
+def test_create_shipments_with_no_shipments(session):
+    assert session.create_shipments([]) == []
+
+
+def test_stream_shipments_yields_every_result(
+    session, shipment_requests, mock_create_shipment
+):
+    results = list(
+        session.stream_shipments(
+            (sr for sr in shipment_requests), max_workers=4, window=6
+        )
+    )
+    assert sorted(result.index for result in results) == list(range(20))
+    for result in results:
+        assert result.shipment_request is shipment_requests[result.index]
+    errors = [result for result in results if not result.ok]
+    assert [result.shipment_request.reference for result in errors] == ["REF-3"]
+
+
+def test_stream_shipments_uses_session(
+    session, shipment_requests, mock_create_shipment
+):
+    list(session.stream_shipments(shipment_requests, draft=True))
+    for call in mock_create_shipment.call_args_list:
+        assert call.args[0] is session
+        assert call.kwargs == {"draft": True, "priority": None}
+
+
+def test_stream_shipments_limits_shipments_held(session, mock_create_shipment):
+    produced = []
+    consumed = []
+
+    def produce():
+        for i in range(50):
+            produced.append(i)
+            assert len(produced) - len(consumed) <= 5
+            yield mock.Mock(reference=f"REF-{i}")
+
+    for result in batch.stream_shipments(
+        produce(), get_session=lambda sr: session, max_workers=2, window=5
+    ):
+        consumed.append(result.index)
+    assert sorted(consumed) == list(range(50))
+
+
+def test_stream_shipments_applies_backpressure(session, mock_create_shipment):
+    produced = []
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            yield mock.Mock(reference=f"REF-{i}")
+
+    results = batch.stream_shipments(
+        produce(), get_session=lambda sr: session, max_workers=2, window=4
+    )
+    next(results)
+    time.sleep(0.05)
+    assert len(produced) == 4
+    results.close()
+    assert len(produced) == 4
+
+
+def test_stream_shipments_cancels_pending_shipments_when_closed(session):
+    started = threading.Event()
+    release = threading.Event()
+
+    def create_shipment(session, shipment_request, draft=False, priority=None):
+        started.set()
+        release.wait(1)
+        return response_for(shipment_request)
+
+    shipment_requests = [mock.Mock(reference=f"REF-{i}") for i in range(10)]
+    with mock.patch(
+        "parcelhubapi.batch.create_shipment", side_effect=create_shipment
+    ) as mock_create_shipment:
+        results = batch.stream_shipments(
+            shipment_requests, get_session=lambda sr: session, max_workers=1
+        )
+        release.set()
+        next(results)
+        results.close()
+    assert mock_create_shipment.call_count < 10
+
+
+def test_stream_shipments_default_window(session, mock_create_shipment):
+    produced = []
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            yield mock.Mock(reference=f"REF-{i}")
+
+    results = batch.stream_shipments(
+        produce(), get_session=lambda sr: session, max_workers=3
+    )
+    next(results)
+    assert len(produced) == 6
+    results.close()
+
+
+def test_stream_shipments_with_no_shipments(session):
+    assert list(session.stream_shipments([])) == []
+
+
+def test_create_shipments_writes_results_to_sink(
+    session, shipment_requests, mock_create_shipment
+):
+    sink = mock.Mock()
+    results = session.create_shipments(shipment_requests, sink=sink)
+    written = [call.args[0] for call in sink.write.call_args_list]
+    assert sorted(written, key=lambda result: result.index) == results
+    sink.flush.assert_called_once_with()
+
+
+def test_stream_shipments_writes_results_to_sink(
+    session, shipment_requests, mock_create_shipment
+):
+    sink = mock.Mock()
+    results = list(session.stream_shipments(shipment_requests, sink=sink))
+    written = [call.args[0] for call in sink.write.call_args_list]
+    assert sorted(written, key=lambda result: result.index) == sorted(
+        results, key=lambda result: result.index
+    )
+    sink.flush.assert_called_once_with()
+
+
+def test_create_shipments_keeps_results_when_sink_fails(
+    session, shipment_requests, mock_create_shipment
+):
+    error = OSError("Disk full")
+    sink = mock.Mock()
+    sink.write.side_effect = error
+    sink.flush.side_effect = error
+    results = session.create_shipments(shipment_requests, sink=sink)
+    assert [result.index for result in results] == list(range(20))
+    assert all(result.sink_error is error for result in results)
+    assert results[0].ok
+    assert sink.last_error is error
+
+
+def test_stream_shipments_keeps_results_when_sink_fails(
+    session, shipment_requests, mock_create_shipment
+):
+    error = OSError("Disk full")
+    sink = mock.Mock()
+    sink.write.side_effect = error
+    sink.flush.side_effect = error
+    results = list(session.stream_shipments(shipment_requests, sink=sink))
+    assert sorted(result.index for result in results) == list(range(20))
+    assert all(result.sink_error is error for result in results)
+    assert sink.last_error is error
+
+
+def test_write_result():
+    sink = mock.Mock()
+    result = ShipmentResult(0, mock.Mock())
+    batch.write_result(sink, result)
+    sink.write.assert_called_once_with(result)
+    assert result.sink_error is None
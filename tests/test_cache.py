@@ -0,0 +1,159 @@
+import multiprocessing
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import ParcelhubAPISession
+from parcelhubapi.cache import FileCache, MemoryCache, SQLiteCache
+from parcelhubapi.models import AccessToken
+from parcelhubapi.request import CreateShipmentRequest, GetShipmentsRequest
+from parcelhubapi.transport import InMemoryTransport
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def cache(request, tmp_path, clock):
+    if request.param == "memory":
+        cache = MemoryCache(ttl=60, max_entries=3)
+    elif request.param == "sqlite":
+        cache = SQLiteCache(tmp_path / "cache.sqlite", ttl=60, max_entries=3)
+    else:
+        cache = FileCache(tmp_path / "cache", ttl=60, max_entries=3)
+    with mock.patch.object(type(cache), "clock", clock):
+        yield cache
+
+
+def test_get_missing_key(cache):
+    assert cache.get("missing") is None
+
+
+def test_set_and_get(cache):
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+
+def test_set_replaces_value(cache):
+    cache.set("key", "old")
+    cache.set("key", "new")
+    assert cache.get("key") == "new"
+
+
+def test_entries_expire(cache, clock):
+    cache.set("key", "value")
+    clock.now += 59
+    assert cache.get("key") == "value"
+    clock.now += 1
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.get("c") == "c"
+    assert cache.get("d") == "d"
+
+
+def test_delete(cache):
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("key")
+    assert cache.get("key") is None
+
+
+def test_clear(cache):
+    cache.set("a", "a")
+    cache.set("b", "b")
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def _set_in_process(path, key, value):
+    SQLiteCache(path).set(key, value)
+
+
+def test_invalidate(cache):
+    cache.set("key", "value")
+    version = cache.version("key")
+    cache.invalidate("key")
+    assert cache.get("key") is None
+    assert cache.version("key") == version + 1
+    assert cache.version("other") == 0
+
+
+def test_set_if_current(cache):
+    version = cache.version("key")
+    assert cache.set_if_current("key", "value", version) is True
+    assert cache.get("key") == "value"
+
+
+def test_set_if_current_after_invalidation(cache):
+    version = cache.version("key")
+    cache.invalidate("key")
+    assert cache.set_if_current("key", "stale", version) is False
+    assert cache.get("key") is None
+
+
+def test_sqlite_cache_is_shared_between_processes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    process = multiprocessing.Process(
+        target=_set_in_process, args=(path, "key", "value")
+    )
+    process.start()
+    process.join()
+    assert SQLiteCache(path).get("key") == "value"
+
+
+def test_file_cache_is_shared_between_instances(tmp_path):
+    FileCache(tmp_path).set("key", ["value"])
+    assert FileCache(tmp_path).get("key") == ["value"]
+
+
+@pytest.fixture
+def session():
+    transport = InMemoryTransport()
+    transport.add_response("GET", "https://api.test.com/1.0/Shipment", content="S")
+    session = ParcelhubAPISession(
+        username="USERNAME",
+        password="PASSWORD",
+        account_id="ACCOUNT_ID",
+        transport=transport,
+        response_cache=MemoryCache(),
+    )
+    session.DOMAIN = "https://api.test.com"
+    session.token = AccessToken("A", "R", time.time() + 3600)
+    return session
+
+
+def test_shipment_list_is_cached(session):
+    assert GetShipmentsRequest(session).call() == "S"
+    assert GetShipmentsRequest(session).call() == "S"
+    assert len(session.transport.requests) == 1
+
+
+def test_creating_shipment_invalidates_shipment_list(session):
+    GetShipmentsRequest(session).call()
+    CreateShipmentRequest(session).invalidate_stale_responses()
+    GetShipmentsRequest(session).call()
+    assert len(session.transport.requests) == 2
+
+
+def test_listing_fetched_before_invalidation_is_not_cached(session):
+    send = session.transport.request
+
+    def request(*args, **kwargs):
+        response = send(*args, **kwargs)
+        CreateShipmentRequest(session).invalidate_stale_responses()
+        return response
+
+    session.transport.request = request
+    assert GetShipmentsRequest(session).call() == "S"
+    session.transport.request = send
+    GetShipmentsRequest(session).call()
+    assert len(session.transport.requests) == 2
@@ -0,0 +1,196 @@
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.circuitbreaker import CircuitBreaker, CircuitBreakers
+
+
+@pytest.fixture
+def clock(clock):
+    with mock.patch.object(CircuitBreaker, "clock", clock):
+        yield clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        endpoint="1.0/Shipment",
+        failure_rate=0.5,
+        minimum_calls=4,
+        window=4,
+        reset_timeout=30,
+        probe_calls=2,
+    )
+
+
+def response(status_code=200):
+    return mock.Mock(status_code=status_code)
+
+
+def call(breaker, status_code=200):
+    breaker.before_call()
+    breaker.record(response=response(status_code))
+
+
+def trip(breaker):
+    for _ in range(4):
+        call(breaker, 503)
+
+
+def test_breaker_starts_closed(breaker):
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_does_not_open_before_minimum_calls(breaker):
+    for _ in range(3):
+        call(breaker, 503)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_at_failure_rate(breaker):
+    call(breaker)
+    call(breaker)
+    call(breaker, 500)
+    assert breaker.state == CircuitBreaker.CLOSED
+    call(breaker, 500)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_uses_recent_calls(breaker):
+    for _ in range(8):
+        call(breaker)
+    assert list(breaker.outcomes) == [False] * 4
+
+
+def test_client_errors_are_not_failures(breaker):
+    for _ in range(4):
+        call(breaker, 400)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_connection_errors_are_failures(breaker):
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(error=ConnectionError())
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_deadline_errors_are_not_failures(breaker):
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(error=exceptions.DeadlineExceededError())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_breaker_rejects_calls(breaker, clock):
+    trip(breaker)
+    clock.now += 10
+    with pytest.raises(exceptions.CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.endpoint == "1.0/Shipment"
+    assert excinfo.value.retry_after == 20
+
+
+def test_breaker_half_opens_after_reset_timeout(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_half_open_breaker_limits_probe_calls(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.before_call()
+    with pytest.raises(exceptions.CircuitOpenError):
+        breaker.before_call()
+
+
+def test_successful_probes_close_breaker(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    call(breaker)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    call(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not breaker.outcomes
+
+
+def test_failed_probe_reopens_breaker(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    call(breaker)
+    call(breaker, 503)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(exceptions.CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+
+def test_cancelled_probe_is_given_back(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.before_call()
+    breaker.cancel()
+    breaker.cancel()
+    call(breaker)
+    call(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancel_does_not_affect_closed_breaker(breaker):
+    breaker.before_call()
+    breaker.cancel()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not breaker.outcomes
+
+
+def test_unfinished_probe_reopens_breaker_after_reset_timeout(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.before_call()
+    clock.now += 10
+    with pytest.raises(exceptions.CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 20
+    clock.now += 20
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    call(breaker)
+    call(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_idle_half_open_breaker_stays_half_open(breaker, clock):
+    trip(breaker)
+    clock.now += 90
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_late_results_do_not_affect_open_breaker(breaker, clock):
+    trip(breaker)
+    breaker.record(response=response())
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_circuit_breakers_create_breaker_per_endpoint():
+    breakers = CircuitBreakers(minimum_calls=5)
+    shipment = breakers.breaker("1.0/Shipment")
+    assert breakers.breaker("1.0/Shipment") is shipment
+    draft = breakers.breaker("1.0/DraftShipment")
+    assert draft is not shipment
+    assert draft.endpoint == "1.0/DraftShipment"
+    assert draft.minimum_calls == 5
+
+
+def test_circuit_breakers_copy():
+    breakers = CircuitBreakers(minimum_calls=5)
+    breakers.breaker("1.0/Shipment")
+    copy = breakers.copy()
+    assert copy.kwargs == breakers.kwargs
+    assert copy.breakers == {}
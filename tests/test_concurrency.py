@@ -0,0 +1,163 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.concurrency import AdaptiveConcurrencyLimiter, ConcurrencyDecision
+from parcelhubapi.deadline import Deadline
+
+
+@pytest.fixture
+def clock(clock):
+    with mock.patch.object(AdaptiveConcurrencyLimiter, "clock", clock):
+        yield clock
+
+
+def response(status_code=200):
+    return mock.Mock(status_code=status_code)
+
+
+def run_batch(limiter, clock, latency=1, status_code=200):
+    slots = [limiter.acquire() for _ in range(limiter.limit)]
+    clock.now += latency
+    for slot in slots:
+        limiter.release(slot, response=response(status_code))
+
+
+def test_initial_limit_is_clamped():
+    assert AdaptiveConcurrencyLimiter(initial_limit=100, max_limit=10).limit == 10
+    assert AdaptiveConcurrencyLimiter(initial_limit=0, min_limit=2).limit == 2
+
+
+def test_acquire_counts_requests_in_flight(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+    slot = limiter.acquire()
+    assert limiter.in_flight == 1
+    limiter.release(slot, response=response())
+    assert limiter.in_flight == 0
+
+
+def test_limit_increases_while_healthy(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    for _ in range(3):
+        run_batch(limiter, clock)
+    assert limiter.limit == 5
+    decision = limiter.decisions[-1]
+    assert decision.action == ConcurrencyDecision.INCREASE
+    assert decision.previous_limit == 4
+    assert decision.limit == 5
+
+
+def test_limit_does_not_increase_when_unused(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    for _ in range(20):
+        first, second = limiter.acquire(), limiter.acquire()
+        limiter.release(first, response=response())
+        limiter.release(second, response=response())
+        limiter.release(limiter.acquire(), response=response())
+    assert limiter.limit == 4
+    assert not limiter.decisions
+
+
+def test_limit_does_not_exceed_max_limit(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=5)
+    for _ in range(10):
+        run_batch(limiter, clock)
+    assert limiter.limit == 5
+
+
+@pytest.mark.parametrize("status_code", [429, 502, 503, 504])
+def test_limit_decreases_on_overload_status(clock, status_code):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    limiter.release(limiter.acquire(), response=response(status_code))
+    assert limiter.limit == 4
+    decision = limiter.decisions[-1]
+    assert decision.action == ConcurrencyDecision.DECREASE
+    assert decision.reason == f"status {status_code}"
+
+
+def test_limit_decreases_on_connection_error(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    limiter.release(limiter.acquire(), error=ConnectionError())
+    assert limiter.limit == 4
+    assert limiter.decisions[-1].reason == "ConnectionError"
+
+
+def test_other_errors_are_not_overload(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    limiter.release(limiter.acquire(), error=ValueError())
+    assert limiter.limit == 8
+
+
+def test_deadline_exceeded_is_not_overload(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    limiter.release(limiter.acquire(), error=exceptions.DeadlineExceededError())
+    assert limiter.limit == 8
+    assert list(limiter.decisions) == []
+
+
+def test_errors_do_not_record_latency_or_raise_limit(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, increase=1)
+    for error in (ValueError(), exceptions.DeadlineExceededError()):
+        limiter.release(limiter.acquire(), error=error)
+    assert limiter.limit == 1
+    assert list(limiter.latencies) == []
+
+
+def test_limit_decreases_once_per_batch(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    run_batch(limiter, clock, status_code=503)
+    assert limiter.limit == 4
+    run_batch(limiter, clock, status_code=503)
+    assert limiter.limit == 2
+
+
+def test_limit_does_not_go_below_min_limit(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+    limiter.release(limiter.acquire(), response=response(429))
+    assert limiter.limit == 2
+
+
+def test_limit_decreases_above_latency_threshold(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_threshold=5)
+    slot = limiter.acquire()
+    clock.now += 6
+    limiter.release(slot, response=response())
+    assert limiter.limit == 4
+    assert "above threshold" in limiter.decisions[-1].reason
+
+
+def test_limit_decreases_above_latency_baseline(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_tolerance=2)
+    run_batch(limiter, clock, latency=1)
+    limit = limiter.limit
+    slot = limiter.acquire()
+    clock.now += 3
+    limiter.release(slot, response=response())
+    assert limiter.limit == limit // 2
+    assert "above baseline" in limiter.decisions[-1].reason
+
+
+def test_acquire_raises_at_deadline(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    limiter.acquire()
+    with pytest.raises(exceptions.DeadlineExceededError):
+        limiter.acquire(deadline=Deadline(0.01))
+
+
+def test_acquire_waits_for_release():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    slot = limiter.acquire()
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(slot, response=response())
+    assert acquired.wait(1)
+    thread.join()
@@ -0,0 +1,84 @@
+import os
+import tomllib
+
+import pytest
+
+from parcelhubapi import config
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    config.clear_cache()
+    yield
+    config.clear_cache()
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text('USERNAME = "USERNAME"\n')
+    return path
+
+
+def test_find_config_file_in_start_directory(config_file):
+    assert config.find_config_file("config.toml", config_file.parent) == config_file
+
+
+def test_find_config_file_in_parent_directory(config_file):
+    start = config_file.parent / "a" / "b"
+    start.mkdir(parents=True)
+    assert config.find_config_file("config.toml", start) == config_file
+
+
+def test_find_config_file_returns_none_without_file(tmp_path):
+    assert config.find_config_file("config.toml", tmp_path) is None
+
+
+def test_find_config_file_caches_path(config_file, monkeypatch):
+    start = config_file.parent / "a" / "b"
+    start.mkdir(parents=True)
+    config.find_config_file("config.toml", start)
+    exists = []
+    original_exists = type(config_file).exists
+
+    def record_exists(path):
+        exists.append(path)
+        return original_exists(path)
+
+    monkeypatch.setattr(type(config_file), "exists", record_exists)
+    assert config.find_config_file("config.toml", start) == config_file
+    assert exists == [config_file]
+
+
+def test_find_config_file_searches_again_if_file_is_removed(config_file):
+    config.find_config_file("config.toml", config_file.parent)
+    config_file.unlink()
+    assert config.find_config_file("config.toml", config_file.parent) is None
+
+
+def test_find_config_file_uses_cwd(config_file, monkeypatch):
+    monkeypatch.chdir(config_file.parent)
+    assert config.find_config_file("config.toml") == config_file
+
+
+def test_read_config(config_file):
+    assert config.read_config(config_file) == {"USERNAME": "USERNAME"}
+
+
+def test_read_config_caches_contents(config_file, monkeypatch):
+    config.read_config(config_file)
+    monkeypatch.setattr(tomllib, "load", None)
+    assert config.read_config(config_file) == {"USERNAME": "USERNAME"}
+
+
+def test_read_config_reads_modified_file(config_file):
+    config.read_config(config_file)
+    config_file.write_text('USERNAME = "NEW_USERNAME"\n')
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert config.read_config(config_file) == {"USERNAME": "NEW_USERNAME"}
+
+
+def test_read_config_returns_copy(config_file):
+    config.read_config(config_file)["USERNAME"] = "CHANGED"
+    assert config.read_config(config_file) == {"USERNAME": "USERNAME"}
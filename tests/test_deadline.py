@@ -0,0 +1,57 @@
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+
+
+@pytest.fixture
+def mock_monotonic():
+    with mock.patch("parcelhubapi.deadline.time.monotonic") as m:
+        m.return_value = 100
+        yield m
+
+
+def test_remaining(mock_monotonic):
+    deadline = Deadline(10)
+    mock_monotonic.return_value = 104
+    assert deadline.remaining() == 6
+
+
+def test_remaining_after_deadline(mock_monotonic):
+    deadline = Deadline(10)
+    mock_monotonic.return_value = 111
+    assert deadline.remaining() == 0
+
+
+def test_expired(mock_monotonic):
+    deadline = Deadline(10)
+    assert deadline.expired() is False
+    mock_monotonic.return_value = 110
+    assert deadline.expired() is True
+
+
+def test_check(mock_monotonic):
+    deadline = Deadline(10)
+    deadline.check()
+    mock_monotonic.return_value = 110
+    with pytest.raises(exceptions.DeadlineExceededError):
+        deadline.check()
+
+
+def test_timeout_within_budget(mock_monotonic):
+    assert Deadline(100).timeout((5, 30)) == (5, 30)
+
+
+def test_timeout_is_limited_to_remaining_budget(mock_monotonic):
+    deadline = Deadline(10)
+    mock_monotonic.return_value = 107
+    assert deadline.timeout((5, 30)) == (3, 3)
+
+
+def test_timeout_after_deadline(mock_monotonic):
+    deadline = Deadline(10)
+    mock_monotonic.return_value = 110
+    with pytest.raises(exceptions.DeadlineExceededError):
+        deadline.timeout((5, 30))
@@ -1,3 +1,4 @@
+import pickle
 import re
 from unittest import mock
 
@@ -30,3 +31,39 @@ def test_response_status_error():
         match=re.escape("Error response (500): 'Invalid Response'."),
     ):
         raise exceptions.ResponseStatusError(response)
+
+
+def test_unknown_account_error():
+    with pytest.raises(
+        exceptions.UnknownAccountError,
+        match=re.escape("No session registered for account 'ACCOUNT_ID'."),
+    ):
+        raise exceptions.UnknownAccountError("ACCOUNT_ID")
+
+
+def test_deadline_exceeded_error():
+    with pytest.raises(
+        exceptions.DeadlineExceededError,
+        match=re.escape("The request deadline has been exceeded."),
+    ):
+        raise exceptions.DeadlineExceededError
+
+
+def test_circuit_open_error():
+    with pytest.raises(
+        exceptions.CircuitOpenError,
+        match=re.escape("Circuit open for '1.0/Shipment', retry in 12.5 seconds."),
+    ) as excinfo:
+        raise exceptions.CircuitOpenError("1.0/Shipment", 12.5)
+    assert excinfo.value.endpoint == "1.0/Shipment"
+    assert excinfo.value.retry_after == 12.5
+
+
+def test_worker_error():
+    with pytest.raises(
+        exceptions.WorkerError, match=re.escape("ValueError: Invalid value")
+    ) as excinfo:
+        raise exceptions.WorkerError("ValueError", "Invalid value")
+    error = pickle.loads(pickle.dumps(excinfo.value))
+    assert error.error_type == "ValueError"
+    assert error.message == "Invalid value"
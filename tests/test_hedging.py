@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi.hedging import HedgingPolicy
+
+
+@pytest.fixture
+def policy():
+    policy = HedgingPolicy(initial_delay=0.05, min_samples=4)
+    yield policy
+    policy.close()
+
+
+def slow_then_fast(delays, results):
+    calls = iter(zip(delays, results, strict=True))
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            delay, result = next(calls)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return send
+
+
+def test_delay_uses_initial_delay_without_samples(policy):
+    assert policy.delay() == 0.05
+
+
+def test_delay_uses_latency_percentile():
+    policy = HedgingPolicy(percentile=90, min_samples=10, min_delay=0)
+    policy.latencies.extend(float(i) for i in range(1, 11))
+    assert policy.delay() == 9
+
+
+def test_delay_is_at_least_min_delay():
+    policy = HedgingPolicy(min_samples=1, min_delay=0.5)
+    policy.latencies.append(0.1)
+    assert policy.delay() == 0.5
+
+
+def test_fast_request_is_not_hedged(policy):
+    send = slow_then_fast([0], ["FIRST"])
+    assert policy.call(send) == "FIRST"
+    assert policy.stats() == {
+        "requests": 1,
+        "hedges": 0,
+        "hedge_wins": 0,
+        "hedge_rate": 0.0,
+    }
+    assert len(policy.latencies) == 1
+
+
+def test_slow_request_is_hedged(policy):
+    send = slow_then_fast([1, 0], ["FIRST", "HEDGE"])
+    assert policy.call(send) == "HEDGE"
+    assert policy.stats() == {
+        "requests": 1,
+        "hedges": 1,
+        "hedge_wins": 1,
+        "hedge_rate": 1.0,
+    }
+
+
+def test_first_response_wins_after_hedge(policy):
+    send = slow_then_fast([0.1, 1], ["FIRST", "HEDGE"])
+    assert policy.call(send) == "FIRST"
+    assert policy.stats()["hedges"] == 1
+    assert policy.stats()["hedge_wins"] == 0
+
+
+def test_failed_attempt_waits_for_other(policy):
+    send = slow_then_fast([0.1, 0.07], ["FIRST", ConnectionError()])
+    assert policy.call(send) == "FIRST"
+
+
+def test_error_raised_if_both_attempts_fail(policy):
+    send = slow_then_fast([0.1, 0], [ConnectionError(), ConnectionError()])
+    with pytest.raises(ConnectionError):
+        policy.call(send)
+
+
+def test_async_slow_request_is_hedged(policy):
+    cancelled = []
+
+    async def main():
+        calls = iter([1, 0])
+
+        async def send():
+            delay = next(calls)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        return await policy.call_async(send)
+
+    assert asyncio.run(main()) == 0
+    assert cancelled == [1]
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_async_fast_request_is_not_hedged(policy):
+    async def send():
+        return "FIRST"
+
+    assert asyncio.run(policy.call_async(send)) == "FIRST"
+    assert policy.stats()["hedges"] == 0
+
+
+def test_error_response_does_not_win(policy):
+    send = slow_then_fast(
+        [0.15, 0], [mock.Mock(status_code=200), mock.Mock(status_code=503)]
+    )
+    assert policy.call(send).status_code == 200
+    assert policy.stats()["hedge_wins"] == 0
+
+
+def test_error_response_returned_if_both_attempts_fail(policy):
+    send = slow_then_fast(
+        [0.1, 0], [mock.Mock(status_code=500), mock.Mock(status_code=503)]
+    )
+    assert policy.call(send).status_code in (500, 503)
+
+
+def test_error_response_latency_is_not_recorded(policy):
+    send = slow_then_fast([0], [mock.Mock(status_code=500)])
+    policy.call(send)
+    assert len(policy.latencies) == 0
+
+
+def test_losing_attempt_latency_is_recorded(policy):
+    send = slow_then_fast([0.15, 0], ["FIRST", "HEDGE"])
+    assert policy.call(send) == "HEDGE"
+    policy.close()
+    deadline = time.monotonic() + 5
+    while len(policy.latencies) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert max(policy.latencies) >= 0.15
+
+
+def test_queue_time_does_not_count_towards_delay():
+    policy = HedgingPolicy(initial_delay=0.1, max_workers=1)
+    release = threading.Event()
+    executor = policy._get_executor()
+    executor.submit(release.wait)
+    send = slow_then_fast([0.05, 0], ["FIRST", "HEDGE"])
+    threading.Timer(0.15, release.set).start()
+    try:
+        assert policy.call(send) == "FIRST"
+        assert policy.stats()["hedges"] == 0
+    finally:
+        policy.close()
+
+
+def test_async_cancelled_attempt_latency_is_recorded(policy):
+    async def main():
+        calls = iter([1, 0])
+
+        async def send():
+            await asyncio.sleep(next(calls))
+            return "RESPONSE"
+
+        return await policy.call_async(send)
+
+    asyncio.run(main())
+    assert len(policy.latencies) == 2
+    assert max(policy.latencies) >= 0.05
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+
+import parcelhubapi
+
+HEAVY_MODULES = ("requests", "urllib3", "lxml", "toml", "tomllib")
+
+
+def imported_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return set(output.split())
+
+
+def import_time(statement, runs=5):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+        times.append(float(output))
+    return min(times)
+
+
+def test_import_does_not_load_submodules():
+    modules = imported_modules("import parcelhubapi")
+    assert "parcelhubapi.session" not in modules
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_session_import_does_not_load_http_libraries():
+    modules = imported_modules("from parcelhubapi import ParcelhubAPISession")
+    assert "parcelhubapi.session" in modules
+    assert not modules.intersection(("requests", "urllib3", "toml", "tomllib"))
+
+
+@pytest.mark.parametrize("name", parcelhubapi.__all__)
+def test_lazy_attributes(name):
+    assert getattr(parcelhubapi, name).__name__ == name
+    assert name in dir(parcelhubapi)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        parcelhubapi.UnknownAttribute
+
+
+def test_import_time():
+    assert import_time("import parcelhubapi") < import_time("import requests")
@@ -0,0 +1,51 @@
+from unittest import mock
+
+import pytest
+
+from parcelhubapi.models import AccessToken
+
+
+@pytest.fixture
+def token():
+    return AccessToken(
+        access_token="ACCESS_TOKEN", refresh_token="REFRESH_TOKEN", expires_at=1000
+    )
+
+
+@pytest.fixture
+def mock_time():
+    with mock.patch("parcelhubapi.models.time.time") as m:
+        m.return_value = 900
+        yield m
+
+
+def test_access_token(token):
+    assert token.access_token == "ACCESS_TOKEN"
+    assert token.refresh_token == "REFRESH_TOKEN"
+    assert token.expires_at == 1000
+
+
+def test_from_expires_in(mock_time):
+    token = AccessToken.from_expires_in(
+        access_token="ACCESS_TOKEN", refresh_token="REFRESH_TOKEN", expires_in="14400"
+    )
+    assert token.expires_at == 15300
+
+
+def test_to_dict_and_from_dict(token):
+    data = token.to_dict()
+    assert data == {
+        "access_token": "ACCESS_TOKEN",
+        "refresh_token": "REFRESH_TOKEN",
+        "expires_at": 1000,
+    }
+    assert AccessToken.from_dict(data).to_dict() == data
+
+
+def test_expires_in(mock_time, token):
+    assert token.expires_in() == 100
+
+
+@pytest.mark.parametrize("margin,expected", ((0, True), (99, True), (100, False)))
+def test_is_valid(mock_time, token, margin, expected):
+    assert token.is_valid(margin=margin) is expected
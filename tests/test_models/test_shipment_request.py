@@ -1,4 +1,5 @@
 import datetime as dt
+import pickle
 from pathlib import Path
 from unittest import mock
 
@@ -101,3 +102,13 @@ def test_shipment_request(example_request, mock_session, reference, description)
         request.as_xml(), encoding="utf-8", xml_declaration=True, pretty_print=True
     ).decode("utf8")
     assert request_text == example_request
+
+
+def test_pickle_drops_session(mock_session):
+    request = ShipmentRequest(
+        session=mock_session, reference="REF", description="Goods", currency="GBP"
+    )
+    unpickled = pickle.loads(pickle.dumps(request))
+    assert unpickled.session is None
+    assert unpickled.reference == "REF"
+    assert request.session is mock_session
@@ -0,0 +1,229 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi.models import CreateShipmentResponse
+from parcelhubapi.pipeline import ShipmentPipeline, StageStats
+
+
+@pytest.fixture
+def session():
+    return mock.Mock()
+
+
+@pytest.fixture
+def mock_serialise_shipment():
+    with mock.patch(
+        "parcelhubapi.pipeline.batch.serialise_shipment",
+        side_effect=lambda session, shipment_request, draft: (
+            f"<{shipment_request.reference}/>".encode()
+        ),
+    ) as m:
+        yield m
+
+
+@pytest.fixture
+def mock_create_shipment():
+    def create_shipment(session, shipment_request, draft, shipment_xml):
+        time.sleep(0.001)
+        if shipment_request.reference == "REF-2":
+            raise ConnectionError()
+        return CreateShipmentResponse(shipment_xml, "COURIER", "PARCELHUB")
+
+    with mock.patch(
+        "parcelhubapi.pipeline.batch.create_shipment", side_effect=create_shipment
+    ) as m:
+        yield m
+
+
+def build(item):
+    return mock.Mock(reference=f"REF-{item}")
+
+
+def test_stage_stats_report():
+    stats = StageStats("submit", workers=2)
+    stats.record_queue_depth(4)
+    stats.record_queue_depth(2)
+    stats.record_item(1.0)
+    stats.record_item(1.0, failed=True)
+    assert stats.report(elapsed=2) == {
+        "stage": "submit",
+        "workers": 2,
+        "processed": 2,
+        "failed": 1,
+        "throughput": 1.0,
+        "utilisation": 0.5,
+        "max_queue_depth": 4,
+        "mean_queue_depth": 3.0,
+    }
+
+
+def test_stage_stats_report_without_items():
+    report = StageStats("build", workers=1).report(elapsed=0)
+    assert report["throughput"] == 0.0
+    assert report["mean_queue_depth"] == 0.0
+
+
+def test_pipeline_returns_ordered_results(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    pipeline = ShipmentPipeline(lambda shipment_request: session, build=build)
+    results = pipeline.run(range(10))
+    assert [result.index for result in results] == list(range(10))
+    assert results[0].shipment_request.reference == "REF-0"
+    assert results[0].response.shipment_id == b"<REF-0/>"
+    assert isinstance(results[2].error, ConnectionError)
+    assert all(result.ok for i, result in enumerate(results) if i != 2)
+
+
+def test_pipeline_passes_draft_and_session(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    ShipmentPipeline(lambda shipment_request: session, build=build, draft=True).run([0])
+    call = mock_create_shipment.call_args
+    assert call.args[0] is session
+    assert call.kwargs == {"draft": True, "shipment_xml": b"<REF-0/>"}
+
+
+def test_pipeline_uses_items_as_shipment_requests(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    shipment_request = build(0)
+    results = ShipmentPipeline(lambda shipment_request: session).run([shipment_request])
+    assert results[0].shipment_request is shipment_request
+
+
+def test_build_errors_skip_later_stages(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    def failing_build(item):
+        raise ValueError(item)
+
+    persisted = []
+    pipeline = ShipmentPipeline(
+        lambda shipment_request: session, build=failing_build, persist=persisted.append
+    )
+    results = pipeline.run([1])
+    assert isinstance(results[0].error, ValueError)
+    mock_serialise_shipment.assert_not_called()
+    mock_create_shipment.assert_not_called()
+    assert persisted == results
+
+
+def test_persist_receives_every_result(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    persisted = []
+    lock = threading.Lock()
+
+    def persist(result):
+        with lock:
+            persisted.append(result.index)
+
+    ShipmentPipeline(
+        lambda shipment_request: session, build=build, persist=persist
+    ).run(range(10))
+    assert sorted(persisted) == list(range(10))
+
+
+def test_results_are_written_to_sink(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    sink = mock.Mock()
+    pipeline = ShipmentPipeline(lambda sr: session, build=build, sink=sink)
+    results = pipeline.run(range(5))
+    written = [call.args[0] for call in sink.write.call_args_list]
+    assert sorted(written, key=lambda result: result.index) == results
+    sink.flush.assert_called_once_with()
+
+
+def test_sink_errors_do_not_fail_shipments(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    error = OSError()
+    sink = mock.Mock()
+    sink.write.side_effect = error
+    sink.flush.side_effect = error
+    pipeline = ShipmentPipeline(lambda sr: session, build=build, sink=sink)
+    results = pipeline.run(range(2))
+    assert all(result.ok for result in results)
+    assert all(result.sink_error is error for result in results)
+    assert sink.last_error is error
+
+
+def test_persist_errors_are_recorded(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    def persist(result):
+        raise OSError()
+
+    results = ShipmentPipeline(
+        lambda shipment_request: session, build=build, persist=persist
+    ).run([0])
+    assert results[0].ok
+    assert isinstance(results[0].persist_error, OSError)
+    assert results[0].response is not None
+
+
+def test_persist_errors_do_not_skip_sink(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    def persist(result):
+        raise OSError()
+
+    sink = mock.Mock()
+    results = ShipmentPipeline(
+        lambda shipment_request: session, build=build, persist=persist, sink=sink
+    ).run([0])
+    sink.write.assert_called_once_with(results[0])
+
+
+def test_stages_run_concurrently(session, mock_serialise_shipment):
+    barrier = threading.Barrier(4, timeout=1)
+
+    def create_shipment(session, shipment_request, draft, shipment_xml):
+        barrier.wait()
+        return "RESPONSE"
+
+    with mock.patch(
+        "parcelhubapi.pipeline.batch.create_shipment", side_effect=create_shipment
+    ):
+        results = ShipmentPipeline(
+            lambda shipment_request: session, build=build, submit_workers=4
+        ).run(range(8))
+    assert all(result.ok for result in results)
+
+
+def test_queues_are_bounded(session, mock_serialise_shipment, mock_create_shipment):
+    pipeline = ShipmentPipeline(
+        lambda shipment_request: session, build=build, queue_size=2
+    )
+    pipeline.run(range(20))
+    assert all(stats.max_queue_depth <= 2 for stats in pipeline.stats.values())
+
+
+def test_report(session, mock_serialise_shipment, mock_create_shipment):
+    pipeline = ShipmentPipeline(lambda shipment_request: session, build=build)
+    pipeline.run(range(5))
+    report = pipeline.report()
+    assert [stage["stage"] for stage in report] == list(ShipmentPipeline.STAGES)
+    assert [stage["processed"] for stage in report] == [5, 5, 5, 5]
+    assert report[2]["failed"] == 1
+    assert report[2]["workers"] == 8
+
+
+def test_failed_item_iteration_stops_pipeline(
+    session, mock_serialise_shipment, mock_create_shipment
+):
+    def items():
+        yield 0
+        raise RuntimeError()
+
+    pipeline = ShipmentPipeline(lambda shipment_request: session, build=build)
+    with pytest.raises(RuntimeError):
+        pipeline.run(items())
+    stages = [f"parcelhubapi-{name}-" for name in ShipmentPipeline.STAGES]
+    for thread in threading.enumerate():
+        assert not thread.name.startswith(tuple(stages))
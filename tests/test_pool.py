@@ -0,0 +1,232 @@
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.cache import MemoryCache
+from parcelhubapi.circuitbreaker import CircuitBreakers
+from parcelhubapi.models import AccessToken, CreateShipmentResponse, ShipmentRequest
+from parcelhubapi.pool import ParcelhubAPISessionPool
+from parcelhubapi.scheduler import RequestScheduler
+from parcelhubapi.session import ParcelhubAPISession
+from parcelhubapi.singleflight import SingleFlight
+from parcelhubapi.transport import RequestsTransport
+
+
+@pytest.fixture
+def transport():
+    return mock.Mock()
+
+
+@pytest.fixture
+def pool(transport):
+    pool = ParcelhubAPISessionPool(transport=transport)
+    pool.add_account("USERNAME_1", "PASSWORD_1", "ACCOUNT_1")
+    pool.add_account("USERNAME_2", "PASSWORD_2", "ACCOUNT_2")
+    return pool
+
+
+@pytest.fixture
+def token():
+    return AccessToken(
+        access_token="ACCESS_TOKEN",
+        refresh_token="REFRESH_TOKEN",
+        expires_at=time.time() + 3600,
+    )
+
+
+def test_init_creates_requests_transport():
+    pool = ParcelhubAPISessionPool(pool_connections=2, pool_maxsize=20)
+    assert isinstance(pool.transport, RequestsTransport)
+    adapter = pool.transport.http_session.get_adapter(ParcelhubAPISession.DOMAIN)
+    assert adapter._pool_maxsize == 20
+
+
+def test_add_account_creates_session(pool, transport):
+    session = pool.get_session("ACCOUNT_1")
+    assert isinstance(session, ParcelhubAPISession)
+    assert session.username == "USERNAME_1"
+    assert session.password == "PASSWORD_1"
+    assert session.account_id == "ACCOUNT_1"
+    assert session.transport is transport
+
+
+def test_add_account_does_not_authenticate(pool):
+    assert pool.get_session("ACCOUNT_1").token is None
+
+
+def test_add_account_without_credentials(pool):
+    with pytest.raises(exceptions.LoginCredentialsNotSetError):
+        pool.add_account("USERNAME", None, "ACCOUNT_ID")
+
+
+def test_sessions_share_transport_and_token_cache(transport):
+    token_cache = mock.Mock()
+    pool = ParcelhubAPISessionPool(transport=transport, token_cache=token_cache)
+    session_1 = pool.add_account("USERNAME_1", "PASSWORD_1", "ACCOUNT_1")
+    session_2 = pool.add_account("USERNAME_2", "PASSWORD_2", "ACCOUNT_2")
+    assert session_1.transport is session_2.transport is transport
+    assert session_1.token_cache is session_2.token_cache is token_cache
+
+
+def test_get_session_with_unknown_account(pool):
+    with pytest.raises(exceptions.UnknownAccountError):
+        pool.get_session("UNKNOWN")
+
+
+def test_shipment_request(pool):
+    shipment_request = pool.shipment_request("ACCOUNT_2", "REF", "Goods", "GBP")
+    assert isinstance(shipment_request, ShipmentRequest)
+    assert shipment_request.session is pool.get_session("ACCOUNT_2")
+    assert shipment_request.reference == "REF"
+
+
+def test_session_for(pool):
+    shipment_request = pool.shipment_request("ACCOUNT_2", "REF", "Goods", "GBP")
+    assert pool.session_for(shipment_request) is pool.get_session("ACCOUNT_2")
+
+
+@pytest.mark.parametrize(
+    "draft,request_class",
+    ((False, "CreateShipmentRequest"), (True, "CreateDraftShipmentRequest")),
+)
+def test_create_shipment_routes_to_account_session(pool, draft, request_class):
+    shipment_request = pool.shipment_request("ACCOUNT_2", "REF", "Goods", "GBP")
+    with mock.patch(f"parcelhubapi.pool.{request_class}") as mock_request:
+        mock_request.return_value.call.return_value = CreateShipmentResponse(
+            "1", "2", "3"
+        )
+        response = pool.create_shipment(shipment_request, draft=draft)
+    mock_request.assert_called_once_with(pool.get_session("ACCOUNT_2"))
+    mock_request.return_value.call.assert_called_once_with(
+        shipment_request=shipment_request
+    )
+    assert response.shipment_id == "1"
+
+
+@pytest.mark.parametrize(
+    "draft,request_class",
+    ((False, "GetShipmentsRequest"), (True, "GetDraftShipmentsRequest")),
+)
+def test_get_shipments(pool, draft, request_class):
+    with mock.patch(f"parcelhubapi.pool.{request_class}") as mock_request:
+        value = pool.get_shipments("ACCOUNT_1", draft=draft)
+    mock_request.assert_called_once_with(pool.get_session("ACCOUNT_1"))
+    assert value == mock_request.return_value.call.return_value
+
+
+def test_requests_authenticate_each_account(pool, transport, token):
+    with mock.patch("parcelhubapi.session.GetTokenRequest") as mock_get_token:
+        mock_get_token.return_value.call.return_value = token
+        pool.get_shipments("ACCOUNT_1")
+        pool.get_shipments("ACCOUNT_2")
+        pool.get_shipments("ACCOUNT_1")
+    assert mock_get_token.call_count == 2
+    params = [call.kwargs["params"] for call in transport.request.call_args_list]
+    assert params == [
+        {"AccountId": "ACCOUNT_1"},
+        {"AccountId": "ACCOUNT_2"},
+        {"AccountId": "ACCOUNT_1"},
+    ]
+
+
+def test_exit_method_closes_transport(transport):
+    with ParcelhubAPISessionPool(transport=transport):
+        pass
+    transport.close.assert_called_once_with()
+
+
+def test_close_method_stops_hedging_policy(transport):
+    hedging_policy = mock.Mock()
+    ParcelhubAPISessionPool(transport=transport, hedging_policy=hedging_policy).close()
+    hedging_policy.close.assert_called_once_with()
+
+
+def test_sessions_share_retry_policy(transport):
+    retry_policy = mock.Mock()
+    pool = ParcelhubAPISessionPool(transport=transport, retry_policy=retry_policy)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_ID")
+    assert session.retry_policy is retry_policy
+
+
+def test_sessions_share_rate_limiter(transport):
+    rate_limiter = mock.Mock()
+    pool = ParcelhubAPISessionPool(transport=transport, rate_limiter=rate_limiter)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_ID")
+    assert session.rate_limiter is rate_limiter
+
+
+def test_sessions_share_concurrency_limiter(transport):
+    limiter = mock.Mock()
+    pool = ParcelhubAPISessionPool(transport=transport, concurrency_limiter=limiter)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_ID")
+    assert session.concurrency_limiter is limiter
+
+
+def test_sessions_have_own_circuit_breakers(transport):
+    circuit_breakers = CircuitBreakers(minimum_calls=5)
+    pool = ParcelhubAPISessionPool(
+        transport=transport, circuit_breakers=circuit_breakers
+    )
+    session_1 = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_1")
+    session_2 = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_2")
+    assert session_1.circuit_breakers is not session_2.circuit_breakers
+    assert session_1.circuit_breakers.kwargs == {"minimum_calls": 5}
+
+
+def test_sessions_share_single_flight(transport):
+    single_flight = SingleFlight()
+    pool = ParcelhubAPISessionPool(transport=transport, single_flight=single_flight)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_ID")
+    assert session.single_flight is single_flight
+
+
+def test_sessions_share_scheduler(transport):
+    scheduler = RequestScheduler()
+    pool = ParcelhubAPISessionPool(transport=transport, scheduler=scheduler)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_1")
+    assert session.scheduler is scheduler
+
+
+def test_sessions_share_response_cache(transport):
+    response_cache = MemoryCache()
+    pool = ParcelhubAPISessionPool(transport=transport, response_cache=response_cache)
+    session = pool.add_account("USERNAME", "PASSWORD", "ACCOUNT_ID")
+    assert session.response_cache is response_cache
+
+
+def test_create_shipments_routes_to_account_sessions(pool):
+    shipment_requests = [
+        pool.shipment_request("ACCOUNT_1", "REF-1", "Goods", "GBP"),
+        pool.shipment_request("ACCOUNT_2", "REF-2", "Goods", "GBP"),
+    ]
+    with mock.patch("parcelhubapi.batch.create_shipment") as mock_create_shipment:
+        results = pool.create_shipments(shipment_requests, max_workers=2)
+    assert [result.shipment_request for result in results] == shipment_requests
+    sessions = {
+        call.args[1].reference: call.args[0]
+        for call in mock_create_shipment.call_args_list
+    }
+    assert sessions == {
+        "REF-1": pool.get_session("ACCOUNT_1"),
+        "REF-2": pool.get_session("ACCOUNT_2"),
+    }
+
+
+def test_stream_shipments_routes_to_account_sessions(pool):
+    shipment_requests = [
+        pool.shipment_request("ACCOUNT_1", "REF-1", "Goods", "GBP"),
+        pool.shipment_request("ACCOUNT_2", "REF-2", "Goods", "GBP"),
+    ]
+    with mock.patch("parcelhubapi.batch.create_shipment") as mock_create_shipment:
+        results = list(pool.stream_shipments(iter(shipment_requests), window=1))
+    assert [result.shipment_request for result in results] == shipment_requests
+    sessions = {
+        call.args[1].reference: call.args[0]
+        for call in mock_create_shipment.call_args_list
+    }
+    assert sessions == {
+        "REF-1": pool.get_session("ACCOUNT_1"),
+        "REF-2": pool.get_session("ACCOUNT_2"),
+    }
@@ -0,0 +1,126 @@
+import multiprocessing
+import threading
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.ratelimit import FileTokenBucket, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def bucket(clock):
+    with mock.patch.object(TokenBucket, "clock", clock):
+        yield TokenBucket(rate=2, capacity=2)
+
+
+def test_capacity_defaults_to_rate():
+    assert TokenBucket(rate=5).capacity == 5
+    assert TokenBucket(rate=0.5).capacity == 1
+
+
+def test_reserve_allows_burst_up_to_capacity(bucket):
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_reserve_refills_over_time(bucket, clock):
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 0.5
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+
+
+def test_reserve_does_not_refill_past_capacity(bucket, clock):
+    clock.now += 100
+    for _ in range(2):
+        assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+
+
+def test_reserve_with_max_wait_does_not_reserve(bucket):
+    bucket.reserve()
+    bucket.reserve()
+    assert bucket.reserve(max_wait=0.1) is None
+    assert bucket.reserve() == 0.5
+
+
+@mock.patch("parcelhubapi.ratelimit.time.sleep")
+def test_acquire_sleeps_until_reservation_is_due(mock_sleep, bucket):
+    for _ in range(3):
+        bucket.acquire()
+    mock_sleep.assert_called_once_with(0.5)
+
+
+def test_acquire_raises_when_wait_passes_deadline(bucket):
+    bucket.reserve()
+    bucket.reserve()
+    with pytest.raises(exceptions.DeadlineExceededError):
+        bucket.acquire(deadline=Deadline(0.1))
+
+
+def test_bucket_is_thread_safe():
+    bucket = TokenBucket(rate=1, capacity=100)
+    delays = []
+    threads = [
+        threading.Thread(target=lambda: delays.append(bucket.reserve()))
+        for _ in range(110)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(1 for delay in delays if delay == 0) == 100
+
+
+def test_file_bucket_state_is_shared(tmp_path):
+    path = tmp_path / "bucket.json"
+    bucket_1 = FileTokenBucket(path, rate=1, capacity=2)
+    bucket_2 = FileTokenBucket(path, rate=1, capacity=2)
+    assert bucket_1.reserve() == 0
+    assert bucket_2.reserve() == 0
+    assert bucket_1.reserve() > 0
+
+
+def _reserve(path, results):
+    results.put(FileTokenBucket(path, rate=0.01, capacity=4).reserve())
+
+
+def test_file_bucket_is_shared_between_processes(tmp_path):
+    path = tmp_path / "bucket.json"
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_reserve, args=(path, results)) for _ in range(6)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    delays = [results.get() for _ in range(6)]
+    assert sum(1 for delay in delays if delay == 0) == 4
+
+
+def test_rate_limiter_uses_endpoint_bucket():
+    shipments = mock.Mock()
+    limiter = RateLimiter(buckets={"1.0/Shipment": shipments})
+    limiter.acquire("1.0/Shipment")
+    shipments.acquire.assert_called_once_with(deadline=None)
+    assert limiter.reserve("1.0/Shipment") == shipments.reserve.return_value
+
+
+def test_rate_limiter_uses_default_bucket():
+    default = mock.Mock()
+    limiter = RateLimiter(buckets={"1.0/Shipment": mock.Mock()}, default=default)
+    deadline = Deadline(10)
+    limiter.acquire("1.0/TokenV2", deadline=deadline)
+    default.acquire.assert_called_once_with(deadline=deadline)
+
+
+def test_rate_limiter_without_bucket():
+    limiter = RateLimiter()
+    limiter.acquire("1.0/TokenV2")
+    assert limiter.reserve("1.0/TokenV2") == 0
@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import ParcelhubAPISession
+from parcelhubapi.cache import MemoryCache
+from parcelhubapi.models import AccessToken
+from parcelhubapi.refresher import ListingRefresher, Snapshot
+from parcelhubapi.request import GetDraftShipmentsRequest, GetShipmentsRequest
+from parcelhubapi.transport import InMemoryTransport
+
+SHIPMENTS_URL = "https://api.test.com/1.0/Shipment"
+DRAFTS_URL = "https://api.test.com/1.0/DraftShipment"
+
+
+@pytest.fixture
+def transport():
+    transport = InMemoryTransport()
+    transport.add_response("GET", SHIPMENTS_URL, content="SHIPMENTS")
+    transport.add_response("GET", DRAFTS_URL, content="DRAFTS")
+    return transport
+
+
+@pytest.fixture
+def session(transport):
+    session = ParcelhubAPISession(
+        username="USERNAME",
+        password="PASSWORD",
+        account_id="ACCOUNT_ID",
+        transport=transport,
+    )
+    session.DOMAIN = "https://api.test.com"
+    session.token = AccessToken("A", "R", time.time() + 3600)
+    return session
+
+
+def test_snapshot_age():
+    assert 9 < Snapshot("value", time.time() - 10).age() < 11
+
+
+def test_listings_are_none_before_refresh(session):
+    refresher = ListingRefresher(session)
+    assert refresher.shipments is None
+    assert refresher.draft_shipments is None
+    assert refresher.wait(timeout=0) is False
+
+
+def test_refresh_fetches_listings(session):
+    refresher = ListingRefresher(session)
+    refresher.refresh()
+    assert refresher.shipments == "SHIPMENTS"
+    assert refresher.draft_shipments == "DRAFTS"
+    assert refresher.wait(timeout=0) is True
+
+
+def test_failed_refresh_keeps_last_snapshot(session, transport):
+    refresher = ListingRefresher(session)
+    refresher.refresh()
+    transport.add_response("GET", SHIPMENTS_URL, status_code=404, content="")
+    refresher.refresh()
+    assert refresher.shipments == "SHIPMENTS"
+    assert refresher.last_error is not None
+
+
+def test_refresh_bypasses_response_cache(session, transport):
+    session.response_cache = MemoryCache()
+    refresher = ListingRefresher(session, request_classes=(GetShipmentsRequest,))
+    refresher.refresh()
+    refresher.refresh()
+    assert len(transport.requests) == 2
+    assert GetShipmentsRequest(session).call() == "SHIPMENTS"
+    assert len(transport.requests) == 2
+
+
+def test_background_refresh(session, transport):
+    with ListingRefresher(session, interval=0.01) as refresher:
+        assert refresher.wait(timeout=1)
+        requests = len(transport.requests)
+        time.sleep(0.1)
+        assert len(transport.requests) > requests
+    assert refresher.get(GetDraftShipmentsRequest) == "DRAFTS"
+    requests = len(transport.requests)
+    time.sleep(0.05)
+    assert len(transport.requests) == requests
+
+
+def test_start_is_ignored_while_running(session):
+    refresher = ListingRefresher(session, interval=10)
+    refresher.start()
+    thread = refresher._thread
+    refresher.start()
+    assert refresher._thread is thread
+    assert refresher.stop(timeout=1) is True
+    assert refresher._thread is None
+
+
+def test_stop_keeps_thread_that_has_not_exited(session):
+    release = threading.Event()
+    refresher = ListingRefresher(session, interval=10)
+    with mock.patch.object(refresher, "refresh", side_effect=lambda: release.wait()):
+        refresher.start()
+        assert refresher.stop(timeout=0.01) is False
+        assert refresher._thread is not None
+        with pytest.raises(RuntimeError):
+            refresher.start()
+        release.set()
+        assert refresher.stop(timeout=1) is True
+    assert refresher._thread is None
+    refresher.start()
+    assert refresher.stop(timeout=1) is True
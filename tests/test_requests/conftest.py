@@ -44,11 +44,20 @@ def account_id():
 
 
 @pytest.fixture
-def mock_session(domain, access_token, username, password, account_id):
+def mock_session(domain, access_token, refresh_token, username, password, account_id):
     return mock.Mock(
         DOMAIN=domain,
         access_token=access_token,
+        refresh_token=refresh_token,
         username=username,
         password=password,
         account_id=account_id,
+        retry_policy=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging_policy=None,
+        single_flight=None,
+        response_cache=None,
+        scheduler=None,
     )
@@ -1,3 +1,4 @@
+import json
 import re
 from unittest import mock
 
@@ -5,7 +6,9 @@ import pytest
 from requests import Response
 
 from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
 from parcelhubapi.request import BaseParcelhubApiRequest
+from parcelhubapi.retry import NO_RETRY, RetryPolicy
 
 
 @pytest.fixture
@@ -62,8 +65,7 @@ def test_parse_response_method(request_obj):
     assert request_obj.parse_response(response) == response.text
 
 
-@mock.patch("parcelhubapi.request.requests")
-def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
+def test_call_method(mock_session, request_args, request_kwargs, request_obj):
     request_obj.url = mock.Mock()
     request_obj.headers = mock.Mock()
     request_obj.params = mock.Mock()
@@ -75,18 +77,19 @@ def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
     request_obj.headers.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.params.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.data.assert_called_once_with(*request_args, **request_kwargs)
-    mock_requests.request.assert_called_once_with(
+    mock_session.transport.request.assert_called_once_with(
         url=request_obj.url.return_value,
         method=request_obj.METHOD,
         headers=request_obj.headers.return_value,
         params=request_obj.params.return_value,
         data=request_obj.data.return_value,
+        timeout=request_obj.TIMEOUT,
     )
     request_obj.check_response.assert_called_once_with(
-        mock_requests.request.return_value
+        mock_session.transport.request.return_value
     )
     request_obj.parse_response.assert_called_once_with(
-        mock_requests.request.return_value, *request_args, **request_kwargs
+        mock_session.transport.request.return_value, *request_args, **request_kwargs
     )
     assert value == request_obj.parse_response.return_value
 
@@ -114,3 +117,395 @@ def test_check_response_method_handles_raise_for_status(request_obj):
         match=re.escape("Error response (500): 'Invalid Response'."),
     ):
         request_obj.check_response(response)
+
+
+def test_call_method_ensures_token(mock_session, request_obj):
+    request_obj.check_response = mock.Mock()
+    request_obj.parse_response = mock.Mock()
+    request_obj.call()
+    mock_session.ensure_token.assert_called_once_with(deadline=None)
+    mock_session.renew_session.assert_not_called()
+
+
+def test_call_method_renews_token_and_replays_unauthorised_request(
+    mock_session, request_obj
+):
+    unauthorised = mock.Mock(status_code=401)
+    success = mock.Mock(status_code=200)
+    mock_session.transport.request.side_effect = [unauthorised, success]
+    request_obj.data = mock.Mock()
+    request_obj.parse_response = mock.Mock()
+    value = request_obj.call()
+    mock_session.renew_session.assert_called_once_with(
+        stale_token=mock_session.ensure_token.return_value, deadline=None
+    )
+    assert mock_session.transport.request.call_count == 2
+    request_obj.data.assert_called_once_with()
+    request_obj.parse_response.assert_called_once_with(success)
+    assert value == request_obj.parse_response.return_value
+
+
+def test_call_method_only_replays_unauthorised_request_once(mock_session, request_obj):
+    response = Response()
+    response.status_code = 401
+    response._content = b"Unauthorised"
+    mock_session.transport.request.return_value = response
+    with pytest.raises(exceptions.ResponseStatusError):
+        request_obj.call()
+    mock_session.renew_session.assert_called_once_with(
+        stale_token=mock_session.ensure_token.return_value, deadline=None
+    )
+    assert mock_session.transport.request.call_count == 2
+
+
+def test_timeout_attribute(request_obj):
+    assert request_obj.TIMEOUT == (5, 30)
+
+
+def test_timeout_method_without_deadline(request_obj):
+    assert request_obj.timeout() == request_obj.TIMEOUT
+
+
+def test_timeout_method_with_deadline(request_obj):
+    deadline = mock.Mock()
+    assert request_obj.timeout(deadline) == deadline.timeout.return_value
+    deadline.timeout.assert_called_once_with(request_obj.TIMEOUT)
+
+
+def test_call_method_passes_deadline(mock_session, request_obj):
+    deadline = mock.Mock()
+    request_obj.check_response = mock.Mock()
+    request_obj.parse_response = mock.Mock()
+    request_obj.call(deadline=deadline)
+    mock_session.ensure_token.assert_called_once_with(deadline=deadline)
+    assert (
+        mock_session.transport.request.call_args.kwargs["timeout"]
+        == deadline.timeout.return_value
+    )
+
+
+def test_call_method_with_spent_deadline(mock_session, request_obj):
+    deadline = Deadline(0)
+    with pytest.raises(exceptions.DeadlineExceededError):
+        request_obj.call(deadline=deadline)
+    mock_session.transport.request.assert_not_called()
+
+
+@pytest.fixture
+def mock_sleep():
+    with mock.patch("parcelhubapi.request.time.sleep") as m:
+        yield m
+
+
+def status_response(status_code, content=b"", headers=None):
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
+def test_is_retry_safe_method(request_obj):
+    assert request_obj.is_retry_safe() is True
+    request_obj.METHOD = BaseParcelhubApiRequest.POST
+    assert request_obj.is_retry_safe() is False
+
+
+def test_retry_policy_method(request_obj):
+    assert request_obj.retry_policy() is request_obj.RETRY_POLICY
+
+
+def test_retry_policy_method_uses_session_policy(mock_session, request_obj):
+    mock_session.retry_policy = RetryPolicy(max_attempts=10)
+    assert request_obj.retry_policy() is mock_session.retry_policy
+
+
+def test_retry_policy_method_when_not_retry_safe(request_obj):
+    request_obj.METHOD = BaseParcelhubApiRequest.POST
+    assert request_obj.retry_policy() is NO_RETRY
+
+
+def test_call_method_retries_transient_errors(mock_session, mock_sleep, request_obj):
+    mock_session.transport.request.side_effect = [
+        status_response(503),
+        ConnectionError(),
+        status_response(200, b"Success"),
+    ]
+    request_obj.data = mock.Mock()
+    assert request_obj.call() == "Success"
+    assert mock_session.transport.request.call_count == 3
+    assert mock_sleep.call_count == 2
+    request_obj.data.assert_called_once_with()
+
+
+def test_call_method_honours_retry_after(mock_session, mock_sleep, request_obj):
+    mock_session.transport.request.side_effect = [
+        status_response(429, headers={"Retry-After": "2"}),
+        status_response(200, b"Success"),
+    ]
+    request_obj.call()
+    mock_sleep.assert_called_once_with(2.0)
+
+
+def test_call_method_raises_after_last_attempt(mock_session, mock_sleep, request_obj):
+    mock_session.transport.request.return_value = status_response(503)
+    with pytest.raises(exceptions.ResponseStatusError):
+        request_obj.call()
+    assert (
+        mock_session.transport.request.call_count
+        == request_obj.RETRY_POLICY.max_attempts
+    )
+
+
+def test_call_method_raises_connection_error_after_last_attempt(
+    mock_session, mock_sleep, request_obj
+):
+    mock_session.transport.request.side_effect = ConnectionError
+    with pytest.raises(ConnectionError):
+        request_obj.call()
+
+
+def test_call_method_does_not_retry_unsafe_requests(
+    mock_session, mock_sleep, request_obj
+):
+    request_obj.METHOD = BaseParcelhubApiRequest.POST
+    mock_session.transport.request.return_value = status_response(503)
+    with pytest.raises(exceptions.ResponseStatusError):
+        request_obj.call()
+    mock_session.transport.request.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+def test_send_method_waits_for_rate_limiter(mock_session, request_obj):
+    request_obj.URL = "1.0/Shipment"
+    mock_session.rate_limiter = mock.Mock()
+    deadline = Deadline(10)
+    request_obj.send("url", None, None, deadline=deadline)
+    mock_session.rate_limiter.acquire.assert_called_once_with(
+        "1.0/Shipment", deadline=deadline
+    )
+
+
+def test_send_method_ignores_concurrency_limiter(mock_session, request_obj):
+    mock_session.concurrency_limiter = mock.Mock()
+    request_obj.send("url", None, None)
+    mock_session.concurrency_limiter.acquire.assert_not_called()
+
+
+def test_send_method_reports_to_concurrency_limiter(mock_session, request_obj):
+    request_obj.CONCURRENCY_LIMITED = True
+    limiter = mock.Mock()
+    mock_session.concurrency_limiter = limiter
+    response = request_obj.send("url", None, None)
+    limiter.acquire.assert_called_once_with(deadline=None)
+    limiter.release.assert_called_once_with(
+        limiter.acquire.return_value, response=response
+    )
+
+
+def test_send_method_reports_errors_to_concurrency_limiter(mock_session, request_obj):
+    request_obj.CONCURRENCY_LIMITED = True
+    limiter = mock.Mock()
+    mock_session.concurrency_limiter = limiter
+    error = ConnectionError()
+    mock_session.transport.request.side_effect = error
+    with pytest.raises(ConnectionError):
+        request_obj.send("url", None, None)
+    limiter.release.assert_called_once_with(limiter.acquire.return_value, error=error)
+
+
+def test_send_method_checks_circuit_breaker(mock_session, request_obj):
+    request_obj.URL = "1.0/Shipment"
+    mock_session.circuit_breakers = mock.Mock()
+    breaker = mock_session.circuit_breakers.breaker.return_value
+    response = request_obj.send("url", None, None)
+    mock_session.circuit_breakers.breaker.assert_called_once_with("1.0/Shipment")
+    breaker.before_call.assert_called_once_with()
+    breaker.record.assert_called_once_with(response=response)
+
+
+def test_send_method_does_not_send_when_circuit_is_open(mock_session, request_obj):
+    mock_session.circuit_breakers = mock.Mock()
+    breaker = mock_session.circuit_breakers.breaker.return_value
+    breaker.before_call.side_effect = exceptions.CircuitOpenError("", 1)
+    with pytest.raises(exceptions.CircuitOpenError):
+        request_obj.send("url", None, None)
+    mock_session.transport.request.assert_not_called()
+
+
+def test_send_method_records_errors_with_circuit_breaker(mock_session, request_obj):
+    mock_session.circuit_breakers = mock.Mock()
+    breaker = mock_session.circuit_breakers.breaker.return_value
+    error = ConnectionError()
+    mock_session.transport.request.side_effect = error
+    with pytest.raises(ConnectionError):
+        request_obj.send("url", None, None)
+    breaker.record.assert_called_once_with(error=error)
+
+
+def test_send_method_gives_back_interrupted_calls(mock_session, request_obj):
+    mock_session.circuit_breakers = mock.Mock()
+    breaker = mock_session.circuit_breakers.breaker.return_value
+    mock_session.transport.request.side_effect = KeyboardInterrupt()
+    with pytest.raises(KeyboardInterrupt):
+        request_obj.send("url", None, None)
+    breaker.cancel.assert_called_once_with()
+    breaker.record.assert_not_called()
+
+
+def test_circuit_open_error_is_not_retried(mock_session, request_obj):
+    mock_session.circuit_breakers = mock.Mock()
+    breaker = mock_session.circuit_breakers.breaker.return_value
+    breaker.before_call.side_effect = exceptions.CircuitOpenError("", 1)
+    with pytest.raises(exceptions.CircuitOpenError):
+        request_obj.call()
+    breaker.before_call.assert_called_once_with()
+
+
+def test_send_method_ignores_hedging_policy(mock_session, request_obj):
+    mock_session.hedging_policy = mock.Mock()
+    request_obj.send("url", None, None)
+    mock_session.hedging_policy.call.assert_not_called()
+
+
+def test_send_method_uses_hedging_policy(mock_session, request_obj):
+    request_obj.HEDGEABLE = True
+    mock_session.hedging_policy = mock.Mock()
+    mock_session.hedging_policy.call.side_effect = lambda send: send()
+    response = request_obj.send("url", None, None)
+    mock_session.hedging_policy.call.assert_called_once()
+    assert response == mock_session.transport.request.return_value
+
+
+def test_priority_method(request_obj):
+    assert request_obj.priority() == BaseParcelhubApiRequest.NORMAL
+
+
+def test_priority_method_with_priority_argument(request_obj):
+    priority = request_obj.priority(priority=BaseParcelhubApiRequest.URGENT)
+    assert priority == BaseParcelhubApiRequest.URGENT
+
+
+def test_priority_method_does_not_schedule_unprioritised_requests(request_obj):
+    request_obj.PRIORITY = None
+    assert request_obj.priority(priority=BaseParcelhubApiRequest.URGENT) is None
+
+
+def test_send_method_uses_priority_argument(mock_session, request_obj):
+    mock_session.scheduler = mock.Mock()
+    request_obj.send("url", None, None, priority=BaseParcelhubApiRequest.BULK)
+    mock_session.scheduler.acquire.assert_called_once_with(
+        priority=BaseParcelhubApiRequest.BULK,
+        account_id=mock_session.account_id,
+        deadline=None,
+    )
+
+
+def test_send_method_waits_for_scheduler(mock_session, request_obj):
+    mock_session.scheduler = mock.Mock()
+    deadline = Deadline(10)
+    response = request_obj.send("url", None, None, deadline=deadline)
+    mock_session.scheduler.acquire.assert_called_once_with(
+        priority=BaseParcelhubApiRequest.NORMAL,
+        account_id=mock_session.account_id,
+        deadline=deadline,
+    )
+    mock_session.scheduler.release.assert_called_once_with()
+    assert response == mock_session.transport.request.return_value
+
+
+def test_send_method_releases_scheduler_on_error(mock_session, request_obj):
+    mock_session.scheduler = mock.Mock()
+    mock_session.transport.request.side_effect = ConnectionError()
+    with pytest.raises(ConnectionError):
+        request_obj.send("url", None, None)
+    mock_session.scheduler.release.assert_called_once_with()
+
+
+def test_send_method_does_not_schedule_unprioritised_requests(
+    mock_session, request_obj
+):
+    request_obj.PRIORITY = None
+    mock_session.scheduler = mock.Mock()
+    request_obj.send("url", None, None)
+    mock_session.scheduler.acquire.assert_not_called()
+
+
+def test_coalescing_key_method(mock_session, request_obj):
+    request_obj.params = mock.Mock(return_value={"b": 2, "a": 1})
+    assert request_obj.coalescing_key() == (
+        "GET",
+        request_obj.url(),
+        mock_session.account_id,
+        (("a", 1), ("b", 2)),
+    )
+
+
+def test_call_method_ignores_single_flight(mock_session, request_obj):
+    mock_session.single_flight = mock.Mock()
+    request_obj.call()
+    mock_session.single_flight.do.assert_not_called()
+
+
+def test_call_method_uses_single_flight(mock_session, request_obj):
+    request_obj.COALESCE = True
+    request_obj.parse_response = mock.Mock()
+    mock_session.single_flight = mock.Mock()
+    mock_session.single_flight.do.side_effect = lambda key, function, deadline: (
+        function()
+    )
+    deadline = Deadline(10)
+    value = request_obj.call(deadline=deadline)
+    mock_session.single_flight.do.assert_called_once_with(
+        request_obj.coalescing_key(), mock.ANY, deadline=deadline
+    )
+    assert value == request_obj.parse_response.return_value
+
+
+def test_cache_key_method(mock_session, request_obj):
+    assert request_obj.cache_key() == json.dumps(request_obj.coalescing_key())
+
+
+def test_call_method_ignores_response_cache(mock_session, request_obj):
+    mock_session.response_cache = mock.Mock()
+    request_obj.call()
+    mock_session.response_cache.get.assert_not_called()
+
+
+def test_call_method_returns_cached_result(mock_session, request_obj):
+    request_obj.CACHEABLE = True
+    mock_session.response_cache = mock.Mock()
+    mock_session.response_cache.get.return_value = "CACHED"
+    assert request_obj.call() == "CACHED"
+    mock_session.response_cache.get.assert_called_once_with(request_obj.cache_key())
+    mock_session.transport.request.assert_not_called()
+
+
+def test_call_method_caches_result(mock_session, request_obj):
+    request_obj.CACHEABLE = True
+    request_obj.parse_response = mock.Mock()
+    mock_session.response_cache = mock.Mock()
+    mock_session.response_cache.get.return_value = None
+    mock_session.response_cache.version.return_value = 3
+    value = request_obj.call()
+    mock_session.response_cache.version.assert_called_once_with(request_obj.cache_key())
+    mock_session.response_cache.set_if_current.assert_called_once_with(
+        request_obj.cache_key(), value, 3
+    )
+    assert value == request_obj.parse_response.return_value
+
+
+def test_call_method_invalidates_stale_responses(mock_session, request_obj):
+    stale_request_class = mock.Mock()
+    request_obj.INVALIDATES = (stale_request_class,)
+    request_obj.call()
+    stale_request_class.assert_called_once_with(mock_session)
+    stale_request_class.return_value.invalidate_cache.assert_called_once_with()
+
+
+def test_invalidate_cache_method(mock_session, request_obj):
+    mock_session.response_cache = mock.Mock()
+    request_obj.invalidate_cache()
+    mock_session.response_cache.invalidate.assert_called_once_with(
+        request_obj.cache_key()
+    )
@@ -2,10 +2,17 @@ from pathlib import Path
 from unittest import mock
 
 import pytest
+from requests.exceptions import ReadTimeout
 
-from parcelhubapi.exceptions import ResponseParsingError
+from parcelhubapi.exceptions import ConnectError, ResponseParsingError
 from parcelhubapi.models import CreateShipmentResponse
-from parcelhubapi.request import BaseParcelhubApiRequest, CreateShipmentRequest
+from parcelhubapi.request import (
+    BaseParcelhubApiRequest,
+    CreateShipmentRequest,
+    GetDraftShipmentsRequest,
+    GetShipmentsRequest,
+)
+from parcelhubapi.retry import NOT_SENT_RETRY, RetryPolicy
 
 
 @pytest.fixture
@@ -32,6 +39,10 @@ def test_method_attribute(request_obj):
     assert request_obj.METHOD == BaseParcelhubApiRequest.POST
 
 
+def test_priority_attribute(request_obj):
+    assert request_obj.PRIORITY == BaseParcelhubApiRequest.URGENT
+
+
 def test_init_method(mock_session, request_obj):
     assert request_obj.session == mock_session
 
@@ -71,6 +82,15 @@ def test_data_method(mock_etree, request_obj, shipment_request_data):
     assert value == mock_etree.tostring.return_value
 
 
+@mock.patch("parcelhubapi.request.etree")
+def test_data_method_with_shipment_xml(mock_etree, request_obj, shipment_request_data):
+    value = request_obj.data(
+        shipment_request=shipment_request_data, shipment_xml=b"<Shipment/>"
+    )
+    mock_etree.tostring.assert_not_called()
+    assert value == b"<Shipment/>"
+
+
 def test_parse_response_method(request_obj, response_text):
     response = mock.Mock(text=response_text)
     value = request_obj.parse_response(response)
@@ -88,8 +108,7 @@ def test_parse_response_method_with_error(request_obj, response_text):
         request_obj.parse_response(response)
 
 
-@mock.patch("parcelhubapi.request.requests")
-def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
+def test_call_method(mock_session, request_args, request_kwargs, request_obj):
     request_obj.url = mock.Mock()
     request_obj.headers = mock.Mock()
     request_obj.params = mock.Mock()
@@ -100,16 +119,103 @@ def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
     request_obj.headers.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.params.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.data.assert_called_once_with(*request_args, **request_kwargs)
-    mock_requests.request.return_value.text.side_effect = response_text
-    mock_requests.request.assert_called_once_with(
+    mock_session.transport.request.return_value.text.side_effect = response_text
+    mock_session.transport.request.assert_called_once_with(
         url=request_obj.url.return_value,
         method=request_obj.METHOD,
         headers=request_obj.headers.return_value,
         params=request_obj.params.return_value,
         data=request_obj.data.return_value,
+        timeout=request_obj.TIMEOUT,
     )
-    mock_requests.request.return_value.raise_for_status.assert_called_once_with()
+    mock_session.transport.request.return_value.raise_for_status.assert_called_once_with()
     request_obj.parse_response.assert_called_once_with(
-        mock_requests.request.return_value, *request_args, **request_kwargs
+        mock_session.transport.request.return_value, *request_args, **request_kwargs
     )
     assert value == request_obj.parse_response.return_value
+
+
+def test_timeout_attribute(request_obj):
+    assert request_obj.TIMEOUT == (5, 60)
+
+
+def test_concurrency_limited_attribute(request_obj):
+    assert request_obj.CONCURRENCY_LIMITED is True
+
+
+def test_invalidates_attribute(request_obj):
+    assert request_obj.INVALIDATES == (
+        GetShipmentsRequest,
+        GetDraftShipmentsRequest,
+    )
+
+
+def test_is_retry_safe_method(request_obj):
+    shipment_request = mock.Mock(reference="ORDER-1")
+    assert request_obj.is_retry_safe(shipment_request=shipment_request) is False
+
+
+def test_retry_policy_method(mock_session, request_obj):
+    mock_session.retry_policy = RetryPolicy(max_attempts=10)
+    assert request_obj.retry_policy() is NOT_SENT_RETRY
+
+
+@pytest.mark.parametrize(
+    "responses",
+    (
+        [ReadTimeout(), mock.Mock(status_code=500, headers={})],
+        [mock.Mock(status_code=500, headers={})],
+        [mock.Mock(status_code=502, headers={"Retry-After": "1"})],
+        [mock.Mock(status_code=503, headers={})],
+        [mock.Mock(status_code=429, headers={})],
+    ),
+)
+@mock.patch("parcelhubapi.request.time.sleep")
+def test_call_method_does_not_resend_shipments_that_may_have_been_created(
+    mock_sleep, mock_session, request_obj, responses
+):
+    mock_session.transport.request.side_effect = (
+        responses + [mock.Mock(status_code=500, headers={})] * 3
+    )
+    with mock.patch("parcelhubapi.request.etree.tostring", return_value=b""):
+        with pytest.raises(Exception):
+            request_obj.call(shipment_request=mock.Mock(reference="ORDER-1"))
+    mock_session.transport.request.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "first",
+    (
+        ConnectError("refused"),
+        mock.Mock(status_code=503, headers={"Retry-After": "1"}),
+        mock.Mock(status_code=429, headers={"Retry-After": "1"}),
+    ),
+)
+@mock.patch("parcelhubapi.request.time.sleep")
+def test_call_method_resends_shipments_that_were_not_processed(
+    mock_sleep, mock_session, request_obj, response_text, first
+):
+    mock_session.transport.request.side_effect = [
+        first,
+        mock.Mock(status_code=200, text=response_text),
+    ]
+    with mock.patch("parcelhubapi.request.etree.tostring", return_value=b""):
+        request_obj.call(shipment_request=mock.Mock(reference="ORDER-1"))
+    assert mock_session.transport.request.call_count == 2
+
+
+@mock.patch("parcelhubapi.request.time.sleep")
+def test_call_method_serializes_shipment_once_across_retries(
+    mock_sleep, mock_session, request_obj, response_text
+):
+    shipment_request = mock.Mock(reference="ORDER-1")
+    mock_session.transport.request.side_effect = [
+        ConnectError("refused"),
+        mock.Mock(status_code=200, text=response_text),
+    ]
+    with mock.patch("parcelhubapi.request.etree.tostring") as mock_tostring:
+        request_obj.call(shipment_request=shipment_request)
+    shipment_request.as_xml.assert_called_once_with()
+    mock_tostring.assert_called_once()
+    assert mock_session.transport.request.call_count == 2
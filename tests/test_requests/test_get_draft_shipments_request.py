@@ -50,8 +50,7 @@ def test_parse_response_method(request_obj):
     assert request_obj.parse_response(response) == response.text
 
 
-@mock.patch("parcelhubapi.request.requests")
-def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
+def test_call_method(mock_session, request_args, request_kwargs, request_obj):
     request_obj.url = mock.Mock()
     request_obj.headers = mock.Mock()
     request_obj.params = mock.Mock()
@@ -62,15 +61,16 @@ def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
     request_obj.headers.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.params.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.data.assert_called_once_with(*request_args, **request_kwargs)
-    mock_requests.request.assert_called_once_with(
+    mock_session.transport.request.assert_called_once_with(
         url=request_obj.url.return_value,
         method=request_obj.METHOD,
         headers=request_obj.headers.return_value,
         params=request_obj.params.return_value,
         data=request_obj.data.return_value,
+        timeout=request_obj.TIMEOUT,
     )
-    mock_requests.request.return_value.raise_for_status.assert_called_once_with()
+    mock_session.transport.request.return_value.raise_for_status.assert_called_once_with()
     request_obj.parse_response.assert_called_once_with(
-        mock_requests.request.return_value, *request_args, **request_kwargs
+        mock_session.transport.request.return_value, *request_args, **request_kwargs
     )
     assert value == request_obj.parse_response.return_value
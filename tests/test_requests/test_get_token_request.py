@@ -2,6 +2,7 @@ from unittest import mock
 
 import pytest
 
+from parcelhubapi.exceptions import ResponseParsingError
 from parcelhubapi.request import BaseParcelhubApiRequest, GetTokenRequest
 
 
@@ -18,6 +19,10 @@ def test_method_attribute(request_obj):
     assert request_obj.METHOD == BaseParcelhubApiRequest.POST
 
 
+def test_priority_attribute(request_obj):
+    assert request_obj.PRIORITY is None
+
+
 def test_init_method(mock_session, request_obj):
     assert request_obj.session == mock_session
 
@@ -64,11 +69,20 @@ def test_parse_response_method(request_obj, refresh_token, access_token):
         "</TokenV2>"
     )
     response = mock.Mock(text=response_text)
-    assert request_obj.parse_response(response) == (access_token, refresh_token)
+    with mock.patch("parcelhubapi.models.time.time", return_value=1000):
+        token = request_obj.parse_response(response)
+    assert token.access_token == access_token
+    assert token.refresh_token == refresh_token
+    assert token.expires_at == 15400
+
 
+def test_parse_response_method_with_invalid_response(request_obj):
+    response = mock.Mock(text="Invalid Response")
+    with pytest.raises(ResponseParsingError):
+        request_obj.parse_response(response)
 
-@mock.patch("parcelhubapi.request.requests")
-def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
+
+def test_call_method(mock_session, request_args, request_kwargs, request_obj):
     request_obj.url = mock.Mock()
     request_obj.headers = mock.Mock()
     request_obj.params = mock.Mock()
@@ -79,15 +93,32 @@ def test_call_method(mock_requests, request_args, request_kwargs, request_obj):
     request_obj.headers.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.params.assert_called_once_with(*request_args, **request_kwargs)
     request_obj.data.assert_called_once_with(*request_args, **request_kwargs)
-    mock_requests.request.assert_called_once_with(
+    mock_session.transport.request.assert_called_once_with(
         url=request_obj.url.return_value,
         method=request_obj.METHOD,
         headers=request_obj.headers.return_value,
         params=request_obj.params.return_value,
         data=request_obj.data.return_value,
+        timeout=request_obj.TIMEOUT,
     )
-    mock_requests.request.return_value.raise_for_status.assert_called_once_with()
+    mock_session.transport.request.return_value.raise_for_status.assert_called_once_with()
     request_obj.parse_response.assert_called_once_with(
-        mock_requests.request.return_value, *request_args, **request_kwargs
+        mock_session.transport.request.return_value, *request_args, **request_kwargs
     )
     assert value == request_obj.parse_response.return_value
+
+
+def test_call_method_does_not_renew_token(mock_session, request_obj):
+    mock_session.transport.request.return_value = mock.Mock(status_code=401)
+    request_obj.parse_response = mock.Mock()
+    request_obj.call()
+    mock_session.ensure_token.assert_not_called()
+    mock_session.renew_session.assert_not_called()
+
+
+def test_timeout_attribute(request_obj):
+    assert request_obj.TIMEOUT == (5, 15)
+
+
+def test_is_retry_safe_method(request_obj):
+    assert request_obj.is_retry_safe() is True
@@ -0,0 +1,40 @@
+import pytest
+
+from parcelhubapi.request import (
+    BaseParcelhubApiRequest,
+    GetTokenRequest,
+    RefreshTokenRequest,
+)
+
+
+@pytest.fixture
+def request_obj(mock_session):
+    return RefreshTokenRequest(session=mock_session)
+
+
+def test_is_get_token_request(request_obj):
+    assert isinstance(request_obj, GetTokenRequest)
+
+
+def test_url_method(request_obj):
+    assert request_obj.url() == "https://api.test.com/1.0/TokenV2"
+
+
+def test_method_attribute(request_obj):
+    assert request_obj.METHOD == BaseParcelhubApiRequest.POST
+
+
+def test_requires_auth_attribute(request_obj):
+    assert request_obj.REQUIRES_AUTH is False
+
+
+def test_data_method(request_obj, refresh_token):
+    expected = (
+        "<?xml version='1.0' encoding='utf-8'?>\n<RequestToken "
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+        "<grant_type>refresh_token</grant_type>"
+        f"<refreshToken>{refresh_token}</refreshToken>"
+        "</RequestToken>"
+    )
+    assert request_obj.data().decode("utf-8") == expected
@@ -0,0 +1,125 @@
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.retry import NO_RETRY, NOT_SENT_RETRY, RetryPolicy
+
+
+def response(status_code, headers=None):
+    return mock.Mock(status_code=status_code, headers=headers or {})
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(max_attempts=4, backoff_factor=1, max_backoff=5, jitter=False)
+
+
+@pytest.mark.parametrize("status_code", RetryPolicy.RETRY_STATUSES)
+def test_is_retryable_with_transient_status(policy, status_code):
+    assert policy.is_retryable(response=response(status_code)) is True
+
+
+@pytest.mark.parametrize("status_code", (200, 400, 401, 404, 501))
+def test_is_retryable_with_other_status(policy, status_code):
+    assert policy.is_retryable(response=response(status_code)) is False
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    (
+        (ConnectionError(), True),
+        (TimeoutError(), True),
+        (ValueError(), False),
+        (exceptions.DeadlineExceededError(), False),
+    ),
+)
+def test_is_retryable_with_error(policy, error, expected):
+    assert policy.is_retryable(error=error) is expected
+
+
+@pytest.mark.parametrize("attempt,expected", ((1, 1), (2, 2), (3, 4), (4, 5)))
+def test_backoff_is_exponential_and_capped(policy, attempt, expected):
+    assert policy.backoff(attempt) == expected
+
+
+def test_backoff_with_jitter():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+    with mock.patch("parcelhubapi.retry.random.uniform") as mock_uniform:
+        assert policy.backoff(3) == mock_uniform.return_value
+    mock_uniform.assert_called_once_with(0, 4)
+
+
+def test_backoff_uses_retry_after(policy):
+    assert policy.backoff(1, response=response(429, {"Retry-After": "3"})) == 3
+
+
+def test_backoff_caps_retry_after(policy):
+    assert policy.backoff(1, response=response(429, {"Retry-After": "60"})) == 5
+
+
+def test_backoff_ignores_retry_after_when_disabled():
+    policy = RetryPolicy(backoff_factor=1, jitter=False, respect_retry_after=False)
+    assert policy.backoff(1, response=response(429, {"Retry-After": "3"})) == 1
+
+
+def test_parse_retry_after_ignores_header_case():
+    assert RetryPolicy.parse_retry_after(response(503, {"retry-after": "2"})) == 2
+    assert RetryPolicy.parse_retry_after(response(503, {"RETRY-AFTER": "3"})) == 3
+
+
+def test_parse_retry_after_without_header():
+    assert RetryPolicy.parse_retry_after(response(503, {})) is None
+
+
+def test_parse_retry_after_with_http_date():
+    with mock.patch("parcelhubapi.retry.time.time", return_value=782724567):
+        delay = RetryPolicy.parse_retry_after(
+            response(503, {"Retry-After": "Wed, 21 Oct 1994 07:29:37 GMT"})
+        )
+    assert delay == 10
+
+
+def test_parse_retry_after_with_invalid_value():
+    assert RetryPolicy.parse_retry_after(response(503, {"Retry-After": "?"})) is None
+
+
+def test_retry_delay(policy):
+    assert policy.retry_delay(1, response=response(503)) == 1
+
+
+def test_retry_delay_after_last_attempt(policy):
+    assert policy.retry_delay(4, response=response(503)) is None
+
+
+def test_retry_delay_with_permanent_failure(policy):
+    assert policy.retry_delay(1, response=response(400)) is None
+
+
+def test_retry_delay_past_deadline(policy):
+    assert policy.retry_delay(3, response=response(503), deadline=Deadline(2)) is None
+
+
+def test_no_retry():
+    assert NO_RETRY.retry_delay(1, response=response(503)) is None
+
+
+def test_require_retry_after():
+    policy = RetryPolicy(require_retry_after=True, jitter=False)
+    assert policy.retry_delay(1, response=response(503)) is None
+    assert policy.retry_delay(1, response=response(503, {"Retry-After": "2"})) == 2
+
+
+def test_not_sent_retry():
+    assert NOT_SENT_RETRY.retry_delay(1, error=exceptions.ConnectError("x")) is not None
+    assert NOT_SENT_RETRY.retry_delay(1, error=ConnectionError()) is None
+    assert NOT_SENT_RETRY.retry_delay(1, error=TimeoutError()) is None
+    assert NOT_SENT_RETRY.retry_delay(1, response=response(500)) is None
+    assert NOT_SENT_RETRY.retry_delay(1, response=response(503)) is None
+    assert (
+        NOT_SENT_RETRY.retry_delay(1, response=response(429, {"Retry-After": "1"})) == 1
+    )
+    assert (
+        NOT_SENT_RETRY.retry_delay(1, response=response(503, {"retry-after": "1"})) == 1
+    )
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.scheduler import QueueWait, RequestScheduler
+
+URGENT, NORMAL, BULK = 0, 1, 2
+
+
+def wait_until(condition, timeout=5):
+    stop = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < stop
+        time.sleep(0.001)
+
+
+def queue_requests(scheduler, requests):
+    order = []
+    threads = []
+    for priority, account_id in requests:
+
+        def run(priority=priority, account_id=account_id):
+            scheduler.acquire(priority=priority, account_id=account_id)
+            order.append((priority, account_id))
+            scheduler.release()
+
+        queued = scheduler.queued
+        thread = threading.Thread(target=run)
+        thread.start()
+        wait_until(lambda: scheduler.queued == queued + 1)
+        threads.append(thread)
+    return order, threads
+
+
+def run_queued(scheduler, requests):
+    scheduler.acquire()
+    order, threads = queue_requests(scheduler, requests)
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_acquire_counts_requests_in_flight():
+    scheduler = RequestScheduler(max_concurrency=2)
+    scheduler.acquire()
+    assert scheduler.in_flight == 1
+    scheduler.release()
+    assert scheduler.in_flight == 0
+
+
+def test_acquire_does_not_wait_under_budget():
+    scheduler = RequestScheduler(max_concurrency=2)
+    scheduler.acquire(priority=BULK, account_id="ACCOUNT_1")
+    scheduler.acquire(priority=BULK, account_id="ACCOUNT_1")
+    assert scheduler.queued == 0
+    assert [wait.seconds for wait in scheduler.waits] == [0.0, 0.0]
+
+
+def test_acquire_waits_for_release():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire()
+    order, threads = queue_requests(scheduler, [(NORMAL, "ACCOUNT_1")])
+    assert order == []
+    assert scheduler.queued == 1
+    scheduler.release()
+    threads[0].join()
+    assert order == [(NORMAL, "ACCOUNT_1")]
+    assert scheduler.queued == 0
+    assert scheduler.in_flight == 0
+
+
+def test_higher_priority_requests_are_sent_first():
+    scheduler = RequestScheduler(max_concurrency=1)
+    order = run_queued(
+        scheduler, [(BULK, "ACCOUNT_1"), (NORMAL, "ACCOUNT_1"), (URGENT, "ACCOUNT_2")]
+    )
+    assert order == [(URGENT, "ACCOUNT_2"), (NORMAL, "ACCOUNT_1"), (BULK, "ACCOUNT_1")]
+
+
+def test_accounts_share_budget_fairly():
+    scheduler = RequestScheduler(max_concurrency=1)
+    requests = [(BULK, "ACCOUNT_1")] * 4 + [(BULK, "ACCOUNT_2")] * 2
+    order = run_queued(scheduler, requests)
+    assert [account_id for _, account_id in order] == [
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+        "ACCOUNT_1",
+        "ACCOUNT_1",
+    ]
+
+
+def test_accounts_share_budget_by_weight():
+    scheduler = RequestScheduler(max_concurrency=1, weights={"ACCOUNT_1": 2})
+    requests = [(BULK, "ACCOUNT_1")] * 4 + [(BULK, "ACCOUNT_2")] * 2
+    order = run_queued(scheduler, requests)
+    assert [account_id for _, account_id in order] == [
+        "ACCOUNT_1",
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+        "ACCOUNT_1",
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+    ]
+
+
+def test_idle_account_does_not_bank_its_share():
+    scheduler = RequestScheduler(max_concurrency=1)
+    run_queued(scheduler, [(BULK, "ACCOUNT_1")] * 4)
+    requests = [(BULK, "ACCOUNT_1")] * 2 + [(BULK, "ACCOUNT_2")] * 3
+    order = run_queued(scheduler, requests)
+    assert [account_id for _, account_id in order] == [
+        "ACCOUNT_2",
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+        "ACCOUNT_1",
+        "ACCOUNT_2",
+    ]
+
+
+def test_set_weight():
+    scheduler = RequestScheduler()
+    scheduler.set_weight("ACCOUNT_1", 3)
+    assert scheduler.weights == {"ACCOUNT_1": 3}
+
+
+def test_acquire_raises_when_deadline_expires():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire()
+    with pytest.raises(exceptions.DeadlineExceededError):
+        scheduler.acquire(deadline=Deadline(0.01))
+    assert scheduler.queued == 0
+    scheduler.release()
+    assert scheduler.in_flight == 0
+
+
+def test_acquire_succeeds_if_granted_as_deadline_expires():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire()
+    with mock.patch("parcelhubapi.scheduler.threading.Event") as mock_event:
+        mock_event.return_value.wait.side_effect = lambda timeout: scheduler.release()
+        scheduler.acquire(deadline=Deadline(0.01))
+    assert scheduler.in_flight == 1
+
+
+def test_queue_wait_is_recorded():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire()
+    with mock.patch.object(RequestScheduler, "clock", return_value=10.0):
+        order, threads = queue_requests(scheduler, [(NORMAL, "ACCOUNT_1")])
+    with mock.patch.object(RequestScheduler, "clock", return_value=12.5):
+        scheduler.release()
+    threads[0].join()
+    wait = scheduler.waits[-1]
+    assert (wait.priority, wait.account_id, wait.seconds) == (NORMAL, "ACCOUNT_1", 2.5)
+
+
+def test_waits_are_limited_to_history():
+    scheduler = RequestScheduler(history=2)
+    for _ in range(3):
+        scheduler.acquire()
+    assert len(scheduler.waits) == 2
+
+
+def test_stats():
+    scheduler = RequestScheduler()
+    scheduler.waits.extend(
+        [
+            QueueWait(BULK, "ACCOUNT_1", 1.0),
+            QueueWait(BULK, "ACCOUNT_2", 3.0),
+            QueueWait(URGENT, "ACCOUNT_1", 0.5),
+        ]
+    )
+    assert scheduler.stats() == {
+        URGENT: {"requests": 1, "mean_wait": 0.5, "max_wait": 0.5},
+        BULK: {"requests": 2, "mean_wait": 2.0, "max_wait": 3.0},
+    }
+
+
+def test_queue_wait_repr():
+    assert repr(QueueWait(0, "ACCOUNT_1", 1.25)) == "QueueWait(0, 'ACCOUNT_1', 1.250)"
+
+
+def test_acquire_async_waits_for_release():
+    scheduler = RequestScheduler(max_concurrency=1)
+
+    async def main():
+        scheduler.acquire()
+        task = asyncio.create_task(scheduler.acquire_async(account_id="ACCOUNT_1"))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        scheduler.release()
+        await task
+        return scheduler.in_flight
+
+    assert asyncio.run(main()) == 1
+
+
+def test_acquire_async_raises_when_deadline_expires():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire()
+
+    async def main():
+        await scheduler.acquire_async(deadline=Deadline(0.01))
+
+    with pytest.raises(exceptions.DeadlineExceededError):
+        asyncio.run(main())
+    assert scheduler.queued == 0
+
+
+def test_cancelled_acquire_async_is_withdrawn():
+    scheduler = RequestScheduler(max_concurrency=1)
+
+    async def main():
+        scheduler.acquire()
+        task = asyncio.create_task(scheduler.acquire_async())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert scheduler.queued == 0
+    scheduler.release()
+    assert scheduler.in_flight == 0
@@ -1,10 +1,15 @@
+import threading
+import time
 from unittest import mock
 
 import pytest
-import toml
 
 from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.models import AccessToken
 from parcelhubapi.session import ParcelhubAPISession
+from parcelhubapi.token_cache import FileTokenCache
+from parcelhubapi.transport import InMemoryTransport, RequestsTransport
 
 
 @pytest.fixture(autouse=True)
@@ -45,10 +50,11 @@ def config_filename():
 
 @pytest.fixture
 def config_file(temp_cwd, config_filename, username, password, account_id):
-    data = {"USERNAME": username, "PASSWORD": password, "ACCOUNT_ID": account_id}
     path = temp_cwd / config_filename
     with open(path, "w") as f:
-        toml.dump(data, f)
+        f.write(f'USERNAME = "{username}"\n')
+        f.write(f'PASSWORD = "{password}"\n')
+        f.write(f'ACCOUNT_ID = "{account_id}"\n')
     return path
 
 
@@ -84,12 +90,26 @@ def mock_authorise_session_method():
 
 
 @pytest.fixture
-def mock_get_token_request(access_token, refresh_token):
+def token(access_token, refresh_token):
+    return AccessToken(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_at=time.time() + 3600,
+    )
+
+
+@pytest.fixture
+def mock_get_token_request(token):
     with mock.patch("parcelhubapi.session.GetTokenRequest") as m:
-        m.return_value.call.return_value = (access_token, refresh_token)
+        m.return_value.call.return_value = token
         yield m
 
 
+@pytest.fixture
+def token_cache(temp_cwd):
+    return FileTokenCache(temp_cwd / "tokens.json")
+
+
 def test_init_sets_passed_credentials(username, password, account_id):
     session = ParcelhubAPISession(
         username=username, password=password, account_id=account_id
@@ -124,26 +144,85 @@ def test_enter_method_with_load_credentials_from_file(
     mock_credentials_are_set_method,
     mock_load_from_config_file_method,
 ):
-    mock_credentials_are_set_method.side_effect = [False, True]
+    mock_credentials_are_set_method.side_effect = [False, False, True]
     with ParcelhubAPISession():
         pass
-    mock_credentials_are_set_method.call_count == 2
+    mock_credentials_are_set_method.call_count == 3
     mock_load_from_config_file_method.assert_called_once_with()
     mock_authorise_session_method.assert_called_once_with()
 
 
+def test_enter_method_with_credentials_from_environment(
+    monkeypatch,
+    username,
+    password,
+    account_id,
+    mock_load_from_config_file_method,
+    mock_authorise_session_method,
+):
+    monkeypatch.setenv("PARCELHUBAPI_USERNAME", username)
+    monkeypatch.setenv("PARCELHUBAPI_PASSWORD", password)
+    monkeypatch.setenv("PARCELHUBAPI_ACCOUNT_ID", account_id)
+    with ParcelhubAPISession() as session:
+        assert session.username == username
+        assert session.password == password
+        assert session.account_id == account_id
+    mock_load_from_config_file_method.assert_not_called()
+
+
+def test_load_credentials_method_with_credentials_set(
+    username, password, account_id, mock_load_from_config_file_method
+):
+    session = ParcelhubAPISession(
+        username=username, password=password, account_id=account_id
+    )
+    session.load_credentials()
+    mock_load_from_config_file_method.assert_not_called()
+
+
+def test_load_credentials_method_without_credentials(
+    monkeypatch, mock_load_from_config_file_method
+):
+    monkeypatch.delenv("PARCELHUBAPI_USERNAME", raising=False)
+    with pytest.raises(exceptions.LoginCredentialsNotSetError):
+        ParcelhubAPISession().load_credentials()
+    mock_load_from_config_file_method.assert_called_once_with()
+
+
+def test_load_credentials_method_without_environment_or_config_file(monkeypatch):
+    for name in (
+        "PARCELHUBAPI_USERNAME",
+        "PARCELHUBAPI_PASSWORD",
+        "PARCELHUBAPI_ACCOUNT_ID",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(exceptions.LoginCredentialsNotSetError):
+        ParcelhubAPISession().load_credentials()
+
+
+def test_load_from_environment_keeps_passed_credentials(monkeypatch, password):
+    monkeypatch.setenv("PARCELHUBAPI_USERNAME", "ENV_USERNAME")
+    monkeypatch.setenv("PARCELHUBAPI_PASSWORD", password)
+    monkeypatch.delenv("PARCELHUBAPI_ACCOUNT_ID", raising=False)
+    session = ParcelhubAPISession(username="USERNAME")
+    assert session.load_from_environment() is False
+    assert session.username == "USERNAME"
+    assert session.password == password
+    assert session.account_id is None
+
+
 def test_enter_method_without_config_or_path(
     mock_credentials_are_set_method,
     mock_load_from_config_file_method,
     mock_find_config_filepath_method,
     mock_authorise_session_method,
 ):
-    mock_credentials_are_set_method.side_effect = [False, False]
+    mock_credentials_are_set_method.side_effect = [False, False, False]
     mock_find_config_filepath_method.return_value = None
     with pytest.raises(exceptions.LoginCredentialsNotSetError):
         with ParcelhubAPISession():
             pass
-    mock_credentials_are_set_method.call_count == 2
+    mock_credentials_are_set_method.call_count == 3
     mock_authorise_session_method.assert_not_called()
 
 
@@ -224,10 +303,349 @@ def test_load_from_config_file_method_without_passing_path(
     assert session.account_id == account_id
 
 
-def test_authorise_session_method(mock_get_token_request, access_token, refresh_token):
+def test_authorise_session_method(
+    mock_get_token_request, token, access_token, refresh_token
+):
     session = ParcelhubAPISession()
     session.authorise_session()
     mock_get_token_request.assert_called_once_with(session)
-    mock_get_token_request.return_value.call.assert_called_once_with()
+    mock_get_token_request.return_value.call.assert_called_once_with(deadline=None)
+    assert session.token is token
     assert session.access_token == access_token
     assert session.refresh_token == refresh_token
+
+
+def test_access_token_without_token():
+    session = ParcelhubAPISession()
+    assert session.access_token is None
+    assert session.refresh_token is None
+
+
+def test_authorise_session_method_stores_token_in_cache(
+    mock_get_token_request, token, token_cache, username, account_id
+):
+    session = ParcelhubAPISession(
+        username=username, account_id=account_id, token_cache=token_cache
+    )
+    session.authorise_session()
+    mock_get_token_request.return_value.call.assert_called_once_with(deadline=None)
+    assert token_cache.get(username, account_id).to_dict() == token.to_dict()
+
+
+def test_authorise_session_method_uses_cached_token(
+    mock_get_token_request, token, token_cache, username, account_id
+):
+    token_cache.set(username, account_id, token)
+    session = ParcelhubAPISession(
+        username=username, account_id=account_id, token_cache=token_cache
+    )
+    session.authorise_session()
+    mock_get_token_request.assert_not_called()
+    assert session.access_token == token.access_token
+
+
+def test_authorise_session_method_ignores_expiring_cached_token(
+    mock_get_token_request, token, token_cache, username, account_id
+):
+    expiring_token = AccessToken(
+        access_token="OLD_TOKEN",
+        refresh_token="OLD_REFRESH_TOKEN",
+        expires_at=time.time() + ParcelhubAPISession.TOKEN_EXPIRY_MARGIN - 1,
+    )
+    token_cache.set(username, account_id, expiring_token)
+    session = ParcelhubAPISession(
+        username=username, account_id=account_id, token_cache=token_cache
+    )
+    session.authorise_session()
+    mock_get_token_request.return_value.call.assert_called_once_with(deadline=None)
+    assert session.token is token
+    assert token_cache.get(username, account_id).access_token == token.access_token
+
+
+def test_init_creates_requests_transport():
+    session = ParcelhubAPISession(pool_connections=3, pool_maxsize=7, pool_block=True)
+    assert isinstance(session.transport, RequestsTransport)
+    adapter = session.transport.http_session.get_adapter(session.LIVE_DOMAIN)
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert adapter._pool_block is True
+
+
+def test_init_sets_passed_transport():
+    transport = InMemoryTransport()
+    session = ParcelhubAPISession(transport=transport)
+    assert session.transport is transport
+
+
+def test_exit_method_closes_transport(
+    mock_credentials_are_set_method, mock_authorise_session_method
+):
+    transport = mock.Mock()
+    with ParcelhubAPISession(transport=transport):
+        pass
+    transport.close.assert_called_once_with()
+
+
+def test_close_method_stops_hedging_policy():
+    hedging_policy = mock.Mock()
+    session = ParcelhubAPISession(transport=mock.Mock(), hedging_policy=hedging_policy)
+    session.close()
+    hedging_policy.close.assert_called_once_with()
+
+
+@pytest.fixture
+def mock_refresh_token_request():
+    with mock.patch("parcelhubapi.session.RefreshTokenRequest") as m:
+        m.return_value.call.return_value = AccessToken(
+            access_token="REFRESHED_TOKEN",
+            refresh_token="NEW_REFRESH_TOKEN",
+            expires_at=time.time() + 3600,
+        )
+        yield m
+
+
+@pytest.fixture
+def expiring_token():
+    return AccessToken(
+        access_token="EXPIRING_TOKEN",
+        refresh_token="EXPIRING_REFRESH_TOKEN",
+        expires_at=time.time() + ParcelhubAPISession.TOKEN_EXPIRY_MARGIN - 1,
+    )
+
+
+def test_renew_session_method_uses_refresh_token(
+    mock_get_token_request, mock_refresh_token_request, token
+):
+    session = ParcelhubAPISession()
+    session.token = token
+    session.renew_session()
+    mock_refresh_token_request.assert_called_once_with(session)
+    mock_get_token_request.assert_not_called()
+    assert session.access_token == "REFRESHED_TOKEN"
+    assert session.refresh_token == "NEW_REFRESH_TOKEN"
+
+
+def test_renew_session_method_without_token(
+    mock_get_token_request, mock_refresh_token_request, token
+):
+    session = ParcelhubAPISession()
+    session.renew_session()
+    mock_refresh_token_request.assert_not_called()
+    assert session.token is token
+
+
+def test_renew_session_method_logs_in_when_refresh_fails(
+    mock_get_token_request, mock_refresh_token_request, token, expiring_token
+):
+    mock_refresh_token_request.return_value.call.side_effect = (
+        exceptions.ResponseStatusError(mock.Mock(status_code=400, text=""))
+    )
+    session = ParcelhubAPISession()
+    session.token = expiring_token
+    session.renew_session()
+    mock_get_token_request.return_value.call.assert_called_once_with(deadline=None)
+    assert session.token is token
+
+
+def test_renew_session_method_uses_token_refreshed_by_another_process(
+    mock_get_token_request,
+    mock_refresh_token_request,
+    token,
+    expiring_token,
+    token_cache,
+    username,
+    account_id,
+):
+    token_cache.set(username, account_id, token)
+    session = ParcelhubAPISession(
+        username=username, account_id=account_id, token_cache=token_cache
+    )
+    session.token = expiring_token
+    session.renew_session()
+    mock_refresh_token_request.assert_not_called()
+    assert session.access_token == token.access_token
+
+
+def test_renew_session_method_stores_refreshed_token_in_cache(
+    mock_refresh_token_request, token, token_cache, username, account_id
+):
+    token_cache.set(username, account_id, token)
+    session = ParcelhubAPISession(
+        username=username, account_id=account_id, token_cache=token_cache
+    )
+    session.token = token
+    session.renew_session()
+    mock_refresh_token_request.return_value.call.assert_called_once_with(deadline=None)
+    assert token_cache.get(username, account_id).access_token == "REFRESHED_TOKEN"
+
+
+def test_ensure_token_method_with_valid_token(mock_authorise_session_method, token):
+    session = ParcelhubAPISession()
+    session.token = token
+    with mock.patch.object(session, "renew_session") as mock_renew_session:
+        session.ensure_token()
+    mock_renew_session.assert_not_called()
+
+
+def test_ensure_token_method_with_expiring_token(expiring_token):
+    session = ParcelhubAPISession()
+    session.token = expiring_token
+    with mock.patch.object(session, "renew_session") as mock_renew_session:
+        session.ensure_token()
+    mock_renew_session.assert_called_once_with(
+        stale_token=expiring_token, deadline=None
+    )
+
+
+def test_ensure_token_method_without_token():
+    session = ParcelhubAPISession()
+    with mock.patch.object(session, "renew_session") as mock_renew_session:
+        session.ensure_token()
+    mock_renew_session.assert_called_once_with(stale_token=None, deadline=None)
+
+
+def test_ensure_token_method_returns_token(token):
+    session = ParcelhubAPISession()
+    session.token = token
+    assert session.ensure_token() is token
+
+
+def test_renew_session_method_skips_token_already_renewed(
+    mock_get_token_request, mock_refresh_token_request, token, expiring_token
+):
+    session = ParcelhubAPISession()
+    session.token = token
+    session.renew_session(stale_token=expiring_token)
+    mock_refresh_token_request.assert_not_called()
+    mock_get_token_request.assert_not_called()
+    assert session.token is token
+
+
+def test_ensure_token_method_renews_once_for_concurrent_threads(
+    mock_refresh_token_request, expiring_token
+):
+    def slow_refresh(deadline=None):
+        time.sleep(0.05)
+        return AccessToken(
+            access_token="REFRESHED_TOKEN",
+            refresh_token="NEW_REFRESH_TOKEN",
+            expires_at=time.time() + 3600,
+        )
+
+    mock_refresh_token_request.return_value.call.side_effect = slow_refresh
+    session = ParcelhubAPISession()
+    session.token = expiring_token
+    barrier = threading.Barrier(8)
+    tokens = []
+
+    def ensure_token():
+        barrier.wait()
+        tokens.append(session.ensure_token().access_token)
+
+    threads = [threading.Thread(target=ensure_token) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert mock_refresh_token_request.return_value.call.call_count == 1
+    assert tokens == ["REFRESHED_TOKEN"] * 8
+
+
+def test_enter_method_with_prewarm_does_not_block(
+    mock_credentials_are_set_method, mock_authorise_session_method
+):
+    with mock.patch(
+        "parcelhubapi.session.ParcelhubAPISession.start_prewarm"
+    ) as mock_start_prewarm:
+        with ParcelhubAPISession(prewarm=True, transport=mock.Mock()):
+            pass
+    mock_start_prewarm.assert_called_once_with()
+    mock_authorise_session_method.assert_not_called()
+
+
+def test_prewarm_authenticates_and_opens_connection(mock_get_token_request, token):
+    transport = mock.Mock()
+    session = ParcelhubAPISession(transport=transport, prewarm=True)
+    session.start_prewarm()
+    session.wait_for_prewarm()
+    assert session.token is token
+    transport.prewarm.assert_called_once_with(session.DOMAIN)
+    assert session.prewarm_duration is not None
+
+
+def test_ensure_token_method_waits_for_prewarm(mock_get_token_request, token):
+    release = threading.Event()
+
+    def slow_login(deadline=None):
+        release.wait()
+        return token
+
+    mock_get_token_request.return_value.call.side_effect = slow_login
+    session = ParcelhubAPISession(transport=mock.Mock(), prewarm=True)
+    session.start_prewarm()
+    threading.Timer(0.05, release.set).start()
+    assert session.ensure_token() is token
+    assert mock_get_token_request.return_value.call.call_count == 1
+    assert session.prewarm_wait > 0
+
+
+def test_ensure_token_method_does_not_wait_for_prewarm_connection(
+    mock_get_token_request, token
+):
+    release = threading.Event()
+    transport = mock.Mock()
+    transport.prewarm.side_effect = lambda url: release.wait(5)
+    session = ParcelhubAPISession(transport=transport, prewarm=True)
+    session.start_prewarm()
+    try:
+        assert session.ensure_token() is token
+        assert session._prewarm_thread.is_alive()
+    finally:
+        release.set()
+        session.wait_for_prewarm()
+
+
+def test_wait_for_prewarm_times_out(mock_get_token_request):
+    release = threading.Event()
+    transport = mock.Mock()
+    transport.prewarm.side_effect = lambda url: release.wait(5)
+    session = ParcelhubAPISession(transport=transport, prewarm=True)
+    session.start_prewarm()
+    session.wait_for_prewarm(timeout=0.01)
+    assert session._prewarm_thread is not None
+    release.set()
+    session.wait_for_prewarm()
+    assert session._prewarm_thread is None
+
+
+def test_prewarm_errors_are_raised_by_first_request(mock_get_token_request, token):
+    mock_get_token_request.return_value.call.side_effect = [Exception, token]
+    session = ParcelhubAPISession(transport=mock.Mock(), prewarm=True)
+    session.start_prewarm()
+    assert session.ensure_token() is token
+    assert mock_get_token_request.return_value.call.call_count == 2
+
+
+def test_cold_start_saved():
+    session = ParcelhubAPISession()
+    assert session.cold_start_saved is None
+    session.prewarm_duration = 0.5
+    session.prewarm_wait = 0.2
+    assert session.cold_start_saved == pytest.approx(0.3)
+    session.prewarm_wait = 0.7
+    assert session.cold_start_saved == 0.0
+
+
+def test_close_method_waits_for_prewarm(mock_get_token_request):
+    session = ParcelhubAPISession(transport=mock.Mock(), prewarm=True)
+    session.start_prewarm()
+    session.close()
+    assert session._prewarm_thread is None
+    session.transport.close.assert_called_once_with()
+
+
+def test_ensure_token_method_passes_deadline_to_token_request(mock_get_token_request):
+    deadline = Deadline(30)
+    session = ParcelhubAPISession()
+    session.ensure_token(deadline=deadline)
+    mock_get_token_request.return_value.call.assert_called_once_with(deadline=deadline)
@@ -0,0 +1,252 @@
+import json
+import multiprocessing
+import pickle
+import time
+from unittest import mock
+
+import pytest
+
+from parcelhubapi import exceptions, sharding
+from parcelhubapi.models import AccessToken, CreateShipmentResponse, ShipmentRequest
+from parcelhubapi.session import ParcelhubAPISession
+from parcelhubapi.sharding import ShardedBatchRunner
+from parcelhubapi.sinks import JSONLSink
+from parcelhubapi.token_cache import FileTokenCache
+from parcelhubapi.transport import InMemoryTransport
+
+
+class UnpicklableError(Exception):
+    def __reduce__(self):
+        raise TypeError("Cannot pickle")
+
+
+def token(name):
+    return AccessToken(name, f"{name}-REFRESH", time.time() + 3600)
+
+
+def make_session(account_id):
+    session = ParcelhubAPISession(
+        username="USERNAME",
+        password="PASSWORD",
+        account_id=account_id,
+        transport=InMemoryTransport(),
+    )
+    session.token = token(f"TOKEN-{account_id}")
+    return session
+
+
+def create_shipment(session, shipment_request, draft=False, priority=None):
+    if shipment_request.reference == "REF-3":
+        raise ConnectionError("Failed")
+    if shipment_request.reference == "REF-5":
+        raise UnpicklableError("Unpicklable")
+    return CreateShipmentResponse(
+        shipment_id=f"{session.account_id}:{session.token.access_token}",
+        courier_tracking_number=shipment_request.reference,
+        parcelhub_tracking_number=str(draft),
+    )
+
+
+@pytest.fixture
+def sessions():
+    return [make_session("ACCOUNT_1"), make_session("ACCOUNT_2")]
+
+
+@pytest.fixture
+def shipment_requests(sessions):
+    return [
+        ShipmentRequest(
+            session=sessions[i % 2],
+            reference=f"REF-{i}",
+            description="Goods",
+            currency="GBP",
+        )
+        for i in range(12)
+    ]
+
+
+@pytest.fixture
+def mock_create_shipment():
+    with mock.patch(
+        "parcelhubapi.sharding.batch.create_shipment", side_effect=create_shipment
+    ) as m:
+        yield m
+
+
+@pytest.fixture
+def runner(tmp_path):
+    return ShardedBatchRunner(
+        processes=2,
+        threads_per_process=2,
+        chunk_size=5,
+        token_cache_path=tmp_path / "tokens.json",
+        mp_context=multiprocessing.get_context("fork"),
+    )
+
+
+@pytest.fixture
+def worker_sessions():
+    yield sharding._worker_sessions
+    sharding._close_worker_sessions()
+
+
+def test_run_returns_results_in_order(runner, shipment_requests, mock_create_shipment):
+    results = runner.run(shipment_requests)
+    assert [result.index for result in results] == list(range(12))
+    for result, shipment_request in zip(results, shipment_requests, strict=True):
+        assert result.shipment_request is shipment_request
+
+
+def test_run_uses_account_sessions(runner, shipment_requests, mock_create_shipment):
+    results = runner.run(shipment_requests)
+    assert results[0].response.shipment_id == "ACCOUNT_1:TOKEN-ACCOUNT_1"
+    assert results[1].response.shipment_id == "ACCOUNT_2:TOKEN-ACCOUNT_2"
+    assert results[0].response.courier_tracking_number == "REF-0"
+
+
+def test_run_stores_errors(runner, shipment_requests, mock_create_shipment):
+    results = runner.run(shipment_requests)
+    assert [result.ok for result in results].count(False) == 2
+    assert isinstance(results[3].error, ConnectionError)
+    assert isinstance(results[5].error, exceptions.WorkerError)
+    assert results[5].error.error_type == "UnpicklableError"
+    assert results[5].error.message == "Unpicklable"
+
+
+def test_run_draft(tmp_path, shipment_requests, mock_create_shipment):
+    runner = ShardedBatchRunner(
+        processes=1,
+        draft=True,
+        token_cache_path=tmp_path / "tokens.json",
+        mp_context=multiprocessing.get_context("fork"),
+    )
+    results = runner.run(shipment_requests[:2])
+    assert results[0].response.parcelhub_tracking_number == "True"
+
+
+def test_run_writes_tokens_to_cache(
+    runner, tmp_path, shipment_requests, mock_create_shipment
+):
+    runner.run(shipment_requests)
+    token_cache = FileTokenCache(tmp_path / "tokens.json")
+    assert token_cache.get("USERNAME", "ACCOUNT_1").access_token == "TOKEN-ACCOUNT_1"
+    assert token_cache.get("USERNAME", "ACCOUNT_2").access_token == "TOKEN-ACCOUNT_2"
+
+
+def test_run_authorises_each_account_once(
+    runner, sessions, shipment_requests, mock_create_shipment
+):
+    with mock.patch.object(
+        ParcelhubAPISession, "ensure_token", autospec=True, return_value=token("T")
+    ) as mock_ensure_token:
+        runner.run(shipment_requests)
+    assert mock_ensure_token.call_count == 2
+
+
+def test_run_with_temporary_token_cache(shipment_requests, mock_create_shipment):
+    runner = ShardedBatchRunner(
+        processes=1, mp_context=multiprocessing.get_context("fork")
+    )
+    results = runner.run(shipment_requests)
+    assert len(results) == 12
+
+
+def test_run_writes_results_to_sink(
+    runner, tmp_path, shipment_requests, mock_create_shipment
+):
+    runner.sink = JSONLSink(tmp_path / "results.jsonl", flush_interval=None)
+    runner.run(shipment_requests)
+    with open(tmp_path / "results.jsonl") as f:
+        rows = [json.loads(line) for line in f]
+    assert sorted(row["index"] for row in rows) == list(range(12))
+    assert rows[0]["shipment_id"] == "ACCOUNT_1:TOKEN-ACCOUNT_1"
+
+
+def test_sink_errors_do_not_stop_run(runner, shipment_requests, mock_create_shipment):
+    error = OSError()
+    runner.sink = mock.Mock()
+    runner.sink.write.side_effect = error
+    runner.sink.flush.side_effect = error
+    results = runner.run(shipment_requests)
+    assert len(results) == 12
+    assert all(result.sink_error is error for result in results)
+    assert runner.sink.last_error is error
+
+
+def test_run_with_no_shipments(runner):
+    assert runner.run([]) == []
+
+
+def test_init_worker(tmp_path, worker_sessions):
+    accounts = [
+        {
+            "username": "USERNAME",
+            "password": "PASSWORD",
+            "account_id": "ACCOUNT_1",
+            "domain": ParcelhubAPISession.TEST_DOMAIN,
+            "token": token("TOKEN"),
+        }
+    ]
+    sharding._init_worker(accounts, tmp_path / "tokens.json", InMemoryTransport)
+    session = worker_sessions["ACCOUNT_1"]
+    assert session.username == "USERNAME"
+    assert session.password == "PASSWORD"
+    assert session.DOMAIN == ParcelhubAPISession.TEST_DOMAIN
+    assert session.token.access_token == "TOKEN"
+    assert isinstance(session.transport, InMemoryTransport)
+    assert session.token_cache.path == tmp_path / "tokens.json"
+
+
+def test_init_worker_closes_sessions_on_exit(tmp_path, worker_sessions):
+    accounts = [
+        {
+            "username": "USERNAME",
+            "password": "PASSWORD",
+            "account_id": "ACCOUNT_1",
+            "domain": ParcelhubAPISession.TEST_DOMAIN,
+            "token": token("TOKEN"),
+        }
+    ]
+    with mock.patch("parcelhubapi.sharding.multiprocessing.util.Finalize") as m:
+        sharding._init_worker(accounts, tmp_path / "tokens.json", InMemoryTransport)
+    m.assert_called_once_with(None, sharding._close_worker_sessions, exitpriority=10)
+    session = worker_sessions["ACCOUNT_1"]
+    with mock.patch.object(session, "close") as mock_close:
+        sharding._close_worker_sessions()
+    mock_close.assert_called_once_with()
+    assert worker_sessions == {}
+
+
+def test_create_chunk_does_not_request_tokens(
+    tmp_path, worker_sessions, shipment_requests, mock_create_shipment
+):
+    accounts = [
+        {
+            "username": "USERNAME",
+            "password": "PASSWORD",
+            "account_id": account_id,
+            "domain": ParcelhubAPISession.LIVE_DOMAIN,
+            "token": token("TOKEN"),
+        }
+        for account_id in ("ACCOUNT_1", "ACCOUNT_2")
+    ]
+    sharding._init_worker(accounts, tmp_path / "tokens.json", InMemoryTransport)
+    jobs = [
+        (i, sr.session.account_id, pickle.loads(pickle.dumps(sr)))
+        for i, sr in enumerate(shipment_requests)
+    ]
+    results = sharding._create_chunk(jobs, max_workers=2)
+    assert [result.shipment_request for result in results] == [None] * 12
+    for session in worker_sessions.values():
+        assert session.transport.requests == []
+
+
+def test_picklable_error():
+    error = ValueError("Invalid")
+    assert sharding._picklable_error(error) is error
+
+
+def test_picklable_error_replaces_unpicklable_errors():
+    error = sharding._picklable_error(UnpicklableError("Unpicklable"))
+    assert isinstance(error, exceptions.WorkerError)
+    assert str(error) == "UnpicklableError: Unpicklable"
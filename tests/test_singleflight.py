@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+
+from parcelhubapi import exceptions
+from parcelhubapi.deadline import Deadline
+from parcelhubapi.singleflight import SingleFlight
+
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight()
+
+
+def run_concurrently(single_flight, key, function, count=5):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = single_flight.do(key, function)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_do_returns_result(single_flight):
+    assert single_flight.do("key", lambda: "RESULT") == "RESULT"
+    assert single_flight.calls == 1
+
+
+def test_sequential_calls_are_not_shared(single_flight):
+    single_flight.do("key", lambda: 1)
+    single_flight.do("key", lambda: 2)
+    assert single_flight.calls == 2
+    assert single_flight.shared == 0
+
+
+def test_concurrent_calls_share_result(single_flight):
+    release = threading.Event()
+    calls = []
+    result = object()
+
+    def function():
+        calls.append(1)
+        release.wait(1)
+        return result
+
+    threads, results, errors = run_concurrently(single_flight, "key", function)
+    while single_flight.calls + single_flight.shared < 5:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert all(r is result for r in results)
+    assert single_flight.shared == 4
+
+
+def test_concurrent_calls_share_exception(single_flight):
+    release = threading.Event()
+
+    def function():
+        release.wait(1)
+        raise ConnectionError()
+
+    threads, results, errors = run_concurrently(single_flight, "key", function)
+    while single_flight.calls + single_flight.shared < 5:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(e, ConnectionError) for e in errors)
+
+
+def test_different_keys_are_not_shared(single_flight):
+    assert single_flight.do("a", lambda: single_flight.do("b", lambda: "B")) == "B"
+    assert single_flight.calls == 2
+
+
+def test_waiting_caller_raises_at_deadline(single_flight):
+    release = threading.Event()
+    thread = threading.Thread(
+        target=single_flight.do, args=("key", lambda: release.wait(1))
+    )
+    thread.start()
+    while single_flight.calls == 0:
+        pass
+    with pytest.raises(exceptions.DeadlineExceededError):
+        single_flight.do("key", lambda: None, deadline=Deadline(0.01))
+    release.set()
+    thread.join()
+
+
+def test_do_async_shares_result(single_flight):
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "RESULT"
+
+    async def main():
+        return await asyncio.gather(
+            *(single_flight.do_async("key", function) for _ in range(5))
+        )
+
+    assert asyncio.run(main()) == ["RESULT"] * 5
+    assert calls == [1]
+    assert single_flight.shared == 4
+    assert single_flight._tasks == {}
+
+
+def test_do_async_raises_at_deadline(single_flight):
+    async def function():
+        await asyncio.sleep(1)
+
+    async def main():
+        with pytest.raises(exceptions.DeadlineExceededError):
+            await single_flight.do_async("key", function, deadline=Deadline(0.01))
+
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+import csv
+import json
+import sqlite3
+import threading
+from unittest import mock
+
+import pytest
+
+from parcelhubapi.batch import ShipmentResult
+from parcelhubapi.models import CreateShipmentResponse
+from parcelhubapi.sinks import (
+    BaseResultSink,
+    CallbackSink,
+    CSVSink,
+    JSONLSink,
+    SQLiteSink,
+)
+
+
+def ok_result(index):
+    return ShipmentResult(
+        index,
+        mock.Mock(reference=f"REF-{index}"),
+        response=CreateShipmentResponse(f"SHIPMENT-{index}", "COURIER", "PARCELHUB"),
+    )
+
+
+def error_result(index):
+    return ShipmentResult(
+        index, mock.Mock(reference=f"REF-{index}"), error=ConnectionError("Failed")
+    )
+
+
+def ok_row(index):
+    return {
+        "index": index,
+        "reference": f"REF-{index}",
+        "shipment_id": f"SHIPMENT-{index}",
+        "courier_tracking_number": "COURIER",
+        "parcelhub_tracking_number": "PARCELHUB",
+        "error": None,
+    }
+
+
+def test_row_for_created_shipment():
+    assert BaseResultSink.row(ok_result(1)) == ok_row(1)
+
+
+def test_row_for_failed_shipment():
+    assert BaseResultSink.row(error_result(2)) == {
+        "index": 2,
+        "reference": "REF-2",
+        "shipment_id": None,
+        "courier_tracking_number": None,
+        "parcelhub_tracking_number": None,
+        "error": "ConnectionError: Failed",
+    }
+
+
+def test_row_without_shipment_request():
+    assert BaseResultSink.row(ShipmentResult(0, None))["reference"] is None
+
+
+def test_write_rows_is_not_implemented():
+    with pytest.raises(NotImplementedError):
+        BaseResultSink().write_rows([])
+
+
+def test_write_buffers_rows():
+    callback = mock.Mock()
+    sink = CallbackSink(callback, buffer_size=3, flush_interval=None)
+    sink.write(ok_result(0))
+    sink.write(ok_result(1))
+    callback.assert_not_called()
+    sink.write(ok_result(2))
+    callback.assert_called_once_with([ok_row(0), ok_row(1), ok_row(2)])
+
+
+def test_flush_writes_buffered_rows():
+    callback = mock.Mock()
+    sink = CallbackSink(callback, flush_interval=None)
+    sink.write(ok_result(0))
+    sink.flush()
+    sink.flush()
+    callback.assert_called_once_with([ok_row(0)])
+
+
+def test_close_flushes_buffered_rows():
+    callback = mock.Mock()
+    with CallbackSink(callback) as sink:
+        sink.write(ok_result(0))
+    callback.assert_called_once_with([ok_row(0)])
+
+
+def test_rows_are_flushed_on_interval():
+    flushed = threading.Event()
+    callback = mock.Mock(side_effect=lambda rows: flushed.set())
+    sink = CallbackSink(callback, flush_interval=0.01)
+    sink.write(ok_result(0))
+    assert flushed.wait(1)
+    callback.assert_called_once_with([ok_row(0)])
+    sink.close()
+
+
+def test_failed_flush_keeps_rows():
+    callback = mock.Mock(side_effect=[OSError(), None])
+    sink = CallbackSink(callback, flush_interval=None)
+    sink.write(ok_result(0))
+    with pytest.raises(OSError):
+        sink.flush()
+    sink.write(ok_result(1))
+    sink.flush()
+    assert callback.call_args.args == ([ok_row(0), ok_row(1)],)
+
+
+def test_write_stores_flush_error():
+    error = OSError()
+    callback = mock.Mock(side_effect=[error, None])
+    sink = CallbackSink(callback, buffer_size=1, flush_interval=None)
+    sink.write(ok_result(0))
+    assert sink.last_error is error
+    sink.write(ok_result(1))
+    assert callback.call_args.args == ([ok_row(0), ok_row(1)],)
+
+
+def test_background_flush_stores_error():
+    error = OSError()
+    failed = threading.Event()
+
+    def callback(rows):
+        failed.set()
+        raise error
+
+    sink = CallbackSink(callback, flush_interval=0.01)
+    sink.write(ok_result(0))
+    assert failed.wait(1)
+    sink._closed.set()
+    sink._thread.join()
+    assert sink.last_error is error
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with JSONLSink(path, buffer_size=1) as sink:
+        sink.write(ok_result(0))
+        sink.write(error_result(1))
+    with JSONLSink(path) as sink:
+        sink.write(ok_result(2))
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    assert rows == [ok_row(0), BaseResultSink.row(error_result(1)), ok_row(2)]
+
+
+def test_csv_sink(tmp_path):
+    path = tmp_path / "results.csv"
+    with CSVSink(path) as sink:
+        sink.write(ok_result(0))
+    with CSVSink(path) as sink:
+        sink.write(error_result(1))
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["reference"] for row in rows] == ["REF-0", "REF-1"]
+    assert rows[0]["shipment_id"] == "SHIPMENT-0"
+    assert rows[0]["error"] == ""
+    assert rows[1]["shipment_id"] == ""
+    assert rows[1]["error"] == "ConnectionError: Failed"
+
+
+def test_sqlite_sink(tmp_path):
+    path = tmp_path / "results" / "results.db"
+    with SQLiteSink(path) as sink:
+        sink.write(ok_result(0))
+        sink.write(error_result(1))
+    with SQLiteSink(path, table="results") as sink:
+        sink.write(ok_result(2))
+    connection = sqlite3.connect(path)
+    rows = connection.execute(
+        'SELECT "index", shipment_id, error FROM shipment_results'
+    ).fetchall()
+    other_rows = connection.execute("SELECT reference FROM results").fetchall()
+    connection.close()
+    assert rows == [(0, "SHIPMENT-0", None), (1, None, "ConnectionError: Failed")]
+    assert other_rows == [("REF-2",)]
@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from parcelhubapi.locks import FileLock
+from parcelhubapi.models import AccessToken
+from parcelhubapi.token_cache import FileTokenCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "cache" / "tokens.json"
+
+
+@pytest.fixture
+def cache(cache_path):
+    return FileTokenCache(cache_path)
+
+
+@pytest.fixture
+def token():
+    return AccessToken(
+        access_token="ACCESS_TOKEN", refresh_token="REFRESH_TOKEN", expires_at=1000
+    )
+
+
+def test_default_path():
+    assert FileTokenCache().path == FileTokenCache.DEFAULT_PATH
+
+
+def test_key():
+    assert FileTokenCache.key("USERNAME", "ACCOUNT_ID") == "USERNAME:ACCOUNT_ID"
+
+
+def test_get_without_cache_file(cache):
+    assert cache.get("USERNAME", "ACCOUNT_ID") is None
+
+
+def test_get_with_invalid_cache_file(cache, cache_path):
+    cache_path.parent.mkdir()
+    cache_path.write_text("Invalid")
+    assert cache.get("USERNAME", "ACCOUNT_ID") is None
+
+
+def test_set_and_get(cache, token):
+    cache.set("USERNAME", "ACCOUNT_ID", token)
+    assert cache.get("USERNAME", "ACCOUNT_ID").to_dict() == token.to_dict()
+    assert cache.get("USERNAME", "OTHER_ACCOUNT_ID") is None
+
+
+def test_set_writes_file(cache, cache_path, token):
+    cache.set("USERNAME", "ACCOUNT_ID", token)
+    with open(cache_path) as f:
+        assert json.load(f) == {"USERNAME:ACCOUNT_ID": token.to_dict()}
+
+
+def test_delete(cache, token):
+    cache.set("USERNAME", "ACCOUNT_ID", token)
+    cache.delete("USERNAME", "ACCOUNT_ID")
+    assert cache.get("USERNAME", "ACCOUNT_ID") is None
+
+
+def test_delete_without_token(cache):
+    cache.delete("USERNAME", "ACCOUNT_ID")
+    assert cache.get("USERNAME", "ACCOUNT_ID") is None
+
+
+def test_lock_is_reentrant(cache, token):
+    with cache.lock():
+        cache.set("USERNAME", "ACCOUNT_ID", token)
+    assert cache.get("USERNAME", "ACCOUNT_ID") is not None
+
+
+def test_file_lock_blocks_other_threads(tmp_path):
+    lock = FileLock(tmp_path / "test.lock")
+    events = []
+
+    def acquire():
+        with FileLock(tmp_path / "test.lock"):
+            events.append("other")
+
+    with lock:
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join(timeout=0.2)
+        events.append("first")
+    thread.join()
+    assert events == ["first", "other"]
+
+
+def _append_token(path, index):
+    cache = FileTokenCache(path)
+    with cache.lock():
+        cache.set(
+            "USERNAME",
+            str(index),
+            AccessToken(access_token=str(index), refresh_token="", expires_at=0),
+        )
+
+
+def test_concurrent_processes_do_not_lose_writes(cache_path):
+    processes = [
+        multiprocessing.Process(target=_append_token, args=(cache_path, i))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    cache = FileTokenCache(cache_path)
+    assert [cache.get("USERNAME", str(i)).access_token for i in range(4)] == [
+        "0",
+        "1",
+        "2",
+        "3",
+    ]
@@ -0,0 +1,270 @@
+import re
+from unittest import mock
+
+import pytest
+import requests
+import urllib3
+
+from parcelhubapi import exceptions
+from parcelhubapi.request import GetShipmentsRequest
+from parcelhubapi.session import ParcelhubAPISession
+from parcelhubapi.transport import (
+    BaseTransport,
+    InMemoryTransport,
+    RequestsTransport,
+    TransportResponse,
+    Urllib3Transport,
+)
+
+
+@pytest.fixture
+def url():
+    return "https://api.test.com/1.0/Shipment"
+
+
+@pytest.fixture
+def headers():
+    return {"Accept": "*/*"}
+
+
+@pytest.fixture
+def params():
+    return {"AccountId": "TEST_ACCOUNT_ID"}
+
+
+@pytest.fixture
+def data():
+    return b"<Shipment/>"
+
+
+@pytest.fixture
+def token_response_text():
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<TokenV2 xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        "<refreshToken>REFRESH_TOKEN</refreshToken>"
+        "<access_token>ACCESS_TOKEN</access_token>"
+        "<expiresIn>14400</expiresIn>"
+        "</TokenV2>"
+    )
+
+
+def test_transport_response_text():
+    response = TransportResponse(status_code=200, content="Ünïcode".encode("utf-8"))
+    assert response.text == "Ünïcode"
+
+
+def test_transport_response_raise_for_status_with_success():
+    TransportResponse(status_code=200).raise_for_status()
+
+
+def test_transport_response_raise_for_status_with_error():
+    response = TransportResponse(status_code=500, content=b"Invalid Response")
+    with pytest.raises(
+        exceptions.ResponseStatusError,
+        match=re.escape("Error response (500): 'Invalid Response'."),
+    ):
+        response.raise_for_status()
+
+
+def test_base_transport_request_is_not_implemented(url):
+    with pytest.raises(NotImplementedError):
+        BaseTransport().request("GET", url)
+
+
+def test_requests_transport_pool_settings():
+    transport = RequestsTransport(pool_connections=3, pool_maxsize=7, pool_block=True)
+    adapter = transport.http_session.get_adapter("https://api.parcelhub.net")
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert adapter._pool_block is True
+
+
+def test_requests_transport_request(url, headers, params, data):
+    transport = RequestsTransport()
+    transport.http_session = mock.Mock()
+    response = transport.request("POST", url, headers=headers, params=params, data=data)
+    transport.http_session.request.assert_called_once_with(
+        method="POST",
+        url=url,
+        headers=headers,
+        params=params,
+        data=data,
+        timeout=None,
+    )
+    assert response == transport.http_session.request.return_value
+
+
+def test_requests_transport_close():
+    transport = RequestsTransport()
+    transport.http_session = mock.Mock()
+    transport.close()
+    transport.http_session.close.assert_called_once_with()
+
+
+def test_urllib3_transport_pool_settings():
+    transport = Urllib3Transport(pool_connections=3, pool_maxsize=7, pool_block=True)
+    assert transport.pool_manager.pools._maxsize == 3
+    assert transport.pool_manager.connection_pool_kw["maxsize"] == 7
+    assert transport.pool_manager.connection_pool_kw["block"] is True
+
+
+def test_urllib3_transport_request(url, headers, params, data):
+    transport = Urllib3Transport()
+    transport.pool_manager = mock.Mock()
+    transport.pool_manager.request.return_value = mock.Mock(
+        status=201, data=b"Response", headers={"Content-Type": "application/xml"}
+    )
+    response = transport.request("POST", url, headers=headers, params=params, data=data)
+    transport.pool_manager.request.assert_called_once_with(
+        "POST",
+        f"{url}?AccountId=TEST_ACCOUNT_ID",
+        headers=headers,
+        body=data,
+        decode_content=True,
+        timeout=None,
+        retries=False,
+    )
+    assert response.status_code == 201
+    assert response.text == "Response"
+    assert response.headers == {"Content-Type": "application/xml"}
+
+
+def test_urllib3_transport_close():
+    transport = Urllib3Transport()
+    transport.pool_manager = mock.Mock()
+    transport.close()
+    transport.pool_manager.clear.assert_called_once_with()
+
+
+def test_in_memory_transport_returns_canned_response(url, headers, params):
+    transport = InMemoryTransport()
+    transport.add_response("GET", url, content="Shipments")
+    response = transport.request("GET", url, headers=headers, params=params)
+    assert response.status_code == 200
+    assert response.text == "Shipments"
+
+
+def test_in_memory_transport_records_requests(url, headers, params, data):
+    transport = InMemoryTransport()
+    transport.request("POST", url, headers=headers, params=params, data=data)
+    assert transport.requests == [
+        {
+            "method": "POST",
+            "url": url,
+            "headers": headers,
+            "params": params,
+            "data": data,
+            "timeout": None,
+        }
+    ]
+
+
+def test_in_memory_transport_returns_404_without_match(url):
+    response = InMemoryTransport().request("GET", url)
+    assert response.status_code == 404
+
+
+def test_in_memory_transport_returns_default_response(url):
+    default_response = TransportResponse(status_code=200, content=b"Default")
+    transport = InMemoryTransport(default_response=default_response)
+    assert transport.request("GET", url) is default_response
+
+
+def test_requests_use_session_transport(token_response_text):
+    transport = InMemoryTransport()
+    session = ParcelhubAPISession(
+        username="TEST_USERNAME",
+        password="TEST_PASSWORD",
+        account_id="TEST_ACCOUNT_ID",
+        transport=transport,
+    )
+    session.DOMAIN = "https://api.test.com"
+    transport.add_response(
+        "POST", "https://api.test.com/1.0/TokenV2", content=token_response_text
+    )
+    transport.add_response(
+        "GET", "https://api.test.com/1.0/Shipment", content="Shipments"
+    )
+    session.authorise_session()
+    assert session.access_token == "ACCESS_TOKEN"
+    assert GetShipmentsRequest(session).call() == "Shipments"
+    assert [request["method"] for request in transport.requests] == ["POST", "GET"]
+
+
+def test_prewarm_sends_head_request(url):
+    transport = InMemoryTransport()
+    transport.prewarm(url)
+    assert transport.requests[0]["method"] == "HEAD"
+    assert transport.requests[0]["url"] == url
+    assert transport.requests[0]["timeout"] == InMemoryTransport.PREWARM_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    (
+        (urllib3.exceptions.ReadTimeoutError(None, "url", "timed out"), TimeoutError),
+        (urllib3.exceptions.ProtocolError("Connection aborted"), ConnectionError),
+        (
+            urllib3.exceptions.NewConnectionError(None, "refused"),
+            exceptions.ConnectError,
+        ),
+        (
+            urllib3.exceptions.ConnectTimeoutError(None, "timed out"),
+            exceptions.ConnectError,
+        ),
+    ),
+)
+def test_urllib3_transport_translates_errors(url, error, expected):
+    transport = Urllib3Transport()
+    transport.pool_manager = mock.Mock()
+    transport.pool_manager.request.side_effect = error
+    with pytest.raises(expected):
+        transport.request("GET", url)
+
+
+def test_urllib3_transport_does_not_report_read_errors_as_connect_errors(url):
+    transport = Urllib3Transport()
+    transport.pool_manager = mock.Mock()
+    transport.pool_manager.request.side_effect = urllib3.exceptions.ProtocolError()
+    with pytest.raises(ConnectionError) as excinfo:
+        transport.request("POST", url)
+    assert not isinstance(excinfo.value, exceptions.ConnectError)
+
+
+def test_requests_transport_raises_connect_errors(url):
+    transport = RequestsTransport()
+    error = urllib3.exceptions.MaxRetryError(
+        None, url, reason=urllib3.exceptions.NewConnectionError(None, "refused")
+    )
+    with mock.patch.object(
+        transport.http_session,
+        "request",
+        side_effect=requests.exceptions.ConnectionError(error),
+    ):
+        with pytest.raises(exceptions.ConnectError):
+            transport.request("POST", url)
+
+
+def test_requests_transport_raises_connect_timeouts_as_connect_errors(url):
+    transport = RequestsTransport()
+    with mock.patch.object(
+        transport.http_session,
+        "request",
+        side_effect=requests.exceptions.ConnectTimeout(),
+    ):
+        with pytest.raises(exceptions.ConnectError):
+            transport.request("POST", url)
+
+
+def test_requests_transport_raises_other_connection_errors(url):
+    transport = RequestsTransport()
+    with mock.patch.object(
+        transport.http_session,
+        "request",
+        side_effect=requests.exceptions.ConnectionError("Connection aborted"),
+    ):
+        with pytest.raises(requests.exceptions.ConnectionError) as excinfo:
+            transport.request("POST", url)
+    assert not isinstance(excinfo.value, exceptions.ConnectError)